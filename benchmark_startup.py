@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+"""
+Measures startup time of the smoke_tests command on the test project.
+
+Every case runs in a new process (a median of --runs runs is printed), "django.setup()"
+is the baseline which the command can't get below.
+
+    python benchmark_startup.py --runs 10
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+SETUP_CODE = 'import django; django.setup()'
+IMPORT_CODE = '''
+import sys, time
+import django
+django.setup()
+start = time.perf_counter()
+from django.core.management import load_command_class
+load_command_class('django_smoke_tests', 'smoke_tests').create_parser('manage.py', 'smoke_tests')
+sys.stdout.write('{:.1f}\\n'.format((time.perf_counter() - start) * 1000))
+'''
+
+CASES = [
+    ('django.setup()', [sys.executable, '-c', SETUP_CODE]),
+    ('smoke_tests --help', [sys.executable, 'manage.py', 'smoke_tests', '--help']),
+    ('smoke_tests --list', [sys.executable, 'manage.py', 'smoke_tests', '--list']),
+]
+
+
+def get_env():
+    env = dict(os.environ)
+    env.setdefault('DJANGO_SETTINGS_MODULE', 'tests.settings')
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [ROOT, env.get('PYTHONPATH')]))
+    return env
+
+
+def measure(command, runs):
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            command, cwd=ROOT, env=get_env(), check=True,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        durations.append((time.perf_counter() - start) * 1000)
+    return statistics.median(durations)
+
+
+def measure_import(runs):
+    durations = [
+        float(subprocess.check_output(
+            [sys.executable, '-c', IMPORT_CODE], cwd=ROOT, env=get_env(),
+        ))
+        for _ in range(runs)
+    ]
+    return statistics.median(durations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='runs of every case [default: 5]')
+    args = parser.parse_args()
+
+    for name, command in CASES:
+        sys.stdout.write('{:<40} {:8.1f} ms\n'.format(name, measure(command, args.runs)))
+    sys.stdout.write('{:<40} {:8.1f} ms\n'.format(
+        'import command and build its parser', measure_import(args.runs)
+    ))
+
+
+if __name__ == '__main__':
+    main()
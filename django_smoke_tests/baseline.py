@@ -0,0 +1,119 @@
+import json
+import os
+import tempfile
+
+from django.conf import settings
+
+from .reports import SKIPPED, ReportWriter
+
+DEFAULT_THRESHOLDS = {
+    'latency_ratio': 1.5,  # latency regressed when it's 1.5 times higher than in the baseline...
+    'latency_ms': 20,  # ...and higher by at least 20 ms, to ignore noise of very fast endpoints
+    'query_count': 0,  # any additional query is a regression
+}
+
+
+class BaselineNotAvailable(Exception):
+    pass
+
+
+def get_thresholds():
+    return dict(DEFAULT_THRESHOLDS, **getattr(settings, 'SMOKE_TESTS_BASELINE_THRESHOLDS', {}))
+
+
+class SnapshotWriter(ReportWriter):
+    """
+    Writes a compact snapshot of results: one [test_name, status_code, latency_ms, query_count]
+    list per line. Skipped tests are not included.
+
+    The snapshot is written to a temporary file, which replaces the file at `target_path` (if given)
+    once all tests are completed, so an interrupted run doesn't overwrite a previous baseline.
+    """
+
+    def __init__(self, target_path=None):
+        super(SnapshotWriter, self).__init__(None)
+        self.target_path = target_path
+
+    def open(self):
+        target_dir = None
+        if self.target_path:
+            target_dir = os.path.dirname(os.path.abspath(self.target_path))
+        if target_dir:
+            os.makedirs(target_dir, exist_ok=True)
+        fd, self.path = tempfile.mkstemp(suffix='.jsonl', dir=target_dir)
+        os.close(fd)
+        super(SnapshotWriter, self).open()
+
+    @property
+    def snapshot_path(self):
+        return self.target_path if self.target_path and self.file is None else self.path
+
+    def close(self):
+        was_open = self.file is not None
+        super(SnapshotWriter, self).close()
+        if was_open and self.target_path:
+            os.replace(self.path, self.target_path)
+
+    def discard(self):
+        if not self.target_path and self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def format_record(self, record):
+        if record['outcome'] == SKIPPED:
+            return ''
+        latency_ms = record['duration_ms']
+        return json.dumps([
+            record['test_name'],
+            record['status_code'],
+            round(latency_ms, 1) if latency_ms is not None else None,
+            record['query_count'],
+        ]) + '\n'
+
+
+def load_snapshot(path):
+    """
+    Returns {test_name: (status_code, latency_ms, query_count)}.
+    """
+    snapshot = {}
+    try:
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    test_name, status_code, latency_ms, query_count = json.loads(line)
+                    snapshot[test_name] = (status_code, latency_ms, query_count)
+    except (OSError, ValueError) as e:
+        raise BaselineNotAvailable('Could not load baseline "{}": {}'.format(path, e))
+    return snapshot
+
+
+def compare_snapshots(baseline, current, thresholds=None):
+    """
+    Returns [(test_name, description),] of status code changes and latency or query regressions
+    of tests present in both snapshots.
+    """
+    thresholds = thresholds or get_thresholds()
+    changes = []
+    for test_name in sorted(set(baseline) & set(current)):
+        old_status_code, old_latency_ms, old_query_count = baseline[test_name]
+        status_code, latency_ms, query_count = current[test_name]
+
+        if status_code != old_status_code:
+            changes.append((test_name, 'status code changed from {} to {}'.format(
+                old_status_code, status_code
+            )))
+
+        if old_latency_ms is not None and latency_ms is not None and all([
+            latency_ms > old_latency_ms * thresholds['latency_ratio'],
+            latency_ms - old_latency_ms > thresholds['latency_ms'],
+        ]):
+            changes.append((test_name, 'latency increased from {:.1f} ms to {:.1f} ms'.format(
+                old_latency_ms, latency_ms
+            )))
+
+        if old_query_count is not None and query_count is not None and (
+            query_count - old_query_count > thresholds['query_count']
+        ):
+            changes.append((test_name, 'queries increased from {} to {}'.format(
+                old_query_count, query_count
+            )))
+    return changes
@@ -0,0 +1,96 @@
+import hashlib
+import json
+import os
+
+import django
+from django.conf import settings
+
+from . import __version__
+
+DEFAULT_CACHE_DIR = '.smoke_tests_cache'
+
+
+def get_cache_dir():
+    return getattr(settings, 'SMOKE_TESTS_CACHE_DIR', DEFAULT_CACHE_DIR)
+
+
+def get_files_fingerprint(file_paths):
+    """
+    Creates a hash based on modification times and sizes of given files.
+    """
+    fingerprint = hashlib.sha256()
+    for file_path in sorted(file_paths):
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            file_state = 'missing'
+        else:
+            file_state = '{}:{}'.format(stat.st_mtime_ns, stat.st_size)
+        fingerprint.update('{}={};'.format(file_path, file_state).encode())
+    return fingerprint.hexdigest()
+
+
+def get_file_hash(path):
+    file_hash = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            file_hash.update(block)
+    return file_hash.hexdigest()
+
+
+def write_json_atomically(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+class UrlInventoryCache:
+    """
+    Stores flattened URL patterns and their normalized forms on disk.
+
+    The cache is invalidated when any of the source files (URL confs and modules of the views)
+    is modified, or when a different version of Django or django-smoke-tests is used.
+    """
+
+    def __init__(self, urlconf, cache_dir=None):
+        self.urlconf = urlconf
+        file_name = '{}.json'.format(hashlib.sha1(str(urlconf).encode()).hexdigest())
+        self.path = os.path.join(cache_dir or get_cache_dir(), 'urls', file_name)
+        self.source_files = None  # set when a valid cache is loaded
+
+    def _get_versions(self):
+        return [__version__, django.get_version()]
+
+    def load(self):
+        """
+        Returns (all_patterns, normalized_patterns) or None if cache is missing or outdated.
+        """
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if data.get('versions') != self._get_versions():
+            return None
+        if data.get('fingerprint') != get_files_fingerprint(data.get('source_files', [])):
+            return None
+
+        self.source_files = data['source_files']
+        all_patterns = [tuple(pattern) for pattern in data['all_patterns']]
+        normalized_patterns = {
+            url_pattern: tuple(normalized) if normalized else None
+            for url_pattern, normalized in data['normalized_patterns'].items()
+        }
+        return all_patterns, normalized_patterns
+
+    def save(self, all_patterns, normalized_patterns, source_files):
+        write_json_atomically(self.path, {
+            'versions': self._get_versions(),
+            'source_files': sorted(source_files),
+            'fingerprint': get_files_fingerprint(source_files),
+            'all_patterns': all_patterns,
+            'normalized_patterns': normalized_patterns,
+        })
@@ -0,0 +1,8 @@
+from collections import namedtuple
+
+# one request of the table executed by engines or by compact tests, instead of a test method
+SmokeRequest = namedtuple(
+    'SmokeRequest',
+    ['test_name', 'method', 'url', 'detail_url', 'skipped', 'url_name', 'skip_reason'],
+    defaults=[None, None],
+)
@@ -0,0 +1,162 @@
+import ast
+import importlib.util
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+STDIN = '-'
+
+
+class ChangedFilesNotAvailable(Exception):
+    pass
+
+
+def get_changed_files(changed_since, stdin=None):
+    """
+    Returns absolute paths of files changed since the given git reference,
+    or listed on the standard input (one path per line) when `changed_since` is "-".
+    """
+    if changed_since == STDIN:
+        stdin = stdin or sys.stdin
+        return {os.path.abspath(line.strip()) for line in stdin if line.strip()}
+
+    try:
+        root = _run_git('rev-parse', '--show-toplevel').strip()
+        changed_files = _run_git('diff', '--name-only', changed_since).splitlines()
+        untracked_files = _run_git(
+            'ls-files', '--others', '--exclude-standard', '--full-name'
+        ).splitlines()
+    except (OSError, subprocess.CalledProcessError) as e:
+        raise ChangedFilesNotAvailable(
+            'Could not get files changed since "{}": {}'.format(changed_since, e)
+        )
+    return {os.path.join(root, path) for path in changed_files + untracked_files if path}
+
+
+def _run_git(*args):
+    return subprocess.check_output(('git',) + args, stderr=subprocess.PIPE, universal_newlines=True)
+
+
+def get_module_name(lookup_str):
+    """
+    Returns the longest imported module name being a prefix of the view's dotted path.
+    Eg.:
+        "myapp.views.ItemViewSet" => "myapp.views"
+    """
+    parts = lookup_str.split('.')
+    for index in range(len(parts), 0, -1):
+        module_name = '.'.join(parts[:index])
+        if module_name in sys.modules:
+            return module_name
+    return None
+
+
+def get_module_file(module_name):
+    module = sys.modules.get(module_name)
+    if module is not None:
+        module_file = getattr(module, '__file__', None)
+    else:
+        try:
+            spec = importlib.util.find_spec(module_name)
+        except (ImportError, ValueError):
+            spec = None
+        module_file = getattr(spec, 'origin', None)
+    return os.path.abspath(module_file) if module_file and module_file.endswith('.py') else None
+
+
+class ImportGraph:
+    """
+    Graph of imports between modules of the project, built lazily from the source code of modules.
+    Modules outside of the project directory (eg. installed packages) are not analysed.
+    """
+
+    def __init__(self, project_dir=None):
+        self.project_dir = os.path.abspath(project_dir or os.getcwd())
+        self.imports = {}  # {module_name: {imported_module_name,}}
+
+    def is_project_file(self, module_file):
+        if module_file is None or not module_file.startswith(self.project_dir + os.sep):
+            return False
+        return 'site-packages' not in module_file.split(os.sep)
+
+    def get_imports(self, module_name):
+        if module_name not in self.imports:
+            self.imports[module_name] = self._find_imports(module_name)
+        return self.imports[module_name]
+
+    def _find_imports(self, module_name):
+        module_file = get_module_file(module_name)
+        if not self.is_project_file(module_file):
+            return set()
+
+        try:
+            with open(module_file, 'rb') as f:
+                tree = ast.parse(f.read(), module_file)
+        except (OSError, SyntaxError, ValueError):
+            return set()
+
+        is_package = os.path.basename(module_file) == '__init__.py'
+        package = module_name if is_package else module_name.rpartition('.')[0]
+        imported_modules = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    imported_modules.update(self._with_parent_packages(alias.name))
+            elif isinstance(node, ast.ImportFrom):
+                try:
+                    base_module = importlib.util.resolve_name(
+                        '.' * node.level + (node.module or ''), package
+                    )
+                except (ImportError, ValueError):
+                    continue
+                imported_modules.update(self._with_parent_packages(base_module))
+                if not self.is_project_file(get_module_file(base_module)):
+                    continue
+                for alias in node.names:
+                    # "from package import module" imports a module, not an attribute
+                    submodule = '{}.{}'.format(base_module, alias.name)
+                    if get_module_file(submodule):
+                        imported_modules.add(submodule)
+
+        return {
+            imported_module for imported_module in imported_modules
+            if imported_module != module_name
+            if self.is_project_file(get_module_file(imported_module))
+        }
+
+    @staticmethod
+    def _with_parent_packages(module_name):
+        parts = module_name.split('.')
+        return ['.'.join(parts[:index]) for index in range(1, len(parts) + 1)]
+
+    def get_affected_modules(self, module_names, changed_files):
+        """
+        Returns modules (out of `module_names` and modules imported by them) which were changed
+        or import a changed module, directly or transitively.
+        """
+        reachable_modules = set()
+        modules_to_visit = list(module_names)
+        while modules_to_visit:
+            module_name = modules_to_visit.pop()
+            if module_name in reachable_modules:
+                continue
+            reachable_modules.add(module_name)
+            modules_to_visit.extend(self.get_imports(module_name))
+
+        importers = defaultdict(set)
+        for module_name in reachable_modules:
+            for imported_module in self.get_imports(module_name):
+                importers[imported_module].add(module_name)
+
+        affected_modules = {
+            module_name for module_name in reachable_modules
+            if get_module_file(module_name) in changed_files
+        }
+        modules_to_visit = list(affected_modules)
+        while modules_to_visit:
+            for importer in importers[modules_to_visit.pop()]:
+                if importer not in affected_modules:
+                    affected_modules.add(importer)
+                    modules_to_visit.append(importer)
+        return affected_modules
@@ -0,0 +1,15 @@
+# choices of command options, kept apart from the generator, so parsing options (eg. --help)
+# doesn't import the test case classes, test runners and request engines
+
+UNITTEST_ENGINE = 'unittest'
+ASYNC_ENGINE = 'async'
+ENGINES = [UNITTEST_ENGINE, ASYNC_ENGINE]
+
+PER_TEST_AUTH = 'per-test'  # log in before every test
+PER_CLASS_AUTH = 'per-class'  # log in once and reuse the session cookie in every test
+ANONYMOUS_AUTH = 'anonymous'  # don't create a user at all
+AUTH_MODES = [PER_TEST_AUTH, PER_CLASS_AUTH, ANONYMOUS_AUTH]
+
+FAIL_ON_BUDGET = 'fail'
+WARN_ON_BUDGET = 'warn'
+BUDGET_ACTIONS = [FAIL_ON_BUDGET, WARN_ON_BUDGET]
@@ -0,0 +1,220 @@
+import functools
+import hashlib
+import json
+import os
+import sys
+
+import django
+from django.apps import apps
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.loader import MigrationLoader
+
+from . import __version__
+from .cache import get_cache_dir, get_file_hash, write_json_atomically
+
+
+def get_test_db_name(connection):
+    return connection.creation._get_test_db_name()
+
+
+def is_in_memory_db(connection):
+    # only SQLite keeps test databases in memory, they can't be reused between runs
+    is_in_memory = getattr(connection.creation, 'is_in_memory_db', None)
+    return bool(is_in_memory and is_in_memory(get_test_db_name(connection)))
+
+
+def get_migrations_fingerprint():
+    """
+    Creates a hash of the migration graph: every migration on disk, its parents
+    and the content of its file, so editing an applied migration changes the hash too.
+    Migrations are loaded without a database connection, the database doesn't have to exist.
+    """
+    graph = MigrationLoader(None, ignore_no_migrations=True).graph
+    fingerprint = hashlib.sha256()
+    for key in sorted(graph.nodes):
+        module = sys.modules.get(type(graph.nodes[key]).__module__)
+        path = getattr(module, '__file__', None)
+        file_hash = get_file_hash(path) if path and os.path.isfile(path) else None
+        parents = sorted(parent.key for parent in graph.node_map[key].parents)
+        fingerprint.update('{}={};{};'.format(key, parents, file_hash).encode())
+    return fingerprint.hexdigest()
+
+
+def get_models_fingerprint(connection):
+    """
+    Creates a hash of database tables of all models: columns, their types and constraints,
+    which define the schema created without migrations (--no-migrations).
+    """
+    fingerprint = hashlib.sha256()
+    models = sorted(apps.get_models(include_auto_created=True), key=lambda model: model._meta.label)
+    for model in models:
+        columns = [
+            (field.column, field.db_type(connection), field.null, field.unique, field.db_index)
+            for field in model._meta.local_concrete_fields
+        ]
+        fingerprint.update('{}:{}={};{};{};{};'.format(
+            model._meta.label,
+            model._meta.db_table,
+            columns,
+            sorted(model._meta.unique_together),
+            sorted(index.name for index in model._meta.indexes),
+            sorted(constraint.name for constraint in model._meta.constraints),
+        ).encode())
+    return fingerprint.hexdigest()
+
+
+def get_schema_fingerprint(using=DEFAULT_DB_ALIAS):
+    """
+    Creates a hash of the schema of a test database: migrations and database tables of all models.
+    """
+    fingerprint = hashlib.sha256()
+    fingerprint.update(repr([
+        get_migrations_fingerprint(),
+        get_models_fingerprint(connections[using]),
+    ]).encode())
+    return fingerprint.hexdigest()
+
+
+def get_test_db_fingerprint(using):
+    connection = connections[using]
+    fingerprint = hashlib.sha256()
+    fingerprint.update(repr([
+        __version__,
+        django.get_version(),
+        connection.vendor,
+        get_test_db_name(connection),
+        get_schema_fingerprint(using),
+    ]).encode())
+    return fingerprint.hexdigest()
+
+
+class TestDatabaseFingerprints:
+    """
+    Stores fingerprints of test databases kept between runs, {database alias: fingerprint}.
+    """
+
+    def __init__(self, cache_dir=None):
+        self.path = os.path.join(cache_dir or get_cache_dir(), 'databases.json')
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self, fingerprints):
+        write_json_atomically(self.path, fingerprints)
+
+
+def get_model_tables(connection, app_labels):
+    converter = connection.introspection.identifier_converter
+    return {
+        converter(model._meta.db_table)
+        for model in apps.get_models(include_auto_created=True)
+        if model._meta.app_label in app_labels
+    }
+
+
+class SchemaCache:
+    """
+    Stores SQL statements creating tables of apps without migrations (--no-migrations).
+
+    The cache is keyed by tables of models (see `get_models_fingerprint`), the database backend
+    and versions of Django and django-smoke-tests, so statements are never executed
+    for a different schema.
+    """
+
+    def __init__(self, connection, app_labels, cache_dir=None):
+        self.connection = connection
+        self.app_labels = sorted(app_labels)
+        self.cache_dir = os.path.join(cache_dir or get_cache_dir(), 'schemas')
+        self._path = None
+
+    @property
+    def path(self):
+        if self._path is None:
+            key = hashlib.sha256(repr([
+                __version__,
+                django.get_version(),
+                self.connection.vendor,
+                self.connection.alias,
+                self.app_labels,
+                get_models_fingerprint(self.connection),
+            ]).encode()).hexdigest()
+            self._path = os.path.join(self.cache_dir, '{}.json'.format(key))
+        return self._path
+
+    def load(self):
+        """
+        Returns [(sql, params),] or None if the cache is missing.
+        """
+        try:
+            with open(self.path) as f:
+                return [(sql, params) for sql, params in json.load(f)]
+        except (OSError, ValueError):
+            return None
+
+    def save(self, statements):
+        try:
+            json.dumps(statements)
+        except TypeError:
+            return  # parameters which can't be stored in JSON, statements are built on every run
+        write_json_atomically(self.path, statements)
+
+    def create_tables(self, statements):
+        with self.connection.schema_editor() as editor:
+            for sql, params in statements:
+                editor.execute(sql, params)
+
+
+def get_recording_schema_editor_class(schema_editor_class, statements):
+    class RecordingSchemaEditor(schema_editor_class):
+        """ A schema editor appending (sql, params) of every executed statement to `statements` """
+
+        def execute(self, sql, params=()):
+            super(RecordingSchemaEditor, self).execute(sql, params)
+            statements.append((str(sql), list(params) if params is not None else None))
+
+    return RecordingSchemaEditor
+
+
+def cache_schema(sync_apps):
+    """
+    Decorates `sync_apps` of the `migrate` command, which creates tables of apps without migrations
+    model by model. Statements executed in an empty database are cached, later runs execute them
+    in one batch instead of building them again.
+    """
+
+    @functools.wraps(sync_apps)
+    def wrapper(command, connection, app_labels):
+        with connection.cursor() as cursor:
+            existing_tables = set(connection.introspection.table_names(cursor))
+        if existing_tables & get_model_tables(connection, app_labels):
+            # some tables were kept (eg. --reuse-db), only missing ones are created
+            return sync_apps(command, connection, app_labels)
+
+        schema_cache = SchemaCache(connection, app_labels)
+        statements = schema_cache.load()
+        if statements is not None:
+            return schema_cache.create_tables(statements)
+
+        statements = []
+        connection.SchemaEditorClass = get_recording_schema_editor_class(
+            type(connection).SchemaEditorClass, statements
+        )
+        try:
+            sync_apps(command, connection, app_labels)
+        finally:
+            del connection.SchemaEditorClass
+        schema_cache.save(statements)
+
+    wrapper.caches_schema = True
+    return wrapper
+
+
+def enable_schema_cache():
+    from django.core.management.commands import migrate
+
+    if not getattr(migrate.Command.sync_apps, 'caches_schema', False):
+        migrate.Command.sync_apps = cache_schema(migrate.Command.sync_apps)
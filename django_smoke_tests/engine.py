@@ -0,0 +1,324 @@
+import asyncio
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.test import Client
+
+from .constants import ANONYMOUS_AUTH
+from .live import LiveServerClient
+from .reports import ERROR, FAILED, PASSED, SKIPPED, get_response_size
+from .stats import EndpointStats
+from .tests import create_smoke_user, load_fixture
+
+try:
+    from django.test import AsyncClient
+except ImportError:
+    # AsyncClient available from Django 3.1
+    AsyncClient = None
+
+
+SmokeResult = namedtuple(
+    'SmokeResult',
+    ['request', 'status_code', 'error', 'duration_ms', 'response_size'],
+    defaults=[None, None],
+)
+
+
+class AsyncRequestEngine:
+    """
+    Sends smoke requests directly to the project's handler, without creating unittest tests.
+
+    Requests are executed through AsyncClient (ASGI handler), up to `concurrency` at a time,
+    and every result is written to the stream as soon as it's available.
+    Django versions without AsyncClient fall back to sequential requests sent with Client
+    (WSGI handler).
+
+    With `base_url` requests are sent to a running server instead, from `concurrency` threads
+    with keep-alive connections, and the test environment and database are not set up.
+    """
+
+    DEFAULT_CONCURRENCY = 10
+
+    def __init__(self, generator, test_runner, stream, concurrency=None, base_url=None):
+        self.generator = generator
+        self.test_runner = test_runner
+        self.stream = stream
+        self.concurrency = concurrency or self.DEFAULT_CONCURRENCY
+        self.base_url = base_url
+        self.failures = 0
+        self.skipped = 0
+
+    def run(self, requests):
+        """
+        Sets up a test environment and a test database, executes all requests
+        and returns a number of failed requests.
+        """
+        old_config = self._set_up()
+        client = None
+        try:
+            client = self._create_client()
+            requests = [self._resolve_url(request) for request in requests]
+            self._send_all(client, requests)
+        finally:
+            if isinstance(client, LiveServerClient):
+                client.close()
+            self._tear_down(old_config)
+
+        self._write_summary(requests)
+        return self.failures
+
+    def _set_up(self):
+        if self.base_url:
+            return None  # the running server uses its own environment and database
+        self.test_runner.setup_test_environment()
+        return self.test_runner.setup_databases()
+
+    def _tear_down(self, old_config):
+        if self.base_url:
+            return
+        self.test_runner.teardown_databases(old_config)
+        self.test_runner.teardown_test_environment()
+
+    def _send_all(self, client, requests):
+        if self.base_url:
+            with ThreadPoolExecutor(self.concurrency) as executor:
+                futures = [
+                    executor.submit(self._send_request, client, request) for request in requests
+                ]
+                for future in as_completed(futures):
+                    self._write_result(future.result())
+        elif AsyncClient:
+            asyncio.run(self._send_requests(client, requests))
+        else:
+            for request in requests:
+                self._write_result(self._send_request(client, request))
+
+    def _write_summary(self, requests):
+        self.stream.write(
+            '\nRan {} requests, {} failed, {} skipped\n'.format(
+                len(requests), self.failures, self.skipped
+            )
+        )
+
+    def _create_client(self):
+        if self.base_url:
+            # anonymous requests, unless SMOKE_TESTS_LIVE_SERVER_HEADERS set eg. a session cookie
+            return LiveServerClient(self.base_url)
+
+        client = AsyncClient() if AsyncClient else Client()
+        if self.generator.use_db:
+            if self.generator.fixture_path:
+                load_fixture(
+                    self.generator.fixture_path, self.generator.cache_fixture,
+                    self.generator.stream_fixture,
+                )
+            if self.generator.auth_mode != ANONYMOUS_AUTH:
+                client.force_login(create_smoke_user())
+        return client
+
+    def _resolve_url(self, request):
+        if request.skipped:
+            return request
+        return request._replace(url=self.generator.resolve_url(request.url))
+
+    async def _send_requests(self, client, requests):
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def send_request(request):
+            async with semaphore:
+                return await self._send_request_async(client, request)
+
+        for result in asyncio.as_completed([send_request(request) for request in requests]):
+            self._write_result(await result)
+
+    async def _send_request_async(self, client, request):
+        if request.skipped:
+            return SmokeResult(request, None, None)
+        start = time.perf_counter()
+        try:
+            response = await getattr(client, request.method.lower())(request.url, {})
+        except Exception as e:
+            return SmokeResult(request, None, e, (time.perf_counter() - start) * 1000)
+        return SmokeResult(
+            request, response.status_code, None, (time.perf_counter() - start) * 1000,
+            get_response_size(response),
+        )
+
+    @staticmethod
+    def _send_request(client, request):
+        if request.skipped:
+            return SmokeResult(request, None, None)
+        start = time.perf_counter()
+        try:
+            response = getattr(client, request.method.lower())(request.url, {})
+        except Exception as e:
+            return SmokeResult(request, None, e, (time.perf_counter() - start) * 1000)
+        return SmokeResult(
+            request, response.status_code, None, (time.perf_counter() - start) * 1000,
+            get_response_size(response),
+        )
+
+    def _write_result(self, result):
+        request = result.request
+        if request.skipped:
+            self.skipped += 1
+            outcome = 'SKIPPED'
+        elif result.error is None and self.generator.is_status_code_allowed(
+            result.status_code, request.detail_url
+        ):
+            outcome = 'OK'
+        else:
+            self.failures += 1
+            outcome = 'FAILED'
+
+        if request.skipped:
+            details = ''
+        elif result.error is None:
+            details = result.status_code
+        else:
+            details = repr(result.error)
+        self.stream.write('{} {} {} {}'.format(
+            outcome, request.method, request.url or request.test_name, details
+        ).rstrip() + '\n')
+        self._report_result(result, outcome)
+
+    def _report_result(self, result, outcome):
+        if not self.generator.report_writers:
+            return
+
+        request = result.request
+        skip_reason = message = None
+        if request.skipped:
+            report_outcome = SKIPPED
+            skip_reason = request.skip_reason or self.generator.NOT_SUPPORTED_SKIP_REASON
+        elif result.error is not None:
+            report_outcome = ERROR
+            message = repr(result.error)
+        elif outcome == 'OK':
+            report_outcome = PASSED
+        else:
+            report_outcome = FAILED
+            message = 'status code {} is not allowed'.format(result.status_code)
+
+        self.generator.write_report_record({
+            'test_name': request.test_name,
+            'method': request.method,
+            'url': request.url,
+            'url_name': request.url_name,
+            'outcome': report_outcome,
+            'status_code': result.status_code,
+            'duration_ms': result.duration_ms,
+            'query_count': None,  # queries of concurrent requests can't be told apart
+            'response_size': result.response_size,
+            'skip_reason': skip_reason,
+            'message': message,
+        })
+
+
+class LoadTestEngine(AsyncRequestEngine):
+    """
+    Sends every request `repeat` times, up to `concurrency` at a time, endpoint after endpoint,
+    and writes latency percentiles, throughput and an error rate of every endpoint.
+
+    Latencies are recorded in histograms, so memory doesn't grow with a number of repeats.
+    """
+
+    def __init__(
+            self, generator, test_runner, stream, concurrency=None, base_url=None, repeat=1
+    ):
+        super(LoadTestEngine, self).__init__(generator, test_runner, stream, concurrency, base_url)
+        self.repeat = repeat
+        self.stats = []  # [EndpointStats,]
+
+    def run(self, requests):
+        """
+        Sets up a test environment and a test database, executes all requests
+        and returns a number of endpoints with failed requests.
+        """
+        self.skipped = sum(1 for request in requests if request.skipped)
+        return super(LoadTestEngine, self).run(
+            [request for request in requests if not request.skipped]
+        )
+
+    def _send_all(self, client, requests):
+        if self.base_url:
+            with ThreadPoolExecutor(self.concurrency) as executor:
+                for request in requests:
+                    self._write_stats(self._repeat_request_in_threads(client, request, executor))
+        elif AsyncClient:
+            asyncio.run(self._load_endpoints(client, requests))
+        else:
+            for request in requests:
+                self._write_stats(self._repeat_request(client, request))
+
+    def _write_summary(self, requests):
+        self.stream.write(
+            '\nLoaded {} endpoints with {} requests each, {} with errors, {} skipped\n'.format(
+                len(self.stats), self.repeat, self.failures, self.skipped
+            )
+        )
+
+    async def _load_endpoints(self, client, requests):
+        for request in requests:
+            self._write_stats(await self._repeat_request_async(client, request))
+
+    def _get_worker_counts(self):
+        """
+        Splits repeats between `concurrency` workers, so pending requests aren't created upfront.
+        """
+        workers = min(self.concurrency, self.repeat)
+        return [
+            self.repeat // workers + (1 if index < self.repeat % workers else 0)
+            for index in range(workers)
+        ]
+
+    async def _repeat_request_async(self, client, request):
+        stats = EndpointStats(request.method, request.url)
+
+        async def send_requests(count):
+            for _ in range(count):
+                self._record_result(stats, await self._send_request_async(client, request))
+
+        start = time.perf_counter()
+        await asyncio.gather(*[send_requests(count) for count in self._get_worker_counts()])
+        stats.elapsed_s = time.perf_counter() - start
+        return stats
+
+    def _repeat_request(self, client, request):
+        stats = EndpointStats(request.method, request.url)
+        start = time.perf_counter()
+        for _ in range(self.repeat):
+            self._record_result(stats, self._send_request(client, request))
+        stats.elapsed_s = time.perf_counter() - start
+        return stats
+
+    def _repeat_request_in_threads(self, client, request, executor):
+        stats = EndpointStats(request.method, request.url)
+        lock = threading.Lock()
+
+        def send_requests(count):
+            for _ in range(count):
+                result = self._send_request(client, request)
+                with lock:
+                    self._record_result(stats, result)
+
+        start = time.perf_counter()
+        futures = [executor.submit(send_requests, count) for count in self._get_worker_counts()]
+        for future in futures:
+            future.result()
+        stats.elapsed_s = time.perf_counter() - start
+        return stats
+
+    def _write_stats(self, stats):
+        self.stats.append(stats)
+        if stats.errors:
+            self.failures += 1
+        self.stream.write(stats.format() + '\n')
+
+    def _record_result(self, stats, result):
+        is_error = result.error is not None or not self.generator.is_status_code_allowed(
+            result.status_code, result.request.detail_url
+        )
+        stats.record(result.duration_ms, is_error)
@@ -0,0 +1,340 @@
+import hashlib
+import json
+import os
+import pickle
+import re
+
+import django
+from django.apps import apps
+from django.core.management import call_command
+from django.core.management.color import no_style
+from django.core.serializers.base import DeserializationError
+from django.core.serializers.python import Deserializer as PythonDeserializer
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models.signals import post_save
+
+from . import __version__
+from .cache import get_cache_dir, get_file_hash
+from .databases import get_schema_fingerprint
+
+CHUNK_SIZE = 500  # rows per pickled chunk and primary keys per query
+READ_SIZE = 1024 * 1024
+BATCH_SIZE = 1000  # objects kept in memory before they are inserted
+STREAMED_FIXTURE_EXTENSIONS = ('.json', '.jsonl')
+WHITESPACE_RE = re.compile(r'[\s,]*')
+
+
+class FixtureFormatNotSupported(Exception):
+    pass
+
+
+def _chunks(items, size=CHUNK_SIZE):
+    items = list(items)
+    for index in range(0, len(items), size):
+        yield items[index:index + size]
+
+
+class FixtureCache:
+    """
+    Stores rows created by `loaddata` for a fixture file, to insert them directly on later runs.
+
+    The cache is keyed by the content of the fixture, applied migrations and columns of models
+    (and versions of Django and django-smoke-tests), so it's never used with a different schema.
+    Rows are pickled in chunks, so neither saving nor restoring keeps the whole fixture in memory.
+    """
+
+    def __init__(self, fixture_path, using=DEFAULT_DB_ALIAS, cache_dir=None, stream=False):
+        self.fixture_path = fixture_path
+        self.using = using
+        self.stream = stream
+        self.cache_dir = os.path.join(cache_dir or get_cache_dir(), 'fixtures')
+        self.path_prefix = hashlib.sha1(os.path.abspath(fixture_path).encode()).hexdigest()
+        self._path = None
+
+    @property
+    def path(self):
+        if self._path is None:
+            key = hashlib.sha256('{};{};{};{}'.format(
+                get_file_hash(self.fixture_path),
+                get_schema_fingerprint(self.using),
+                __version__,
+                django.get_version(),
+            ).encode()).hexdigest()
+            self._path = os.path.join(self.cache_dir, '{}-{}.pickle'.format(self.path_prefix, key))
+        return self._path
+
+    def load_fixture(self):
+        """
+        Restores rows of the fixture from the cache, or loads the fixture and caches its rows.
+        """
+        if os.path.exists(self.path):
+            self.restore()
+        else:
+            self.save(self._load_fixture_with_tracking())
+
+    def _load_fixture_with_tracking(self):
+        """
+        Loads the fixture and returns {model: {primary_key,}} of objects saved by `loaddata`.
+        """
+        if self.stream:
+            return StreamingFixtureLoader(self.fixture_path, self.using).load()
+
+        loaded_objects = {}
+
+        def track_saved_object(sender, instance, raw=False, using=None, **kwargs):
+            if raw and using == self.using:
+                loaded_objects.setdefault(sender._meta.concrete_model, set()).add(instance.pk)
+
+        post_save.connect(track_saved_object, weak=False, dispatch_uid='smoke_tests_fixture_cache')
+        try:
+            call_command('loaddata', self.fixture_path, database=self.using, verbosity=0)
+        finally:
+            post_save.disconnect(dispatch_uid='smoke_tests_fixture_cache')
+        return loaded_objects
+
+    def _iter_chunks(self, loaded_objects):
+        """
+        Yields (model_label, filter_field, keys, columns, rows) chunks of rows created
+        by the fixture, including rows of auto-created many-to-many tables.
+        """
+        for model, primary_keys in loaded_objects.items():
+            tables = [(model, model._meta.pk.attname)]
+            for field in model._meta.many_to_many:
+                through = field.remote_field.through
+                if through._meta.auto_created:
+                    source_field = through._meta.get_field(field.m2m_field_name())
+                    tables.append((through, source_field.attname))
+
+            for table_model, filter_field in tables:
+                fields = table_model._meta.local_concrete_fields
+                columns = [field.attname for field in fields]
+                for keys in _chunks(primary_keys):
+                    rows = list(
+                        table_model._base_manager.using(self.using)
+                        .filter(**{'{}__in'.format(filter_field): keys})
+                        .values_list(*columns)
+                    )
+                    yield table_model._meta.label, filter_field, keys, columns, rows
+
+    def save(self, loaded_objects):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = '{}.{}.tmp'.format(self.path, os.getpid())
+        with open(tmp_path, 'wb') as f:
+            for chunk in self._iter_chunks(loaded_objects):
+                pickle.dump(chunk, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
+
+        # remove caches of previous versions of the fixture
+        for file_name in os.listdir(self.cache_dir):
+            file_path = os.path.join(self.cache_dir, file_name)
+            if file_name.startswith(self.path_prefix) and file_name.endswith('.pickle') \
+                    and file_path != self.path:
+                os.remove(file_path)
+
+    def restore(self):
+        connection = connections[self.using]
+        restored_models = {}
+        with open(self.path, 'rb') as f, connection.constraint_checks_disabled(), \
+                connection.cursor() as cursor:
+            while True:
+                try:
+                    model_label, filter_field, keys, columns, rows = pickle.load(f)
+                except EOFError:
+                    break
+                model = restored_models.setdefault(model_label, apps.get_model(model_label))
+                self._restore_rows(cursor, model, filter_field, keys, columns, rows)
+
+        sequence_sql = connection.ops.sequence_reset_sql(no_style(), list(restored_models.values()))
+        if sequence_sql:
+            with connection.cursor() as cursor:
+                for sql in sequence_sql:
+                    cursor.execute(sql)
+
+    def _restore_rows(self, cursor, model, filter_field, keys, columns, rows):
+        connection = connections[self.using]
+        # like loaddata, replace rows which already exist (eg. created by migrations)
+        model._base_manager.using(self.using).filter(
+            **{'{}__in'.format(filter_field): keys}
+        )._raw_delete(self.using)
+        if not rows:
+            return
+
+        fields = [
+            next(field for field in model._meta.local_concrete_fields if field.attname == column)
+            for column in columns
+        ]
+        sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+            connection.ops.quote_name(model._meta.db_table),
+            ', '.join(connection.ops.quote_name(field.column) for field in fields),
+            ', '.join(['%s'] * len(fields)),
+        )
+        cursor.executemany(sql, [
+            [field.get_db_prep_save(value, connection) for field, value in zip(fields, row)]
+            for row in rows
+        ])
+
+
+def iter_json_objects(path):
+    """
+    Yields objects of a JSON array or JSON lines file, reading the file in chunks.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, encoding='utf-8') as f:
+        if path.endswith('.jsonl'):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+            return
+
+        buffer = f.read(READ_SIZE).lstrip()
+        if not buffer.startswith('['):
+            raise FixtureFormatNotSupported('Fixture "{}" is not a JSON array.'.format(path))
+        position = 1
+        end_of_file = False
+        while True:
+            position = WHITESPACE_RE.match(buffer, position).end()
+            if buffer.startswith(']', position):
+                return
+            try:
+                obj, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if end_of_file:
+                    raise
+                # the object is not complete yet
+                chunk = f.read(READ_SIZE)
+                end_of_file = not chunk
+                buffer = buffer[position:] + chunk
+                position = 0
+                continue
+            yield obj
+
+
+def is_streamed_fixture(fixture_path):
+    return os.path.isfile(fixture_path) and fixture_path.endswith(STREAMED_FIXTURE_EXTENSIONS)
+
+
+def sort_by_dependencies(model_list):
+    """
+    Sorts models, so models referenced by foreign keys come before models referencing them.
+    """
+    sorted_models = []
+    visited = set()
+
+    def visit(model):
+        if model in visited:
+            return
+        visited.add(model)
+        for field in model._meta.concrete_fields:
+            related_model = field.related_model if field.is_relation else None
+            if related_model in model_list and related_model is not model:
+                visit(related_model)
+        sorted_models.append(model)
+
+    for model in model_list:
+        visit(model)
+    return sorted_models
+
+
+class StreamingFixtureLoader:
+    """
+    Loads a JSON (array) or JSON lines fixture without reading the whole file into memory.
+
+    Objects are deserialized one by one and inserted in batches with raw inserts (like
+    `loaddata`, without calling `pre_save()` of fields, eg. `auto_now`), models referenced
+    by foreign keys first.
+    Objects without a primary key and objects of multi-table inheritance models are saved
+    one by one. Signals are not sent for objects inserted in batches.
+    """
+
+    def __init__(self, fixture_path, using=DEFAULT_DB_ALIAS, batch_size=BATCH_SIZE):
+        self.fixture_path = fixture_path
+        self.using = using
+        self.batch_size = batch_size
+        self.pending_objects = {}  # {model: [deserialized_object,]}
+        self.pending_count = 0
+        self.loaded_objects = {}  # {model: {primary_key,}}
+
+    def load(self):
+        """
+        Loads the fixture and returns {model: {primary_key,}} of loaded objects.
+        """
+        connection = connections[self.using]
+        with transaction.atomic(using=self.using):
+            with connection.constraint_checks_disabled():
+                for obj in iter_json_objects(self.fixture_path):
+                    self.add(self._deserialize(obj))
+                self.flush()
+
+            table_names = [model._meta.db_table for model in self.loaded_objects]
+            connection.check_constraints(table_names=table_names)
+            sequence_sql = connection.ops.sequence_reset_sql(no_style(), list(self.loaded_objects))
+            if sequence_sql:
+                with connection.cursor() as cursor:
+                    for sql in sequence_sql:
+                        cursor.execute(sql)
+        return self.loaded_objects
+
+    def _deserialize(self, obj):
+        try:
+            [deserialized_object] = PythonDeserializer([obj], using=self.using)
+        except DeserializationError:
+            # the object may refer (with a natural key) to an object which is not inserted yet
+            self.flush()
+            [deserialized_object] = PythonDeserializer([obj], using=self.using)
+        return deserialized_object
+
+    def add(self, deserialized_object):
+        model = deserialized_object.object._meta.concrete_model
+        if deserialized_object.object.pk is None or model._meta.parents:
+            self.flush()  # saved objects may refer to pending objects
+            deserialized_object.save(using=self.using)
+            self._mark_as_loaded(model, [deserialized_object.object.pk])
+            return
+
+        self.pending_objects.setdefault(model, []).append(deserialized_object)
+        self.pending_count += 1
+        if self.pending_count >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        for model in sort_by_dependencies(list(self.pending_objects)):
+            self._insert(model, self.pending_objects[model])
+        self.pending_objects = {}
+        self.pending_count = 0
+
+    def _mark_as_loaded(self, model, primary_keys):
+        self.loaded_objects.setdefault(model, set()).update(primary_keys)
+
+    def _insert(self, model, deserialized_objects):
+        objs = [deserialized_object.object for deserialized_object in deserialized_objects]
+        primary_keys = [obj.pk for obj in objs]
+        manager = model._base_manager.using(self.using)
+
+        # like loaddata, replace rows which already exist (eg. created by migrations)
+        for keys in _chunks(primary_keys):
+            manager.filter(pk__in=keys)._raw_delete(self.using)
+        fields = model._meta.local_concrete_fields
+        batch_size = max(connections[self.using].ops.bulk_batch_size(fields, objs), 1)
+        for index in range(0, len(objs), batch_size):
+            manager._insert(
+                objs[index:index + batch_size], fields=fields, using=self.using, raw=True
+            )
+        self._mark_as_loaded(model, primary_keys)
+
+        for field in model._meta.many_to_many:
+            through = field.remote_field.through
+            if not through._meta.auto_created:
+                continue
+            source_field = through._meta.get_field(field.m2m_field_name()).attname
+            target_field = through._meta.get_field(field.m2m_reverse_field_name()).attname
+            for keys in _chunks(primary_keys):
+                through._base_manager.using(self.using).filter(
+                    **{'{}__in'.format(source_field): keys}
+                )._raw_delete(self.using)
+            through_objs = [
+                through(**{source_field: deserialized_object.object.pk, target_field: target_pk})
+                for deserialized_object in deserialized_objects
+                for target_pk in (deserialized_object.m2m_data or {}).get(field.name, [])
+            ]
+            if through_objs:
+                through._base_manager.using(self.using).bulk_create(through_objs)
@@ -1,19 +1,54 @@
+import cProfile
+import math
+import multiprocessing
+import os
+import sys
+import time
 import uuid
+from collections import defaultdict
+from contextlib import ExitStack
 
 from django.core.management import call_command
 from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
 from django.utils.regex_helper import normalize
 
 from django.urls import URLResolver
 from unittest import skip
 
-from .tests import SmokeTests
+from .baseline import SnapshotWriter, compare_snapshots, load_snapshot
+from .cache import UrlInventoryCache
+from .cases import SmokeRequest
+from .changes import ImportGraph, get_changed_files, get_module_name
+from .constants import (
+    ASYNC_ENGINE, AUTH_MODES, BUDGET_ACTIONS, ENGINES, FAIL_ON_BUDGET, PER_TEST_AUTH,
+    UNITTEST_ENGINE, WARN_ON_BUDGET,
+)
+from .memory import MemoryProfiler
+from .methods import get_implemented_http_methods
+from .parameters import UrlParametersResolver, get_view
+from .profiling import AGGREGATED_PROFILE_NAME, RequestProfiles, get_profile_dir
+from .queries import WriteQueriesDetector, find_repeated_queries
+from .reports import (
+    ERROR, FAILED, PASSED, SKIPPED, SummaryWriter, get_report_writer, get_response_size
+)
+from .selection import EndpointSelector
+from .sharding import load_durations, parse_shard, select_shard
+from .values import UrlValues
 
 
 def get_pattern(url_pattern):
     return str(url_pattern.pattern.regex.pattern)
 
 
+def get_view_modules(callback):
+    """
+    Returns names of modules of the view: of the callback and of the class of class-based views.
+    """
+    views = [callback, getattr(callback, 'view_class', None), getattr(callback, 'cls', None)]
+    return {view.__module__ for view in views if getattr(view, '__module__', None)}
+
+
 class HTTPMethodNotSupported(Exception):
     pass
 
@@ -26,31 +61,128 @@ class AppNotInInstalledApps(Exception):
     pass
 
 
+class ParallelExecutionNotSupported(Exception):
+    pass
+
+
 class SmokeTestsGenerator:
     SUPPORTED_HTTP_METHODS = ['GET', 'POST', 'PUT', 'DELETE']
+    SAFE_HTTP_METHODS = ['GET']
     ALLOWED_STATUS_CODES = [200, 201, 301, 302, 304, 405]
     DISALLOWED_STATUS_CODES = [500, 501, 502]
+    UNITTEST_ENGINE = UNITTEST_ENGINE
+    ASYNC_ENGINE = ASYNC_ENGINE
+    SUPPORTED_ENGINES = ENGINES
+    SUPPORTED_AUTH_MODES = AUTH_MODES
+    FAIL_ON_BUDGET = FAIL_ON_BUDGET
+    WARN_ON_BUDGET = WARN_ON_BUDGET
+    SUPPORTED_BUDGET_ACTIONS = BUDGET_ACTIONS
+    N_PLUS_ONE_MIN_REPEATS = 3  # identical SQL templates within one request to suspect N+1 problem
+    TOP_OFFENDERS_COUNT = 10
+    TOP_ALLOCATION_SITES_COUNT = 3  # listed for every endpoint with --profile-memory
+    COMPACT_CHUNK_SIZE = 500  # requests executed as subtests of one test with --compact
+    NOT_SUPPORTED_SKIP_REASON = 'Not supported'
+    SKIPPED_BY_SETTINGS_SKIP_REASON = 'Skipped in SKIP_SMOKE_TESTS'
+    NOT_PARSED_SKIP_REASON = 'URL could not be parsed'
+    NOT_IMPLEMENTED_SKIP_REASON = 'Method not implemented by the view (405 verified statically)'
 
     def __init__(
             self, http_methods=None, allowed_status_codes=None, disallowed_status_codes=None,
             use_db=True, app_names=None, disable_migrations=False, settings_module=None,
-            configuration=None, fixture_path=None
+            configuration=None, fixture_path=None, parallel=None, engine=None, concurrency=None,
+            cache_urls=False, auth_mode=None, max_latency_ms=None, budget_action=None,
+            count_queries=False, max_queries=None, changed_since=None, report=None,
+            save_baseline=None, compare_baseline=None, shared_db=False, cache_fixture=False,
+            stream_fixture=False, resolve_url_params=False, samples_per_url=None, compact=False,
+            repeat=None, base_url=None, profile_memory=False, max_memory_kb=None, profile_top=None,
+            list_tests=False, reuse_db=False, cache_schema=False,
+            skip_unimplemented_methods=False, include=None, exclude=None, shard=None,
+            shard_durations=None
     ):
         if http_methods:
             self.validate_custom_http_methods(http_methods)
         self.methods_to_test = http_methods or self.SUPPORTED_HTTP_METHODS
+        # methods which a class-based view doesn't handle are not requested, they would return 405
+        self.skip_unimplemented_methods = skip_unimplemented_methods
         self.allowed_status_codes = allowed_status_codes
         self.disallowed_status_codes = disallowed_status_codes
         self.use_db = use_db
         self.app_names = self.validate_app_names(app_names)
+        # include and exclude rules are "kind:value" strings, eg. "namespace:api", "name:user-*"
+        self.endpoint_selector = EndpointSelector(
+            include, exclude, self.app_names, getattr(settings, 'SKIP_SMOKE_TESTS', ())
+        )
         self.disable_migrations = disable_migrations
+        self.reuse_db = reuse_db  # test databases are kept between runs while their schema matches
+        self.cache_schema = cache_schema  # statements creating tables without migrations are cached
         self.settings_module = settings_module
         self.configuration = configuration
         self.fixture_path = fixture_path
+        self.cache_fixture = cache_fixture
+        self.stream_fixture = stream_fixture
+        self.samples_per_url = samples_per_url or 1
+        self.url_values = UrlValues(self.create_random_value)
+        self.url_parameters_resolver = (
+            UrlParametersResolver(self.samples_per_url) if resolve_url_params else None
+        )
+        # {url with random values: (url_as_str, {url_param: (source_key, field)}, sample)}
+        self.resolvable_urls = {}
         self.warnings = []
+        self.parallel = self.validate_parallel(parallel)
+        self.engine = engine or self.UNITTEST_ENGINE
+        self.concurrency = concurrency
+        self.compact = compact
+        self.repeat = repeat  # load test: every request is sent `repeat` times instead of tests
+        self.base_url = base_url  # requests are sent to a running server instead of tests
+        self.list_tests = list_tests  # tests are only listed, without running them
+        # (shard number, shards count), only tests of the shard are created
+        self.shard = parse_shard(shard) if shard else None
+        self.shard_durations = shard_durations  # a report of a previous run, to balance shards
+        # requests executed by the async engine, or by a few tests with --compact, instead of tests
+        # (or listed with --list, or collected before creating tests of the shard)
+        self.requests = []
+        self.cache_urls = cache_urls
+        self.auth_mode = auth_mode or PER_TEST_AUTH
+        self.max_latency_ms = max_latency_ms
+        self.budget_action = budget_action or self.FAIL_ON_BUDGET
+        # the slowest endpoints are listed after the tests when their latencies have budgets
+        self.summarize_latencies = (
+            max_latency_ms is not None or bool(self.get_latency_budget_overrides())
+        )
+        self.latencies = []  # [(http_method, url, url_name, latency_ms),]
+        self.count_queries = (
+            count_queries or max_queries is not None or bool(self.get_queries_budget_overrides())
+        )
+        self.max_queries = max_queries
+        self.query_counts = []  # [(http_method, url, url_name, query_count, repeated_queries),]
+        self.profile_memory = (
+            profile_memory or max_memory_kb is not None or bool(self.get_memory_budget_overrides())
+        )
+        self.max_memory_kb = max_memory_kb
+        self.memory_peaks = []  # [(http_method, url, url_name, peak_kb, [(site, size_bytes),]),]
+        self.request_profiles = RequestProfiles(profile_top) if profile_top else None
+        self.budget_warnings = []
+        self.changed_since = changed_since
+        # report is (report_format, path)
+        self.report_writer = get_report_writer(*report) if report else None
+        self.compare_baseline = compare_baseline
+        self.shared_db = shared_db
+        self.baseline_changes = []
+        self.snapshot_writer = (
+            SnapshotWriter(save_baseline) if save_baseline or compare_baseline else None
+        )
+        self.report_writers = [
+            writer for writer in (self.report_writer, self.snapshot_writer) if writer is not None
+        ]
+        # lists of the summary can't be updated by processes forked with --parallel
+        self.summary_writer = SummaryWriter() if self.parallel and self.parallel > 1 else None
 
         # TODO: consider simplifying the structure below or introducing type hints
         self.all_patterns = []  # [(url_pattern, lookup_str, url_name, url_namespace, app_name),]
+        # {url_pattern: (url_as_str, url_params) or None if not supported}
+        self.normalized_patterns = {}
+        # modules of URL confs and views, used to invalidate the URL cache
+        self.source_modules = set()
 
     def validate_custom_http_methods(self, http_methods):
         unsupported_methods = set(http_methods) - set(self.SUPPORTED_HTTP_METHODS)
@@ -66,65 +198,558 @@ class SmokeTestsGenerator:
                 raise AppNotInInstalledApps(app_name)
         return app_names
 
-    def _generate_test(self, url, method, detail_url=False):
-        def test(self_of_test):
-            http_method_function = getattr(self_of_test.client, method.lower(), None)
+    @staticmethod
+    def validate_parallel(parallel):
+        if parallel and parallel > 1 and multiprocessing.get_start_method() != 'fork':
+            # tests are attached to SmokeTests at runtime, only forked workers inherit them
+            raise ParallelExecutionNotSupported(
+                'Parallel execution requires the "fork" start method, '
+                'current method is "{}"'.format(multiprocessing.get_start_method())
+            )
+        return parallel
+
+    def is_status_code_allowed(self, status_code, detail_url=False):
+        additional_status_codes = [404] if detail_url else []
+
+        # Allowed codes take precedence
+        if self.allowed_status_codes:
+            return status_code in self.allowed_status_codes + additional_status_codes
+
+        # Disallowed codes are only considered if allowed codes are not specified
+        if self.disallowed_status_codes:
+            return status_code not in self.disallowed_status_codes
+
+        # Neither allowed_status_codes nor disallowed_status_codes has been provided,
+        # use a default rule
+        return status_code in [*self.ALLOWED_STATUS_CODES, *additional_status_codes]
+
+    @staticmethod
+    def get_latency_budget_overrides():
+        return getattr(settings, 'SMOKE_TESTS_MAX_LATENCY_MS', {})
+
+    def get_latency_budget(self, url_name):
+        return self.get_latency_budget_overrides().get(url_name, self.max_latency_ms)
+
+    @staticmethod
+    def get_queries_budget_overrides():
+        return getattr(settings, 'SMOKE_TESTS_MAX_QUERIES', {})
+
+    def get_queries_budget(self, url_name):
+        return self.get_queries_budget_overrides().get(url_name, self.max_queries)
+
+    @staticmethod
+    def get_memory_budget_overrides():
+        return getattr(settings, 'SMOKE_TESTS_MAX_MEMORY_KB', {})
+
+    def get_memory_budget(self, url_name):
+        return self.get_memory_budget_overrides().get(url_name, self.max_memory_kb)
+
+    def check_budgets(self, url, method, url_name, measurements):
+        """
+        Returns a description of exceeded budgets or None if the request fits into its budgets.
+        In the "warn" mode exceeded budgets are only collected and printed after the tests.
+        """
+        exceeded_budgets = []
+
+        latency_budget = self.get_latency_budget(url_name)
+        if latency_budget is not None and measurements['latency_ms'] > latency_budget:
+            exceeded_budgets.append('latency {:.1f} ms exceeds budget of {} ms'.format(
+                measurements['latency_ms'], latency_budget
+            ))
+
+        queries_budget = self.get_queries_budget(url_name)
+        if queries_budget is not None and measurements.get('query_count', 0) > queries_budget:
+            exceeded_budgets.append('{} queries exceed budget of {} queries'.format(
+                measurements['query_count'], queries_budget
+            ))
+
+        memory_budget = self.get_memory_budget(url_name)
+        if memory_budget is not None and measurements.get('memory_peak_kb', 0) > memory_budget:
+            exceeded_budgets.append('memory peak {:.1f} KB exceeds budget of {} KB'.format(
+                measurements['memory_peak_kb'], memory_budget
+            ))
+
+        if not exceeded_budgets:
+            return None
+
+        reason = ', '.join(exceeded_budgets)
+        if self.budget_action == self.WARN_ON_BUDGET:
+            self.add_to_summary('budget_warnings', '{} {} - {}'.format(method, url, reason))
+            return None
+        return reason
+
+    def send_request(self, client, method, url, databases=None):
+        """
+        Sends a request and returns the response together with measurements of the request.
+
+        Queries are captured only on `databases` (aliases), connecting to other databases
+        is not allowed in tests.
+        """
+        databases = databases or [DEFAULT_DB_ALIAS]
+        measurements = {}
+        count_queries = self.count_queries or bool(self.report_writers)
+        with ExitStack() as stack:
+            if count_queries:
+                from django.test.utils import CaptureQueriesContext
+                queries_contexts = [
+                    stack.enter_context(CaptureQueriesContext(connections[alias]))
+                    for alias in databases
+                ]
+            if self.uses_shared_db(method):
+                write_queries_detector = WriteQueriesDetector()
+                for alias in databases:
+                    stack.enter_context(connections[alias].execute_wrapper(write_queries_detector))
+                measurements['write_queries'] = write_queries_detector.write_queries
+            if self.profile_memory:
+                # tracing allocations slows down requests, latencies are higher than without it
+                memory_profiler = stack.enter_context(
+                    MemoryProfiler(self.TOP_ALLOCATION_SITES_COUNT)
+                )
+            http_method_function = getattr(client, method.lower(), None)
+            if self.request_profiles:
+                profile = measurements['profile'] = cProfile.Profile()
+                stack.callback(profile.disable)
+                profile.enable()
+            start = time.perf_counter()
             response = http_method_function(url, {})
-            additional_status_codes = [404] if detail_url else []
+            measurements['latency_ms'] = (time.perf_counter() - start) * 1000
 
-            # Allowed codes take precedence
-            if self.allowed_status_codes and (
-                response.status_code not in self.allowed_status_codes + additional_status_codes
-            ):
-                self_of_test.fail_test(url, method, response=response)
+        if self.profile_memory:
+            measurements['memory_peak_kb'] = memory_profiler.peak_kb
+            measurements['memory_top_sites'] = memory_profiler.top_sites
 
-            # Disallowed codes are only considered if allowed codes are not specified
-            elif not self.allowed_status_codes and self.disallowed_status_codes and (
-                response.status_code in self.disallowed_status_codes
-            ):
-                self_of_test.fail_test(url, method, response=response)
+        if count_queries:
+            measurements['queries'] = [
+                query['sql']
+                for queries_context in queries_contexts
+                for query in queries_context.captured_queries
+            ]
+            measurements['query_count'] = len(measurements['queries'])
+        return response, measurements
 
-            # Neither allowed_status_codes nor disallowed_status_codes has been provided, use a default rule
-            elif not self.allowed_status_codes and not self.disallowed_status_codes:
-                if response.status_code not in [*self.ALLOWED_STATUS_CODES, *additional_status_codes]:
-                    self_of_test.fail_test(url, method, response=response)
-        return test
+    def uses_shared_db(self, method):
+        return self.shared_db and method in self.SAFE_HTTP_METHODS
+
+    @staticmethod
+    def get_test_classes():
+        # imported on demand, listing tests and parsing options doesn't need django.test
+        from .tests import SharedDbSmokeTests, SmokeTests
+        return SmokeTests, SharedDbSmokeTests
+
+    def get_test_class(self, method):
+        smoke_tests_class, shared_db_smoke_tests_class = self.get_test_classes()
+        return shared_db_smoke_tests_class if self.uses_shared_db(method) else smoke_tests_class
 
     @staticmethod
-    def _generate_skipped_test():
-        @skip('Not supported')
+    def check_write_queries(measurements):
+        """
+        Returns a description of queries which modified the shared database, or None.
+        """
+        write_queries = measurements.get('write_queries')
+        if not write_queries:
+            return None
+        return 'request modified the shared database with {} queries, first: {}'.format(
+            len(write_queries), write_queries[0]
+        )
+
+    def record_measurements(self, url, method, url_name, measurements):
+        if self.summarize_latencies:
+            self.add_to_summary('latencies', (method, url, url_name, measurements['latency_ms']))
+        if self.request_profiles:
+            self.request_profiles.add(
+                measurements['profile'], measurements['latency_ms'], method, url, url_name
+            )
+        if self.profile_memory:
+            self.add_to_summary('memory_peaks', (
+                method, url, url_name,
+                measurements['memory_peak_kb'], measurements['memory_top_sites'],
+            ))
+        if self.count_queries:
+            self.add_to_summary('query_counts', (
+                method, url, url_name, measurements['query_count'],
+                find_repeated_queries(measurements['queries'], self.N_PLUS_ONE_MIN_REPEATS),
+            ))
+
+    def add_to_summary(self, name, item):
+        """
+        Appends the item to the list summarized after the tests (eg. query_counts).
+        Tests running in processes forked with --parallel send their items to the main process.
+        """
+        if self.summary_writer is not None and self.summary_writer.file is not None:
+            self.summary_writer.write([name, item])
+        else:
+            getattr(self, name).append(item)
+
+    def _load_summary(self):
+        for name, item in self.summary_writer.read():
+            getattr(self, name).append(item)
+
+    def report_result(
+            self, test_name, method, url, url_name, outcome, response=None, measurements=None,
+            skip_reason=None, message=None
+    ):
+        if not self.report_writers:
+            return
+        measurements = measurements or {}
+        self.write_report_record({
+            'test_name': test_name,
+            'method': method,
+            'url': url,
+            'url_name': url_name,
+            'outcome': outcome,
+            'status_code': response.status_code if response is not None else None,
+            'duration_ms': measurements.get('latency_ms'),
+            'query_count': measurements.get('query_count'),
+            'response_size': get_response_size(response) if response is not None else None,
+            'skip_reason': skip_reason,
+            'message': message,
+        })
+
+    def write_report_record(self, record):
+        for report_writer in self.report_writers:
+            report_writer.write(record)
+
+    def _generate_test(self, url, method, detail_url=False, url_name=None, test_name=None):
         def test(self_of_test):
-            pass
+            resolved_url = self.resolve_url(url, scope=type(self_of_test))
+            self.run_smoke_test(
+                self_of_test, test_name, method, resolved_url, detail_url, url_name
+            )
+        return test
 
+    def run_smoke_test(self, test_case, test_name, method, url, detail_url=False, url_name=None):
+        try:
+            response, measurements = self.send_request(
+                test_case.client, method, url, test_case._databases_names(include_mirrors=False)
+            )
+        except Exception as e:
+            self.report_result(test_name, method, url, url_name, ERROR, message=repr(e))
+            raise
+        self.record_measurements(url, method, url_name, measurements)
+
+        status_code_allowed = self.is_status_code_allowed(response.status_code, detail_url)
+        failure_reason = None
+        if status_code_allowed:
+            failure_reason = ', '.join(filter(None, [
+                self.check_budgets(url, method, url_name, measurements),
+                self.check_write_queries(measurements),
+            ])) or None
+
+        if status_code_allowed and not failure_reason:
+            self.report_result(test_name, method, url, url_name, PASSED, response, measurements)
+        else:
+            failure_message = failure_reason or 'status code {} is not allowed'.format(
+                response.status_code
+            )
+            self.report_result(
+                test_name, method, url, url_name, FAILED, response, measurements,
+                message=failure_message,
+            )
+
+        if not status_code_allowed:
+            test_case.fail_test(url, method, response=response)
+        if failure_reason:
+            test_case.fail_test(url, method, response=response, reason=failure_reason)
+
+    def resolve_url(self, url, scope=None):
+        """
+        Returns the URL with real values of URL parameters, if they can be resolved.
+        Otherwise returns the URL with random values.
+        404 stays allowed for detail URLs either way, objects may be hidden by views (eg. filtered
+        by permissions) or unrelated, when they are found independently for nested resources.
+        """
+        if url not in self.resolvable_urls:
+            return url
+
+        url_as_str, parameters, sample = self.resolvable_urls[url]
+        values = self.url_parameters_resolver.resolve(parameters, scope, sample)
+        if values is None:
+            return url  # there are no objects in the database
+        return self.create_url(url_as_str, values)
+
+    def _generate_skipped_test(self, skip_reason=None, test_name=None, method=None):
+        skip_reason = skip_reason or self.NOT_SUPPORTED_SKIP_REASON
+        if not self.report_writers:
+            @skip(skip_reason)
+            def test(self_of_test):
+                pass
+        else:
+            def test(self_of_test):
+                # the test has to run to report it, skip decorator would skip it before
+                self.skip_smoke_test(self_of_test, skip_reason, test_name, method)
+
+        return test
+
+    def skip_smoke_test(self, test_case, skip_reason, test_name, method):
+        self.report_result(test_name, method, None, None, SKIPPED, skip_reason=skip_reason)
+        test_case.skipTest(skip_reason)
+
+    def _generate_compact_test(self, requests):
+        def test(self_of_test):
+            self_of_test.run_cases(requests, self.run_smoke_request)
         return test
 
+    def run_smoke_request(self, test_case, request):
+        if request.skipped:
+            skip_reason = request.skip_reason or self.NOT_SUPPORTED_SKIP_REASON
+            self.skip_smoke_test(test_case, skip_reason, request.test_name, request.method)
+            return
+
+        url = self.resolve_url(request.url, scope=type(test_case))
+        self.run_smoke_test(
+            test_case, request.test_name, request.method, url, request.detail_url, request.url_name
+        )
+
+    def create_compact_tests(self):
+        """
+        Attaches the table of requests to test classes as a few tests, which execute chunks
+        of requests as subtests, instead of creating a test method for every request.
+        """
+        requests_by_class = defaultdict(list)
+        for request in sorted(self.requests, key=lambda request: request.test_name):
+            requests_by_class[self.get_test_class(request.method)].append(request)
+
+        for test_class, requests in requests_by_class.items():
+            # at least one chunk per process, so --parallel can split them
+            chunks_count = max(
+                math.ceil(len(requests) / self.COMPACT_CHUNK_SIZE),
+                min(self.parallel or 1, len(requests)),
+            )
+            chunk_size = math.ceil(len(requests) / chunks_count)
+            for index in range(chunks_count):
+                chunk = requests[index * chunk_size:(index + 1) * chunk_size]
+                test_name = 'test_smoke_cases_{:05d}'.format(index)
+                setattr(test_class, test_name, self._generate_compact_test(chunk))
+
     def execute(self):
-        self.load_all_endpoints(URLResolver(r'^/', settings.ROOT_URLCONF).url_patterns)
+        url_cache = UrlInventoryCache(settings.ROOT_URLCONF) if self.cache_urls else None
+        cached_url_inventory = url_cache.load() if url_cache else None
+        if cached_url_inventory:
+            self.all_patterns, self.normalized_patterns = cached_url_inventory
+        else:
+            self.source_modules.add(settings.ROOT_URLCONF)
+            self.load_all_endpoints(URLResolver(r'^/', settings.ROOT_URLCONF).url_patterns)
+
+        affected_view_modules = self.get_affected_view_modules() if self.changed_since else None
+
+        normalized_patterns_count = len(self.normalized_patterns)
         for url_pattern, lookup_str, url_name, url_namespace, app_name in self.all_patterns:
-            if not self.app_names or self.is_url_inside_specified_app(lookup_str):
-                self.create_tests_for_endpoint(url_pattern, url_name, url_namespace, app_name)
+            url_path = None
+            if self.endpoint_selector.matches_urls:
+                url_path = self.get_url_path(url_pattern)
+            if not self.endpoint_selector.is_selected(
+                url_path, lookup_str, url_name, url_namespace
+            ):
+                continue
+            if affected_view_modules is not None and (
+                get_module_name(lookup_str) not in affected_view_modules
+            ):
+                continue
+            self.create_tests_for_endpoint(
+                url_pattern, url_name, url_namespace, app_name, lookup_str=lookup_str
+            )
+
+        if url_cache and (
+            not cached_url_inventory or len(self.normalized_patterns) != normalized_patterns_count
+        ):
+            self._save_url_inventory(url_cache)
+
+        if self.shard:
+            self.select_shard()
+
+        if self.list_tests:
+            self._print_tests()
+            return
 
         if self.disable_migrations:
             self._disable_native_migrations()
 
-        self._set_fixture_path()
+        baseline = load_snapshot(self.compare_baseline) if self.compare_baseline else None
 
-        call_command_kwargs = self._get_call_command_kwargs()
-        call_command('test', 'django_smoke_tests', **call_command_kwargs)
+        for report_writer in self.report_writers:
+            report_writer.open()
+        try:
+            if self.executes_requests_directly():
+                self._execute_requests()
+                return
+
+            if self.compact:
+                self.create_compact_tests()
+            self._set_fixture_path()
+            self._set_auth_mode()
+
+            call_command_kwargs = self._get_call_command_kwargs()
+            if self.summary_writer:
+                self.summary_writer.open()
+            try:
+                call_command('test', 'django_smoke_tests', **call_command_kwargs)
+            finally:
+                if self.summary_writer:
+                    self._load_summary()
+                self._print_summary()
+        finally:
+            for report_writer in self.report_writers:
+                report_writer.close()
+            if baseline is not None:
+                self._compare_with_baseline(baseline)
+
+    def _compare_with_baseline(self, baseline):
+        try:
+            current = load_snapshot(self.snapshot_writer.snapshot_path)
+        finally:
+            self.snapshot_writer.discard()
+        self.baseline_changes = compare_snapshots(baseline, current)
+
+        if self.baseline_changes:
+            sys.stdout.write('\nChanges since the baseline:\n')
+            for test_name, description in self.baseline_changes:
+                sys.stdout.write('{} - {}\n'.format(test_name, description))
+        else:
+            sys.stdout.write('\nNo changes since the baseline.\n')
+
+    def _print_tests(self):
+        skipped = 0
+        for request in self.requests:
+            if request.skipped:
+                skipped += 1
+                sys.stdout.write('{} - skipped: {}\n'.format(
+                    request.test_name, request.skip_reason or self.NOT_SUPPORTED_SKIP_REASON
+                ))
+            else:
+                sys.stdout.write('{} - {} {}\n'.format(
+                    request.test_name, request.method, request.url
+                ))
+        sys.stdout.write('\nListed {} smoke tests, {} skipped\n'.format(
+            len(self.requests), skipped
+        ))
+
+    def _print_summary(self):
+        if self.budget_warnings:
+            sys.stdout.write('\nSome endpoints exceeded their budgets:\n')
+            sys.stdout.write('\n'.join(self.budget_warnings) + '\n')
+
+        if self.latencies:
+            top_offenders = sorted(
+                self.latencies, key=lambda latency: -latency[3]
+            )[:self.TOP_OFFENDERS_COUNT]
+            sys.stdout.write('\nSlowest endpoints:\n')
+            for method, url, url_name, latency_ms in top_offenders:
+                sys.stdout.write('{} {} - {:.1f} ms\n'.format(method, url, latency_ms))
+
+        if self.query_counts:
+            top_offenders = sorted(self.query_counts, key=lambda query_count: -query_count[3])
+            sys.stdout.write('\nEndpoints executing the most queries:\n')
+            for method, url, url_name, query_count, _ in top_offenders[:self.TOP_OFFENDERS_COUNT]:
+                sys.stdout.write('{} {} - {} queries\n'.format(method, url, query_count))
+
+        if self.memory_peaks:
+            top_offenders = sorted(
+                self.memory_peaks, key=lambda memory_peak: -memory_peak[3]
+            )[:self.TOP_OFFENDERS_COUNT]
+            sys.stdout.write('\nEndpoints allocating the most memory:\n')
+            for method, url, url_name, peak_kb, top_sites in top_offenders:
+                sys.stdout.write('{} {} - peak {:.1f} KB\n'.format(method, url, peak_kb))
+                for site, size_bytes in top_sites:
+                    sys.stdout.write('    {} - {:.1f} KB\n'.format(site, size_bytes / 1024))
+
+        if self.request_profiles and self.request_profiles.slowest:
+            profile_dir = get_profile_dir()
+            sys.stdout.write('\nProfiles of the slowest requests:\n')
+            for latency_ms, method, url, path in self.request_profiles.dump(profile_dir):
+                sys.stdout.write('{} {} - {:.1f} ms - {}\n'.format(method, url, latency_ms, path))
+            sys.stdout.write('Profile of all requests: {}\n'.format(
+                os.path.join(profile_dir, AGGREGATED_PROFILE_NAME)
+            ))
+
+        suspected_n_plus_one = [query_count for query_count in self.query_counts if query_count[4]]
+        if suspected_n_plus_one:
+            sys.stdout.write('\nSuspected N+1 queries:\n')
+            for method, url, url_name, _, repeated_queries in suspected_n_plus_one:
+                for sql_template, count in repeated_queries:
+                    sys.stdout.write('{} {} - {}x {}\n'.format(method, url, count, sql_template))
+
+    def get_affected_view_modules(self):
+        """
+        Returns modules of views which were changed (or import changed modules)
+        since `changed_since`.
+        """
+        changed_files = get_changed_files(self.changed_since)
+        view_modules = {get_module_name(lookup_str) for _, lookup_str, _, _, _ in self.all_patterns}
+        view_modules.discard(None)
+        return ImportGraph().get_affected_modules(view_modules, changed_files)
+
+    def _save_url_inventory(self, url_cache):
+        if url_cache.source_files is not None:
+            # patterns come from the cache, source files have not changed since they were saved
+            source_files = url_cache.source_files
+        else:
+            # URL confs may build patterns from any project module (eg. a router kept in its own
+            # module), so all loaded modules of the project are sources of the inventory
+            import_graph = ImportGraph()
+            loaded_files = {
+                module_name: getattr(module, '__file__', None)
+                for module_name, module in list(sys.modules.items())
+            }
+            source_files = {
+                module_file for module_name, module_file in loaded_files.items()
+                if module_file and module_name in self.source_modules
+            }
+            source_files.update(filter(import_graph.is_project_file, loaded_files.values()))
+        url_cache.save(self.all_patterns, self.normalized_patterns, source_files)
+
+    def executes_requests_directly(self):
+        """
+        Returns True when requests are executed by an engine, without creating unittest tests.
+        """
+        return self.engine == self.ASYNC_ENGINE or bool(self.repeat) or bool(self.base_url)
+
+    def _execute_requests(self):
+        from .engine import AsyncRequestEngine, LoadTestEngine
+        from .runners import NoDbTestRunner, SmokeTestRunner
+
+        test_runner_class = SmokeTestRunner if self.use_db else NoDbTestRunner
+        test_runner = test_runner_class(verbosity=0, interactive=False)
+        if self.repeat:
+            engine = LoadTestEngine(
+                self, test_runner, sys.stdout, self.concurrency, self.base_url, self.repeat
+            )
+        else:
+            engine = AsyncRequestEngine(
+                self, test_runner, sys.stdout, self.concurrency, self.base_url
+            )
+        failures = engine.run(self.requests)
+        if failures:
+            sys.exit(1)
 
-    @staticmethod
-    def _disable_native_migrations():
+    def _disable_native_migrations(self):
         from .migrations import DisableMigrations
         settings.MIGRATION_MODULES = DisableMigrations()
+        if self.cache_schema:
+            from .databases import enable_schema_cache
+            enable_schema_cache()
 
     def _set_fixture_path(self):
-        setattr(SmokeTests, 'fixture_path', self.fixture_path)
+        for test_class in self.get_test_classes():
+            setattr(test_class, 'fixture_path', self.fixture_path)
+            setattr(test_class, 'cache_fixture', self.cache_fixture)
+            setattr(test_class, 'stream_fixture', self.stream_fixture)
+
+    def _set_auth_mode(self):
+        for test_class in self.get_test_classes():
+            setattr(test_class, 'auth_mode', self.auth_mode)
 
     def _get_call_command_kwargs(self):
         kwargs = {}
 
         if not self.use_db:
             kwargs['testrunner'] = 'django_smoke_tests.runners.NoDbTestRunner'
+        elif self.reuse_db:
+            kwargs['testrunner'] = 'django_smoke_tests.runners.ReusableDbTestRunner'
+            kwargs['keepdb'] = True
+
+        if self.parallel and self.parallel > 1:
+            kwargs['parallel'] = self.parallel
+            kwargs.setdefault('testrunner', 'django_smoke_tests.runners.SmokeTestRunner')
 
         if self.settings_module:
             kwargs['settings'] = self.settings_module
@@ -134,15 +759,13 @@ class SmokeTestsGenerator:
 
         return kwargs
 
-    def is_url_inside_specified_app(self, lookup_str):
-        for app_name in self.app_names:
-            if lookup_str.startswith(app_name):
-                return True
-        return False
-
     def load_all_endpoints(self, url_list, parent_url=None, parent_namespace=None, app_name=None):
         for url_pattern in url_list:
             if hasattr(url_pattern, 'url_patterns'):
+                # URL confs included as lists of patterns have no module name
+                urlconf_module_name = getattr(url_pattern.urlconf_module, '__name__', None)
+                if urlconf_module_name:
+                    self.source_modules.add(urlconf_module_name)
                 self.load_all_endpoints(
                     url_pattern.url_patterns,
                     parent_url + get_pattern(url_pattern) if parent_url else get_pattern(url_pattern),
@@ -150,6 +773,7 @@ class SmokeTestsGenerator:
                     url_pattern.app_name,
                 )
             else:
+                self.source_modules.update(get_view_modules(url_pattern.callback))
                 self.all_patterns.append((
                     parent_url + get_pattern(url_pattern) if parent_url else get_pattern(url_pattern),
                     self.get_lookup_str(url_pattern),
@@ -162,40 +786,79 @@ class SmokeTestsGenerator:
     def get_lookup_str(url_pattern):
         return url_pattern.lookup_str
 
-    def create_tests_for_endpoint(self, url_pattern, url_name, url_namespace, app_name):
-        if self.is_endpoint_skipped(url_name, url_namespace, app_name):
-            self.create_tests_for_http_methods(None, url_pattern, skipped=True)
+    def create_tests_for_endpoint(
+            self, url_pattern, url_name, url_namespace, app_name, lookup_str=None
+    ):
+        if self.endpoint_selector.is_skipped(url_name, url_namespace, app_name):
+            self.create_tests_for_http_methods(
+                None, url_pattern, skipped=True, skip_reason=self.SKIPPED_BY_SETTINGS_SKIP_REASON
+            )
         else:
             try:
-                url_as_str, url_params = self.normalize_url_pattern(url_pattern)
+                url_as_str, url_params = self.get_normalized_url_pattern(url_pattern)
             except UrlStructureNotSupported:
                 self.warnings.append(
                     'Test skipped. URL << {} >> could not be parsed.'.format(
                         url_pattern
                     ))
-                self.create_tests_for_http_methods(None, url_pattern, skipped=True)
+                self.create_tests_for_http_methods(
+                    None, url_pattern, skipped=True, skip_reason=self.NOT_PARSED_SKIP_REASON
+                )
             else:
-                fake_params = {param: self.create_random_value() for param in url_params}
-                url = self.create_url(url_as_str, fake_params)
-                self.create_tests_for_http_methods(url, url_pattern, detail_url=bool(url_params))
-
-    @staticmethod
-    def is_endpoint_skipped(url_name, url_namespace, app_name):
+                # samples of URLs without parameters would be the same requests
+                samples = self.url_values.create_values(
+                    url_pattern, url_params, self.samples_per_url if url_params else 1
+                )
+                implemented_methods = None
+                for sample, fake_params in enumerate(samples):
+                    url = self.create_url(url_as_str, fake_params)
+                    if sample == 0 and lookup_str:
+                        implemented_methods = self.get_implemented_methods(
+                            lookup_str, url, detail_url=bool(url_params)
+                        )
+                    if self.url_parameters_resolver and url_params and lookup_str:
+                        parameters = self.url_parameters_resolver.register(
+                            url_name, lookup_str, url, url_params
+                        )
+                        if parameters:
+                            self.resolvable_urls[url] = (url_as_str, parameters, sample)
+                    self.create_tests_for_http_methods(
+                        url, url_pattern, detail_url=bool(url_params), url_name=url_name,
+                        sample=sample, implemented_methods=implemented_methods,
+                    )
+
+    def get_implemented_methods(self, lookup_str, url, detail_url=False):
+        """
+        Returns HTTP methods handled by the view of the URL,
+        or None if all methods should be tested.
+        Methods aren't skipped when 405 is not an allowed status code, their tests would fail.
+        """
+        if not self.skip_unimplemented_methods or not self.is_status_code_allowed(405, detail_url):
+            return None
+        return get_implemented_http_methods(get_view(lookup_str, url))
+
+    def get_url_path(self, url_pattern):
+        """
+        Returns the path of the URL with %(name)s placeholders of parameters,
+        or None if it can't be parsed.
+        """
         try:
-            if not url_name:
-                return False
+            url_as_str, _ = self.get_normalized_url_pattern(url_pattern)
+        except UrlStructureNotSupported:
+            return None
+        return url_as_str if url_as_str.startswith('/') else '/{}'.format(url_as_str)
 
-            url_name_with_namespace = f'{url_namespace}:{url_name}' if url_namespace else url_name
-            if url_name_with_namespace in settings.SKIP_SMOKE_TESTS:
-                return True
-
-            url_name_with_app_name = f'{app_name}:{url_name}' if app_name else url_name
-            if url_name_with_app_name in settings.SKIP_SMOKE_TESTS:
-                return True
+    def get_normalized_url_pattern(self, url_pattern):
+        if url_pattern not in self.normalized_patterns:
+            try:
+                self.normalized_patterns[url_pattern] = self.normalize_url_pattern(url_pattern)
+            except UrlStructureNotSupported:
+                self.normalized_patterns[url_pattern] = None
 
-            return url_name and url_name in settings.SKIP_SMOKE_TESTS
-        except AttributeError:
-            return False
+        normalized = self.normalized_patterns[url_pattern]
+        if normalized is None:
+            raise UrlStructureNotSupported
+        return normalized
 
     @staticmethod
     def normalize_url_pattern(url_pattern):
@@ -226,22 +889,67 @@ class SmokeTestsGenerator:
         url = url_as_str % parameters
         return url if url.startswith('/') else '/{}'.format(url)
 
-    def create_tests_for_http_methods(self, url, url_pattern, detail_url=False, skipped=False):
+    def create_tests_for_http_methods(
+            self, url, url_pattern, detail_url=False, skipped=False, url_name=None,
+            skip_reason=None, sample=0, implemented_methods=None
+    ):
         for method in self.methods_to_test:
-            self.create_test_for_http_method(method, url, url_pattern, detail_url, skipped)
+            if not skipped and implemented_methods is not None and (
+                method not in implemented_methods
+            ):
+                self.create_test_for_http_method(
+                    method, url, url_pattern, detail_url, True, url_name,
+                    self.NOT_IMPLEMENTED_SKIP_REASON, sample,
+                )
+                continue
+            self.create_test_for_http_method(
+                method, url, url_pattern, detail_url, skipped, url_name, skip_reason, sample
+            )
 
     def create_test_for_http_method(
-            self, method, url, url_pattern=None, detail_url=False, skipped=False
+            self, method, url, url_pattern=None, detail_url=False, skipped=False, url_name=None,
+            skip_reason=None, sample=0
     ):
-        if skipped:
-            test = self._generate_skipped_test()
-        else:
-            test = self._generate_test(url, method, detail_url)
-
         if not url_pattern:
             url_pattern = url  # url and url_pattern are the same when there are no URL parameters
-        setattr(SmokeTests, self.create_test_name(method, url_pattern), test)
+        test_name = self.create_test_name(method, url_pattern, sample)
+
+        request = SmokeRequest(test_name, method, url, detail_url, skipped, url_name, skip_reason)
+        if self.shard or not self.creates_tests():
+            self.requests.append(request)
+        else:
+            self.create_test(request)
+
+    def creates_tests(self):
+        """
+        Returns True when a test method is created for every request.
+        """
+        return not (self.list_tests or self.compact or self.executes_requests_directly())
+
+    def create_test(self, request):
+        if request.skipped:
+            test = self._generate_skipped_test(
+                request.skip_reason, request.test_name, request.method
+            )
+        else:
+            test = self._generate_test(
+                request.url, request.method, request.detail_url, request.url_name, request.test_name
+            )
+        setattr(self.get_test_class(request.method), request.test_name, test)
+
+    def select_shard(self):
+        """
+        Keeps only requests of the shard and creates their tests.
+        All nodes generate the same requests, so each of them selects a different part.
+        """
+        durations = load_durations(self.shard_durations) if self.shard_durations else None
+        self.requests = select_shard(self.requests, *self.shard, durations=durations)
+        if self.creates_tests():
+            for request in self.requests:
+                self.create_test(request)
+            self.requests = []
 
     @staticmethod
-    def create_test_name(method, url_pattern):
-        return 'test_smoke_{}_{}'.format(method, url_pattern)
+    def create_test_name(method, url_pattern, sample=0):
+        test_name = 'test_smoke_{}_{}'.format(method, url_pattern)
+        return '{}_sample{}'.format(test_name, sample) if sample else test_name
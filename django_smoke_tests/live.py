@@ -0,0 +1,111 @@
+import http.client
+import threading
+from collections import namedtuple
+from urllib.parse import urlsplit
+
+from django.conf import settings
+
+LiveServerResponse = namedtuple('LiveServerResponse', ['status_code', 'content'])
+
+
+class InvalidBaseUrl(Exception):
+    pass
+
+
+def validate_base_url(base_url):
+    parsed_url = urlsplit(base_url)
+    if parsed_url.scheme not in LiveServerClient.CONNECTION_CLASSES or not parsed_url.hostname:
+        raise InvalidBaseUrl('Base URL must be an http(s) URL, got "{}"'.format(base_url))
+    return parsed_url
+
+
+def get_live_server_headers():
+    """
+    Returns headers sent with every request to the live server, eg. {'Cookie': 'sessionid=...'}.
+    """
+    return getattr(settings, 'SMOKE_TESTS_LIVE_SERVER_HEADERS', {})
+
+
+class LiveServerClient:
+    """
+    Sends requests to a running server, with the interface of the test client
+    (get, post, put, delete).
+
+    Every thread keeps its own keep-alive connection, so a pool of threads reuses a pool
+    of connections of the same size. Connections closed by the server are reopened.
+    """
+    CONNECTION_CLASSES = {
+        'http': http.client.HTTPConnection,
+        'https': http.client.HTTPSConnection,
+    }
+
+    def __init__(self, base_url, headers=None, timeout=30):
+        parsed_url = validate_base_url(base_url)
+        self.connection_class = self.CONNECTION_CLASSES[parsed_url.scheme]
+        self.netloc = parsed_url.netloc
+        self.path_prefix = parsed_url.path.rstrip('/')
+        self.headers = dict(get_live_server_headers() if headers is None else headers)
+        self.timeout = timeout
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def get(self, path, data=None):
+        return self.request('GET', path)
+
+    def post(self, path, data=None):
+        return self.request('POST', path, b'')
+
+    def put(self, path, data=None):
+        return self.request('PUT', path, b'')
+
+    def delete(self, path, data=None):
+        return self.request('DELETE', path)
+
+    def request(self, method, path, body=None):
+        connection = getattr(self._local, 'connection', None)
+        reused = connection is not None
+        if connection is None:
+            connection = self._connect()
+
+        try:
+            response = self._send(connection, method, path, body)
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            self._disconnect(connection)
+            if not reused:
+                raise
+            # the server closed an idle keep-alive connection, retry with a new one
+            connection = self._connect()
+            response = self._send(connection, method, path, body)
+        except Exception:
+            self._disconnect(connection)
+            raise
+
+        content = response.read()  # the whole response has to be read to reuse the connection
+        if response.will_close:
+            self._disconnect(connection)
+        return LiveServerResponse(response.status, content)
+
+    def _send(self, connection, method, path, body):
+        connection.request(method, self.path_prefix + path, body=body, headers=self.headers)
+        return connection.getresponse()
+
+    def _connect(self):
+        connection = self.connection_class(self.netloc, timeout=self.timeout)
+        self._local.connection = connection
+        with self._lock:
+            self._connections.append(connection)
+        return connection
+
+    def _disconnect(self, connection):
+        connection.close()
+        self._local.connection = None
+        with self._lock:
+            if connection in self._connections:
+                self._connections.remove(connection)
+
+    def close(self):
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            connection.close()
@@ -4,7 +4,13 @@ import os
 from django.core.management import BaseCommand, CommandParser
 from django.core.management.base import CommandError
 
-from ...generator import SmokeTestsGenerator
+from ...baseline import BaselineNotAvailable
+from ...changes import ChangedFilesNotAvailable
+from ...constants import ASYNC_ENGINE, AUTH_MODES, BUDGET_ACTIONS, ENGINES, UNITTEST_ENGINE
+from ...live import InvalidBaseUrl, validate_base_url
+from ...reports import REPORT_FORMATS
+from ...selection import InvalidSelectionRule
+from ...sharding import DurationsNotAvailable, InvalidShard
 
 
 class Command(BaseCommand):
@@ -48,6 +54,31 @@ class Command(BaseCommand):
             dest='get_only',
             help='shortcut for --http-methods GET'
         )
+        parser.add_argument(
+            '--skip-unimplemented-methods',
+            dest='skip_unimplemented_methods',
+            action='store_true',
+            help='flag for skipping HTTP methods which class-based views don\'t implement, '
+                 'they are reported as skipped instead of requested for 405'
+        )
+        parser.set_defaults(skip_unimplemented_methods=False)
+        parser.add_argument(
+            '--include',
+            action='append',
+            default=None,
+            metavar='RULE',
+            help='rule selecting endpoints to test, can be repeated: app:<app name>, '
+                 'namespace:<namespace>, name:<URL name glob>, view:<dotted path of views>, '
+                 'url:<regex of URL path>, eg. --include namespace:api --include name:user-*'
+        )
+        parser.add_argument(
+            '--exclude',
+            action='append',
+            default=None,
+            metavar='RULE',
+            help='rule excluding endpoints from testing (no tests are created), can be repeated, '
+                 'accepts the same rules as --include'
+        )
         parser.add_argument(
             '--allow-status-codes',
             default=None,
@@ -80,6 +111,18 @@ class Command(BaseCommand):
                 'Django fixture JSON file to be loaded before executing smoke tests'
             ),
         )
+        parser.add_argument(
+            '--cache-fixture',
+            action='store_true',
+            help='flag for caching rows created by the fixture and inserting them directly '
+                 'on later runs, instead of loading the fixture again'
+        )
+        parser.add_argument(
+            '--stream-fixture',
+            action='store_true',
+            help='flag for loading a JSON or JSON lines fixture incrementally and inserting '
+                 'objects in batches, instead of using loaddata'
+        )
         parser.add_argument(
             '--no-migrations',
             dest='no_migrations',
@@ -87,6 +130,22 @@ class Command(BaseCommand):
             help='flag for skipping migrations, database will be created directly from models'
         )
         parser.set_defaults(no_migrations=False)
+        parser.add_argument(
+            '--cache-schema',
+            dest='cache_schema',
+            action='store_true',
+            help='flag for caching SQL statements creating tables with --no-migrations '
+                 'and executing them in one batch on later runs'
+        )
+        parser.set_defaults(cache_schema=False)
+        parser.add_argument(
+            '--reuse-db',
+            dest='reuse_db',
+            action='store_true',
+            help='flag for keeping the test database between runs, it is rebuilt only when '
+                 'migrations or models change'
+        )
+        parser.set_defaults(reuse_db=False)
         parser.add_argument(
             '--no-db',
             dest='no_db',
@@ -94,6 +153,191 @@ class Command(BaseCommand):
             help='flag for skipping database creation'
         )
         parser.set_defaults(no_db=False)
+        parser.add_argument(
+            '--parallel',
+            default=None,
+            type=int,
+            help='number of processes the smoke tests will be split across, '
+                 'each process uses its own copy of the test database'
+        )
+        parser.add_argument(
+            '--engine',
+            default=UNITTEST_ENGINE,
+            choices=ENGINES,
+            help='"unittest" creates a test for every endpoint and HTTP method, '
+                 '"async" sends requests directly to the ASGI handler and only checks status codes '
+                 '(intended for --get-only runs, requests are not isolated in transactions) '
+                 '[default: unittest]'
+        )
+        parser.add_argument(
+            '--concurrency',
+            default=None,
+            type=int,
+            help='maximum number of requests executed at once by the async engine '
+                 'or by --repeat [default: 10]'
+        )
+        parser.add_argument(
+            '--cache-urls',
+            dest='cache_urls',
+            action='store_true',
+            help='flag for caching collected URL patterns on disk, '
+                 'the cache is refreshed when URL confs or views are modified'
+        )
+        parser.set_defaults(cache_urls=False)
+        parser.add_argument(
+            '--auth-mode',
+            default=None,
+            choices=AUTH_MODES,
+            help='"per-test" logs the smoke user in before every test, '
+                 '"per-class" logs in once and reuses the session cookie, '
+                 '"anonymous" sends requests without creating the smoke user [default: per-test]'
+        )
+        parser.add_argument(
+            '--max-latency-ms',
+            default=None,
+            type=float,
+            help='maximum response time of an endpoint in milliseconds, '
+                 'can be overridden per URL name with SMOKE_TESTS_MAX_LATENCY_MS setting'
+        )
+        parser.add_argument(
+            '--count-queries',
+            dest='count_queries',
+            action='store_true',
+            help='flag for counting database queries of every request, endpoints executing '
+                 'the most queries and suspected N+1 queries are listed after the tests'
+        )
+        parser.set_defaults(count_queries=False)
+        parser.add_argument(
+            '--max-queries',
+            default=None,
+            type=int,
+            help='maximum number of database queries executed by an endpoint '
+                 '(implies --count-queries), can be overridden per URL name '
+                 'with SMOKE_TESTS_MAX_QUERIES setting'
+        )
+        parser.add_argument(
+            '--budget-action',
+            default=None,
+            choices=BUDGET_ACTIONS,
+            help='"fail" fails tests of endpoints exceeding their budgets, '
+                 '"warn" only lists them after the tests [default: fail]'
+        )
+        parser.add_argument(
+            '--changed-since',
+            default=None,
+            help='test only endpoints whose views (or modules imported by them) changed since '
+                 'the given git reference, eg. origin/master, use "-" to read changed file paths '
+                 'from the standard input'
+        )
+        parser.add_argument(
+            '--report',
+            nargs=2,
+            metavar=('{%s}' % ','.join(REPORT_FORMATS), 'PATH'),
+            default=None,
+            help='write a result of every test to the file as soon as the test completes, '
+                 'as JSON lines or JUnit XML, with a status code, a duration, a number of queries, '
+                 'a size of the response and a reason of skipping'
+        )
+        parser.add_argument(
+            '--save-baseline',
+            default=None,
+            metavar='PATH',
+            help='save status codes, latencies and numbers of queries of all tests to the file'
+        )
+        parser.add_argument(
+            '--compare-baseline',
+            default=None,
+            metavar='PATH',
+            help='compare results with a baseline saved with --save-baseline and list changed '
+                 'status codes and regressions of latencies and numbers of queries, thresholds '
+                 'can be set with SMOKE_TESTS_BASELINE_THRESHOLDS setting'
+        )
+        parser.add_argument(
+            '--shared-db',
+            action='store_true',
+            help='flag for running GET requests against one database state, without a transaction '
+                 'per test, requests modifying the database fail, other methods stay isolated'
+        )
+        parser.add_argument(
+            '--resolve-url-params',
+            action='store_true',
+            help='flag for using values of URL parameters (eg. primary keys) of existing objects, '
+                 'models are taken from views or SMOKE_TESTS_URL_PARAMETER_MODELS setting'
+        )
+        parser.add_argument(
+            '--samples-per-url',
+            default=None,
+            type=int,
+            help='number of tests created for every URL with parameters, each with different '
+                 'values of parameters (generated for their path converters, or taken from '
+                 'different objects with --resolve-url-params) [default: 1]'
+        )
+        parser.add_argument(
+            '--compact',
+            action='store_true',
+            help='flag for keeping a table of requests and running them as subtests of a few '
+                 'tests, instead of creating a test method for every endpoint and HTTP method, '
+                 'every request is still reported separately and rolled back'
+        )
+        parser.add_argument(
+            '--repeat',
+            default=None,
+            type=int,
+            help='load test: send every request the given number of times (up to --concurrency '
+                 'at a time) instead of running tests, and list latency percentiles (p50, p95, '
+                 'p99), throughput and an error rate of every endpoint'
+        )
+        parser.add_argument(
+            '--base-url',
+            default=None,
+            help='send requests to a running server, eg. http://127.0.0.1:8000, instead of '
+                 'running tests, with up to --concurrency keep-alive connections, '
+                 'headers (eg. a session cookie) can be set with SMOKE_TESTS_LIVE_SERVER_HEADERS'
+        )
+        parser.add_argument(
+            '--profile-memory',
+            action='store_true',
+            help='flag for tracing memory allocated by every request, endpoints with the highest '
+                 'peaks are listed after the tests with sites allocating the most memory'
+        )
+        parser.add_argument(
+            '--max-memory-kb',
+            default=None,
+            type=int,
+            help='maximum peak of memory allocated by an endpoint in KB '
+                 '(implies --profile-memory), can be overridden per URL name '
+                 'with SMOKE_TESTS_MAX_MEMORY_KB setting'
+        )
+        parser.add_argument(
+            '--profile-top',
+            default=None,
+            type=int,
+            help='profile every request with cProfile and save .pstats files of the given number '
+                 'of the slowest requests and of all requests to SMOKE_TESTS_PROFILE_DIR '
+                 '[default: smoke_tests_profiles]'
+        )
+        parser.add_argument(
+            '--shard',
+            default=None,
+            metavar='I/N',
+            help='run only the I-th of N parts of smoke tests, eg. 2/4, every CI node '
+                 'gets the same parts'
+        )
+        parser.add_argument(
+            '--shard-durations',
+            default=None,
+            metavar='PATH',
+            help='report of a previous run (--report jsonl or junit, or --save-baseline), '
+                 'shards are balanced by durations of tests instead of their numbers'
+        )
+        parser.add_argument(
+            '--list',
+            dest='list_tests',
+            action='store_true',
+            help='flag for listing the smoke tests (HTTP methods and URLs) without running them, '
+                 'the test database is not created'
+        )
+        parser.set_defaults(list_tests=False)
         parser.add_argument(
             'app_names',
             default=None,
@@ -109,11 +353,43 @@ class Command(BaseCommand):
         allowed_status_codes = self._get_list_from_string(options.get('allow_status_codes'))
         disallowed_status_codes = self._get_list_from_string(options.get('disallow_status_codes'))
         disable_migrations = options.get('no_migrations')
+        reuse_db = options.get('reuse_db')
+        cache_schema = options.get('cache_schema')
+        skip_unimplemented_methods = options.get('skip_unimplemented_methods')
+        include = options.get('include')
+        exclude = options.get('exclude')
         use_db = not options.get('no_db')
         app_names = self._get_list_from_string(options.get('app_names'))
         settings_module = options.get('settings')
         configuration = options.get('configuration')
         fixture_path = options.get('fixture')
+        cache_fixture = options.get('cache_fixture')
+        stream_fixture = options.get('stream_fixture')
+        resolve_url_params = options.get('resolve_url_params')
+        samples_per_url = options.get('samples_per_url')
+        compact = options.get('compact')
+        repeat = options.get('repeat')
+        base_url = options.get('base_url')
+        profile_memory = options.get('profile_memory')
+        max_memory_kb = options.get('max_memory_kb')
+        profile_top = options.get('profile_top')
+        shard = options.get('shard')
+        shard_durations = options.get('shard_durations')
+        list_tests = options.get('list_tests')
+        parallel = options.get('parallel')
+        engine = options.get('engine')
+        concurrency = options.get('concurrency')
+        cache_urls = options.get('cache_urls')
+        auth_mode = options.get('auth_mode')
+        max_latency_ms = options.get('max_latency_ms')
+        budget_action = options.get('budget_action')
+        count_queries = options.get('count_queries')
+        max_queries = options.get('max_queries')
+        changed_since = options.get('changed_since')
+        report = options.get('report')
+        save_baseline = options.get('save_baseline')
+        compare_baseline = options.get('compare_baseline')
+        shared_db = options.get('shared_db')
 
         if allowed_status_codes and disallowed_status_codes:
             raise CommandError(
@@ -121,18 +397,112 @@ class Command(BaseCommand):
                 'You must not specify both.'
             )
 
-        generator = SmokeTestsGenerator(
-            http_methods=methods_to_test,
-            allowed_status_codes=allowed_status_codes,
-            disallowed_status_codes=disallowed_status_codes,
-            use_db=use_db,
-            app_names=app_names,
-            disable_migrations=disable_migrations,
-            settings_module=settings_module,
-            configuration=configuration,
-            fixture_path=fixture_path,
-        )
-        generator.execute()
+        if base_url:
+            try:
+                validate_base_url(base_url)
+            except InvalidBaseUrl as e:
+                raise CommandError(str(e))
+
+        if cache_schema and not disable_migrations:
+            # tables are created from migrations, there are no statements to cache
+            raise CommandError('--cache-schema can\'t be used without --no-migrations.')
+
+        if reuse_db and (engine == ASYNC_ENGINE or repeat):
+            # changes of requests sent by engines are not rolled back, they would be kept too
+            raise CommandError('--reuse-db can\'t be used with --engine async or --repeat.')
+
+        if engine == ASYNC_ENGINE or repeat or base_url:
+            # requests sent by engines are not measured like tests, the options would be ignored
+            options_of_tests = [
+                option for option, is_set in [
+                    ('--max-latency-ms', max_latency_ms is not None),
+                    ('--count-queries', count_queries),
+                    ('--max-queries', max_queries is not None),
+                    ('--profile-memory', profile_memory),
+                    ('--max-memory-kb', max_memory_kb is not None),
+                    ('--profile-top', profile_top is not None),
+                ] if is_set
+            ]
+            if options_of_tests:
+                raise CommandError(
+                    '{} can\'t be used with --engine async, --repeat or --base-url.'.format(
+                        ', '.join(options_of_tests)
+                    )
+                )
+
+        if profile_top is not None and profile_top < 1:
+            raise CommandError('--profile-top must be a positive number.')
+
+        if profile_top and parallel and parallel > 1:
+            # profiles are kept by processes forked with --parallel, they can't be saved
+            raise CommandError('--profile-top can\'t be used with --parallel.')
+
+        if repeat is not None and repeat < 1:
+            raise CommandError('--repeat must be a positive number.')
+
+        if samples_per_url is not None and samples_per_url < 1:
+            raise CommandError('--samples-per-url must be a positive number.')
+
+        if report and report[0] not in REPORT_FORMATS:
+            raise CommandError(
+                'Report format must be one of: {}.'.format(
+                    ', '.join(REPORT_FORMATS)
+                )
+            )
+
+        # imported on demand, so --help doesn't import test cases, test runners and engines
+        from ...generator import ParallelExecutionNotSupported, SmokeTestsGenerator
+
+        try:
+            generator = SmokeTestsGenerator(
+                http_methods=methods_to_test,
+                allowed_status_codes=allowed_status_codes,
+                disallowed_status_codes=disallowed_status_codes,
+                use_db=use_db,
+                app_names=app_names,
+                disable_migrations=disable_migrations,
+                settings_module=settings_module,
+                configuration=configuration,
+                fixture_path=fixture_path,
+                parallel=parallel,
+                engine=engine,
+                concurrency=concurrency,
+                cache_urls=cache_urls,
+                auth_mode=auth_mode,
+                max_latency_ms=max_latency_ms,
+                budget_action=budget_action,
+                count_queries=count_queries,
+                max_queries=max_queries,
+                changed_since=changed_since,
+                report=report,
+                save_baseline=save_baseline,
+                compare_baseline=compare_baseline,
+                shared_db=shared_db,
+                cache_fixture=cache_fixture,
+                stream_fixture=stream_fixture,
+                resolve_url_params=resolve_url_params,
+                samples_per_url=samples_per_url,
+                compact=compact,
+                repeat=repeat,
+                base_url=base_url,
+                profile_memory=profile_memory,
+                max_memory_kb=max_memory_kb,
+                profile_top=profile_top,
+                list_tests=list_tests,
+                reuse_db=reuse_db,
+                cache_schema=cache_schema,
+                skip_unimplemented_methods=skip_unimplemented_methods,
+                include=include,
+                exclude=exclude,
+                shard=shard,
+                shard_durations=shard_durations,
+            )
+            generator.execute()
+        except (
+                BaselineNotAvailable, ChangedFilesNotAvailable, InvalidSelectionRule, InvalidShard,
+                DurationsNotAvailable, ParallelExecutionNotSupported,
+        ) as e:
+            raise CommandError(str(e))
 
         if generator.warnings:
             self.stdout.write(
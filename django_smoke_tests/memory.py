@@ -0,0 +1,69 @@
+import os
+import tracemalloc
+
+# allocations of tracemalloc itself and of this module are not attributed to endpoints
+IGNORED_TRACES = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, os.path.splitext(__file__)[0] + '.py*'),
+]
+
+
+class MemoryProfiler:
+    """
+    Measures memory allocated by the code executed inside the context:
+    the peak of traced memory and the sites (file:line) allocating the most of the memory
+    still allocated at the end.
+
+    Tracing is started and stopped by the profiler, unless it was started before
+    (eg. with PYTHONTRACEMALLOC), then only allocations made inside the context are compared.
+    """
+
+    def __init__(self, top_sites_count=5):
+        self.top_sites_count = top_sites_count
+        self.peak_bytes = None
+        self.top_sites = []  # [(file:line, size in bytes),]
+        self._was_tracing = False
+        self._snapshot_before = None
+        self._traced_before = 0
+
+    def __enter__(self):
+        self._was_tracing = tracemalloc.is_tracing()
+        if self._was_tracing:
+            self._snapshot_before = tracemalloc.take_snapshot().filter_traces(IGNORED_TRACES)
+            if hasattr(tracemalloc, 'reset_peak'):
+                # reset_peak() available from Python 3.9, the peak is global before
+                tracemalloc.reset_peak()
+            self._traced_before = tracemalloc.get_traced_memory()[0]
+        else:
+            tracemalloc.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        peak_bytes = tracemalloc.get_traced_memory()[1]
+        snapshot = tracemalloc.take_snapshot().filter_traces(IGNORED_TRACES)
+        if self._was_tracing:
+            statistics = [
+                (statistic.traceback, statistic.size_diff)
+                for statistic in snapshot.compare_to(self._snapshot_before, 'lineno')
+            ]
+            self.peak_bytes = max(peak_bytes - self._traced_before, 0)
+        else:
+            tracemalloc.stop()
+            statistics = [
+                (statistic.traceback, statistic.size) for statistic in snapshot.statistics('lineno')
+            ]
+            self.peak_bytes = peak_bytes
+
+        top_statistics = sorted(
+            (statistic for statistic in statistics if statistic[1] > 0),
+            key=lambda statistic: -statistic[1],
+        )[:self.top_sites_count]
+        self.top_sites = [
+            ('{}:{}'.format(traceback[0].filename, traceback[0].lineno), size)
+            for traceback, size in top_statistics
+        ]
+        return False
+
+    @property
+    def peak_kb(self):
+        return self.peak_bytes / 1024 if self.peak_bytes is not None else None
@@ -0,0 +1,40 @@
+# classes with dispatch() which returns 405 for HTTP methods without handlers, (module, name)
+DEFAULT_DISPATCH_CLASSES = {
+    ('django.views.generic.base', 'View'),
+    ('rest_framework.views', 'APIView'),
+}
+VIEWSET_CLASS = ('rest_framework.viewsets', 'ViewSetMixin')
+
+
+def _get_class_names(view_class):
+    return {(klass.__module__, klass.__name__) for klass in view_class.__mro__}
+
+
+def get_implemented_http_methods(view):
+    """
+    Returns HTTP methods (upper case) handled by a class-based view (Django CBV, DRF APIView,
+    @api_view or ViewSet), or None if they can't be determined, eg. for function views
+    or views with a custom dispatch().
+    """
+    if isinstance(view, type):
+        view_class, initkwargs, actions = view, {}, None
+    else:
+        view_class = getattr(view, 'view_class', None) or getattr(view, 'cls', None)
+        initkwargs = (
+            getattr(view, 'view_initkwargs', None) or getattr(view, 'initkwargs', None) or {}
+        )
+        actions = getattr(view, 'actions', None)
+    if view_class is None:
+        return None
+
+    dispatch_class = next(klass for klass in view_class.__mro__ if 'dispatch' in vars(klass))
+    if (dispatch_class.__module__, dispatch_class.__name__) not in DEFAULT_DISPATCH_CLASSES:
+        return None
+    if actions is None and VIEWSET_CLASS in _get_class_names(view_class):
+        return None  # handlers of a ViewSet are bound to HTTP methods by a router
+
+    http_method_names = initkwargs.get('http_method_names', view_class.http_method_names)
+    return {
+        method.upper() for method in http_method_names
+        if method in (actions or {}) or hasattr(view_class, method)
+    }
@@ -0,0 +1,154 @@
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import QuerySet
+from django.urls import Resolver404, resolve
+from django.utils.module_loading import import_string
+
+
+def get_url_parameter_models():
+    """
+    Returns {url_name: {url_parameter: "app_label.ModelName" or "app_label.ModelName.field"}}.
+    """
+    return getattr(settings, 'SMOKE_TESTS_URL_PARAMETER_MODELS', {})
+
+
+def get_view(lookup_str, url):
+    """
+    Returns the view (a function or a class) handling the URL, or None if it can't be found.
+    """
+    try:
+        # the resolved function keeps details lost in the lookup string, eg. actions of ViewSets
+        return resolve(url).func
+    except Resolver404:
+        pass
+    try:
+        return import_string(lookup_str)
+    except ImportError:
+        return None
+
+
+def get_view_class(lookup_str, url):
+    """
+    Returns a class of the view (Django CBV, DRF APIView or ViewSet) or None for function views.
+    """
+    view = get_view(lookup_str, url)
+    if view is None or isinstance(view, type):
+        return view
+    return getattr(view, 'view_class', None) or getattr(view, 'cls', None)
+
+
+def get_view_queryset(view_class):
+    queryset = getattr(view_class, 'queryset', None)
+    if isinstance(queryset, QuerySet):
+        return queryset.all()
+    model = getattr(view_class, 'model', None)
+    if model is not None:
+        return model._default_manager.all()
+    return None
+
+
+def get_lookup_field(view_class, model, url_parameter):
+    """
+    Returns a name of the model's field looked up with the URL parameter, or None if it's unknown.
+    """
+    # DRF GenericAPIView
+    lookup_field = getattr(view_class, 'lookup_field', None)
+    lookup_url_kwarg = getattr(view_class, 'lookup_url_kwarg', None) or lookup_field
+    if lookup_field and url_parameter == lookup_url_kwarg:
+        return lookup_field
+
+    # Django SingleObjectMixin
+    if url_parameter == getattr(view_class, 'slug_url_kwarg', None):
+        return view_class.slug_field
+    if url_parameter == getattr(view_class, 'pk_url_kwarg', None):
+        return 'pk'
+
+    return get_model_field(model, url_parameter)
+
+
+def get_model_field(model, url_parameter):
+    if url_parameter == 'pk':
+        return 'pk'
+    try:
+        model._meta.get_field(url_parameter)
+    except FieldDoesNotExist:
+        return None
+    return url_parameter
+
+
+class UrlParametersResolver:
+    """
+    Finds real values of URL parameters in the database, so detail views can find their objects.
+
+    Models (querysets) behind URL parameters are inferred from `queryset` or `model` attributes
+    of views, or taken from SMOKE_TESTS_URL_PARAMETER_MODELS setting.
+    Values are fetched lazily, when the first test needs them (the test database doesn't exist
+    when tests are created), with one query per queryset, for all fields used in URLs.
+    Values of up to `samples` objects are fetched, so samples of one URL use different objects.
+    """
+
+    def __init__(self, samples=1):
+        self.samples = samples
+        self.sources = {}  # {source_key: (queryset, [field,])}
+        self.values = {}  # {(scope, source_key): [{field: value},]}
+
+    def register(self, url_name, lookup_str, url, url_params):
+        """
+        Returns {url_parameter: (source_key, field)} or None if some parameters can't be resolved.
+        """
+        models_from_settings = get_url_parameter_models().get(url_name, {})
+        view_class = None
+        view_queryset = None
+        if set(url_params) - set(models_from_settings):
+            view_class = get_view_class(lookup_str, url)
+            view_queryset = get_view_queryset(view_class) if view_class else None
+
+        parameters = {}
+        for url_parameter in url_params:
+            if url_parameter in models_from_settings:
+                source_key, queryset, field = self._get_source_from_settings(
+                    models_from_settings[url_parameter], url_parameter
+                )
+            elif view_queryset is not None:
+                source_key = view_class
+                queryset = view_queryset
+                field = get_lookup_field(view_class, view_queryset.model, url_parameter)
+            else:
+                return None
+
+            if field is None:
+                return None
+            parameters[url_parameter] = (source_key, field)
+            _, fields = self.sources.setdefault(source_key, (queryset, []))
+            if field not in fields:
+                fields.append(field)
+        return parameters
+
+    @staticmethod
+    def _get_source_from_settings(model_path, url_parameter):
+        app_label, model_name, *field = model_path.split('.')
+        model = apps.get_model(app_label, model_name)
+        field = field[0] if field else get_model_field(model, url_parameter)
+        return model._meta.label, model._default_manager.all(), field
+
+    def resolve(self, parameters, scope=None, sample=0):
+        """
+        Returns {url_parameter: value} or None if there are no objects in the database.
+        `scope` separates values fetched for test classes, which load fixtures separately.
+        """
+        values = {}
+        for url_parameter, (source_key, field) in parameters.items():
+            source_values = self._get_values(source_key, scope)
+            if not source_values:
+                return None
+            values[url_parameter] = source_values[sample % len(source_values)][field]
+        return values
+
+    def _get_values(self, source_key, scope):
+        if (scope, source_key) not in self.values:
+            queryset, fields = self.sources[source_key]
+            if not queryset.ordered:
+                queryset = queryset.order_by('pk')
+            self.values[(scope, source_key)] = list(queryset.values(*fields)[:self.samples])
+        return self.values[(scope, source_key)]
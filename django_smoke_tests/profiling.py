@@ -0,0 +1,72 @@
+import heapq
+import itertools
+import os
+import pstats
+import re
+
+from django.conf import settings
+
+DEFAULT_PROFILE_DIR = 'smoke_tests_profiles'
+AGGREGATED_PROFILE_NAME = 'all.pstats'
+
+
+def get_profile_dir():
+    return getattr(settings, 'SMOKE_TESTS_PROFILE_DIR', DEFAULT_PROFILE_DIR)
+
+
+def get_profile_name(rank, method, url, url_name):
+    """
+    Returns a file name of the profile, eg. "01_GET_all-astronauts.pstats".
+    """
+    name = re.sub(r'[^\w.-]+', '_', url_name or url).strip('_') or 'root'
+    return '{:02d}_{}_{}.pstats'.format(rank, method, name)
+
+
+class RequestProfiles:
+    """
+    Keeps cProfile profiles of `top_count` slowest requests and statistics aggregated
+    from profiles of all requests, so memory doesn't grow with a number of requests.
+    """
+
+    def __init__(self, top_count):
+        self.top_count = top_count
+        self.slowest = []  # heap of (latency_ms, order, method, url, url_name, profile)
+        self.aggregated = None  # pstats.Stats
+        self._order = itertools.count()
+
+    def add(self, profile, latency_ms, method, url, url_name=None):
+        profile.create_stats()
+        if self.aggregated is None:
+            self.aggregated = pstats.Stats(profile)
+        else:
+            self.aggregated.add(profile)
+
+        entry = (latency_ms, next(self._order), method, url, url_name, profile)
+        if len(self.slowest) < self.top_count:
+            heapq.heappush(self.slowest, entry)
+        else:
+            heapq.heappushpop(self.slowest, entry)
+
+    def get_slowest(self):
+        """
+        Returns [(latency_ms, method, url, url_name, profile),] from the slowest request.
+        """
+        return [
+            (latency_ms, method, url, url_name, profile)
+            for latency_ms, _, method, url, url_name, profile in sorted(self.slowest, reverse=True)
+        ]
+
+    def dump(self, directory):
+        """
+        Writes .pstats files of the slowest requests and of all requests,
+        returns [(latency_ms, method, url, path),] of the slowest requests.
+        """
+        os.makedirs(directory, exist_ok=True)
+        dumped = []
+        for rank, (latency_ms, method, url, url_name, profile) in enumerate(self.get_slowest(), 1):
+            path = os.path.join(directory, get_profile_name(rank, method, url, url_name))
+            profile.dump_stats(path)
+            dumped.append((latency_ms, method, url, path))
+        if self.aggregated is not None:
+            self.aggregated.dump_stats(os.path.join(directory, AGGREGATED_PROFILE_NAME))
+        return dumped
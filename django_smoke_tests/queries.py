@@ -0,0 +1,58 @@
+import re
+from collections import Counter
+
+STRING_LITERAL_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+IN_LIST_RE = re.compile(r'\bIN\s*\((?:\s*\?\s*,)*\s*\?\s*\)', re.IGNORECASE)
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+def get_sql_template(sql):
+    """
+    Replaces literals in SQL with placeholders, so queries differing only by parameters are equal.
+    Eg.:
+        SELECT * FROM "book" WHERE "book"."author_id" = 12
+        => SELECT * FROM "book" WHERE "book"."author_id" = ?
+    """
+    template = STRING_LITERAL_RE.sub('?', sql)
+    template = NUMBER_LITERAL_RE.sub('?', template)
+    template = IN_LIST_RE.sub('IN (...)', template)
+    return WHITESPACE_RE.sub(' ', template).strip()
+
+
+def find_repeated_queries(sqls, min_repeats):
+    """
+    Returns [(sql_template, count),] of templates executed at least `min_repeats` times,
+    which usually means a query executed in a loop (N+1 problem).
+    """
+    counter = Counter(get_sql_template(sql) for sql in sqls)
+    return [
+        (template, count) for template, count in counter.most_common() if count >= min_repeats
+    ]
+
+
+WRITE_STATEMENTS = {
+    'INSERT', 'UPDATE', 'DELETE', 'REPLACE', 'MERGE', 'CREATE', 'ALTER', 'DROP', 'TRUNCATE',
+}
+
+
+def is_write_query(sql):
+    statement = sql.lstrip().split(None, 1)
+    return bool(statement) and statement[0].upper() in WRITE_STATEMENTS
+
+
+class WriteQueriesDetector:
+    """
+    Database execute wrapper collecting queries which modify data.
+    Eg.:
+        with connection.execute_wrapper(detector):
+            ...
+    """
+
+    def __init__(self):
+        self.write_queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        if is_write_query(sql):
+            self.write_queries.append(sql)
+        return execute(sql, params, many, context)
@@ -0,0 +1,163 @@
+import json
+import os
+import tempfile
+from xml.sax.saxutils import escape, quoteattr
+
+PASSED = 'passed'
+FAILED = 'failed'
+ERROR = 'error'
+SKIPPED = 'skipped'
+
+JSONL_REPORT = 'jsonl'
+JUNIT_REPORT = 'junit'
+REPORT_FORMATS = [JSONL_REPORT, JUNIT_REPORT]
+
+
+def get_response_size(response):
+    # content of streaming responses is not consumed, their size is unknown
+    if getattr(response, 'streaming', False):
+        return None
+    return len(response.content)
+
+
+class ReportWriter:
+    """
+    Writes one record per smoke test to a file, as soon as the test completes.
+
+    Every record is flushed immediately, so the report can be followed while tests are running
+    and memory usage doesn't grow with a number of tests. The file is opened in the append mode,
+    so records written by processes forked with --parallel don't overwrite each other.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+
+    def open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        open(self.path, 'w').close()
+        self.file = open(self.path, 'a')
+        self._write(self.get_header())
+
+    def close(self):
+        if self.file is None:
+            return
+        self._write(self.get_footer())
+        self.file.close()
+        self.file = None
+
+    def write(self, record):
+        """
+        `record` is a dict with keys: test_name, method, url, url_name, outcome, status_code,
+        duration_ms, query_count, response_size, skip_reason and message.
+        """
+        self._write(self.format_record(record))
+
+    def _write(self, text):
+        if text:
+            self.file.write(text)
+            self.file.flush()
+
+    def get_header(self):
+        return ''
+
+    def get_footer(self):
+        return ''
+
+    def format_record(self, record):
+        raise NotImplementedError
+
+
+class JsonlReportWriter(ReportWriter):
+
+    def format_record(self, record):
+        return json.dumps(record, sort_keys=True) + '\n'
+
+
+class JUnitReportWriter(ReportWriter):
+    """
+    Writes a JUnit XML report. Totals aren't known until all tests complete,
+    so they aren't written as <testsuite> attributes, CI servers count test cases themselves.
+    """
+    TEST_SUITE_NAME = 'django-smoke-tests'
+    TEST_CLASS_NAME = 'django_smoke_tests.tests.SmokeTests'
+    PROPERTIES = ['method', 'url', 'url_name', 'status_code', 'query_count', 'response_size']
+
+    def get_header(self):
+        return '<?xml version="1.0" encoding="utf-8"?>\n<testsuite name={}>\n'.format(
+            quoteattr(self.TEST_SUITE_NAME)
+        )
+
+    def get_footer(self):
+        return '</testsuite>\n'
+
+    def format_record(self, record):
+        duration = (record['duration_ms'] or 0) / 1000
+        lines = ['  <testcase classname={} name={} time="{:.6f}">'.format(
+            quoteattr(self.TEST_CLASS_NAME), quoteattr(record['test_name']), duration
+        )]
+
+        lines.append('    <properties>')
+        for name in self.PROPERTIES:
+            if record[name] is not None:
+                lines.append('      <property name={} value={}/>'.format(
+                    quoteattr(name), quoteattr(str(record[name]))
+                ))
+        lines.append('    </properties>')
+
+        if record['outcome'] == SKIPPED:
+            lines.append('    <skipped message={}/>'.format(quoteattr(record['skip_reason'] or '')))
+        elif record['outcome'] in (FAILED, ERROR):
+            message = record['message'] or ''
+            lines.append('    <{tag} message={message}>{text}</{tag}>'.format(
+                tag='failure' if record['outcome'] == FAILED else 'error',
+                message=quoteattr(message.strip().split('\n')[0]),
+                text=escape(message),
+            ))
+
+        lines.append('  </testcase>')
+        return '\n'.join(lines) + '\n'
+
+
+class SummaryWriter(ReportWriter):
+    """
+    Collects measurements summarized after the tests (eg. budget warnings and query counts)
+    from processes forked with --parallel, which can't update lists of the main process.
+
+    Records are [name of the summarized list, item] lists, written to a temporary file as JSON,
+    the main process reads them back once all tests are completed.
+    """
+
+    def __init__(self):
+        super(SummaryWriter, self).__init__(None)
+
+    def open(self):
+        fd, self.path = tempfile.mkstemp(suffix='.jsonl')
+        os.close(fd)
+        super(SummaryWriter, self).open()
+
+    def format_record(self, record):
+        return json.dumps(record) + '\n'
+
+    def read(self):
+        """
+        Returns records written by all processes and removes the file.
+        """
+        self.close()
+        try:
+            with open(self.path) as f:
+                return [json.loads(line) for line in f if line.strip()]
+        finally:
+            os.remove(self.path)
+
+
+REPORT_WRITERS = {
+    JSONL_REPORT: JsonlReportWriter,
+    JUNIT_REPORT: JUnitReportWriter,
+}
+
+
+def get_report_writer(report_format, path):
+    return REPORT_WRITERS[report_format](path)
@@ -1,7 +1,126 @@
-from django.test.runner import DiscoverRunner
+import sys
+import unittest
 
+from django.db import connections
+from django.test.runner import (
+    DiscoverRunner, ParallelTestSuite, RemoteTestResult, RemoteTestRunner
+)
 
-class NoDbTestRunner(DiscoverRunner):
+from .databases import TestDatabaseFingerprints, get_test_db_fingerprint, is_in_memory_db
+
+
+def flatten_suite(suite):
+    for test in suite:
+        if isinstance(test, unittest.TestSuite):
+            yield from flatten_suite(test)
+        else:
+            yield test
+
+
+class PicklableSubTest:
+    """
+    A failed subtest (a case of a compact test) sent from a parallel worker process.
+
+    Subtests refer to their test case, which holds a test client with responses and middleware,
+    so they can't be pickled. Only the id and the description of the subtest are kept.
+    """
+
+    def __init__(self, subtest):
+        self.test_id = subtest.id()
+        self.description = str(subtest)
+        self.failureException = subtest.failureException
+
+    def id(self):
+        return self.test_id
+
+    def shortDescription(self):
+        return None
+
+    def __str__(self):
+        return self.description
+
+
+class SmokeTestsRemoteTestResult(RemoteTestResult):
+
+    def addSubTest(self, test, subtest, err):
+        if err is not None:
+            subtest = PicklableSubTest(subtest)
+        super(SmokeTestsRemoteTestResult, self).addSubTest(test, subtest, err)
+
+
+class SmokeTestsRemoteTestRunner(RemoteTestRunner):
+    resultclass = SmokeTestsRemoteTestResult
+
+
+class SmokeTestsParallelSuite(ParallelTestSuite):
+    """
+    Splits smoke tests into one shard per process.
+
+    Django partitions a parallel suite by test case class, which puts all the generated tests
+    into a single subsuite, as they are all attached to SmokeTests. Tests are sorted by their
+    ids before being distributed, so every run builds the same shards.
+    """
+
+    runner_class = SmokeTestsRemoteTestRunner
+
+    def __init__(self, suite, processes, *args, **kwargs):
+        super(SmokeTestsParallelSuite, self).__init__(suite, processes, *args, **kwargs)
+        tests = sorted(flatten_suite(suite), key=lambda test: test.id())
+        suite_class = type(suite)
+        self.subsuites = [
+            suite_class(tests[shard_index::processes])
+            for shard_index in range(min(processes, len(tests)))
+        ]
+
+
+class SmokeTestRunner(DiscoverRunner):
+    """ A test runner that is able to run smoke tests in parallel """
+
+    parallel_test_suite = SmokeTestsParallelSuite
+
+
+class ReusableDbTestRunner(SmokeTestRunner):
+    """
+    A test runner keeping test databases between runs (like --keepdb), which rebuilds them
+    when their fingerprint (migration graph and models) changes.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs['keepdb'] = True
+        kwargs['interactive'] = False  # outdated databases are rebuilt without asking
+        super(ReusableDbTestRunner, self).__init__(*args, **kwargs)
+        self.fingerprints = TestDatabaseFingerprints()
+
+    def setup_databases(self, **kwargs):
+        aliases = sorted(kwargs.get('aliases') or connections)
+        current_fingerprints = {
+            alias: get_test_db_fingerprint(alias)
+            for alias in aliases if not is_in_memory_db(connections[alias])
+        }
+        stored_fingerprints = self.fingerprints.load()
+        changed_aliases = [
+            alias for alias, fingerprint in current_fingerprints.items()
+            if stored_fingerprints.get(alias) != fingerprint
+        ]
+        if changed_aliases and self.verbosity >= 1:
+            sys.stderr.write(
+                'Schema of test databases changed ({}), rebuilding test databases...\n'.format(
+                    ', '.join(changed_aliases)
+                )
+            )
+
+        # existing databases are destroyed and created again, teardown keeps the new ones
+        self.keepdb = not changed_aliases
+        try:
+            old_config = super(ReusableDbTestRunner, self).setup_databases(**kwargs)
+        finally:
+            self.keepdb = True
+        stored_fingerprints.update(current_fingerprints)
+        self.fingerprints.save(stored_fingerprints)
+        return old_config
+
+
+class NoDbTestRunner(SmokeTestRunner):
     """ A test runner to test without database creation """
 
     def setup_databases(self, **kwargs):
@@ -0,0 +1,118 @@
+import fnmatch
+import re
+
+APP_RULE = 'app'  # views of the app, eg. app:myproject.missions
+NAMESPACE_RULE = 'namespace'  # URLs in the namespace and nested namespaces, eg. namespace:api
+NAME_RULE = 'name'  # URL names matching the glob, eg. name:astronaut-* or name:api:*-detail
+VIEW_RULE = 'view'  # views in the module or the class, eg. view:myproject.missions.views
+URL_RULE = 'url'  # paths of URLs matching the regex, eg. url:^/api/v1/
+RULE_KINDS = [APP_RULE, NAMESPACE_RULE, NAME_RULE, VIEW_RULE, URL_RULE]
+
+
+class InvalidSelectionRule(Exception):
+    pass
+
+
+def parse_rule(rule):
+    """
+    Splits a "kind:value" rule into (kind, value).
+    """
+    kind, separator, value = rule.partition(':')
+    if not separator or not value or kind not in RULE_KINDS:
+        raise InvalidSelectionRule(
+            'Rule "{}" should be one of {} followed by ":" and a value'.format(
+                rule, ', '.join(RULE_KINDS)
+            )
+        )
+    return kind, value
+
+
+def _compile_any(regexes):
+    """
+    Folds regexes into one compiled alternative, or returns None if there are none.
+    """
+    if not regexes:
+        return None
+    try:
+        return re.compile('|'.join('(?:{})'.format(regex) for regex in regexes))
+    except re.error as e:
+        raise InvalidSelectionRule('Invalid regex in rules: {}'.format(e))
+
+
+class EndpointMatcher:
+    """
+    Matches endpoints against rules of all kinds, which are compiled into one regex per kind.
+    """
+
+    def __init__(self, rules):
+        values = {kind: [] for kind in RULE_KINDS}
+        for rule in rules:
+            kind, value = parse_rule(rule)
+            values[kind].append(value)
+
+        # apps are matched by the prefix of the view path, like app names of the command
+        self.app_regex = _compile_any([re.escape(app) for app in values[APP_RULE]])
+        self.namespace_regex = _compile_any(
+            [r'{}(?::|\Z)'.format(re.escape(namespace)) for namespace in values[NAMESPACE_RULE]]
+        )
+        self.name_regex = _compile_any([fnmatch.translate(glob) for glob in values[NAME_RULE]])
+        self.view_regex = _compile_any(
+            [r'{}(?:\.|\Z)'.format(re.escape(view)) for view in values[VIEW_RULE]]
+        )
+        self.url_regex = _compile_any(values[URL_RULE])
+        self.is_empty = not any(values.values())
+
+    def matches(self, url_path, lookup_str, url_name, url_namespace):
+        if self.app_regex and lookup_str and self.app_regex.match(lookup_str):
+            return True
+        if self.namespace_regex and url_namespace and self.namespace_regex.match(url_namespace):
+            return True
+        if self.name_regex and url_name:
+            if self.name_regex.match(url_name):
+                return True
+            if url_namespace and self.name_regex.match('{}:{}'.format(url_namespace, url_name)):
+                return True
+        if self.view_regex and lookup_str and self.view_regex.match(lookup_str):
+            return True
+        return bool(self.url_regex and url_path and self.url_regex.search(url_path))
+
+
+class EndpointSelector:
+    """
+    Decides which endpoints get smoke tests, compiled once for all URL patterns.
+
+    Endpoints are selected when they match any of include rules (or there are none) and none
+    of exclude rules. App names given to the command are include rules of the "app" kind.
+    Endpoints with names in SKIP_SMOKE_TESTS are selected, but their tests are skipped.
+    """
+
+    def __init__(self, include=None, exclude=None, app_names=None, skipped_names=None):
+        include = list(include or []) + [
+            '{}:{}'.format(APP_RULE, app_name) for app_name in app_names or [] if app_name
+        ]
+        self.include_matcher = EndpointMatcher(include)
+        self.exclude_matcher = EndpointMatcher(exclude or [])
+        self.skipped_names = frozenset(skipped_names or [])
+        # paths of URLs are needed only by URL rules, other rules don't require normalized patterns
+        self.matches_urls = bool(self.include_matcher.url_regex or self.exclude_matcher.url_regex)
+
+    def is_selected(self, url_path, lookup_str, url_name, url_namespace):
+        """
+        `url_path` is a path with parameters as %(name)s placeholders, eg. /api/users/%(pk)s/
+        """
+        if not self.include_matcher.is_empty and not self.include_matcher.matches(
+            url_path, lookup_str, url_name, url_namespace
+        ):
+            return False
+        return self.exclude_matcher.is_empty or not self.exclude_matcher.matches(
+            url_path, lookup_str, url_name, url_namespace
+        )
+
+    def is_skipped(self, url_name, url_namespace, app_name):
+        if not url_name or not self.skipped_names:
+            return False
+        return any(name in self.skipped_names for name in [
+            url_name,
+            url_namespace and '{}:{}'.format(url_namespace, url_name),
+            app_name and '{}:{}'.format(app_name, url_name),
+        ])
@@ -0,0 +1,87 @@
+import heapq
+import json
+import statistics
+import zlib
+from xml.etree import ElementTree
+
+
+class InvalidShard(Exception):
+    pass
+
+
+class DurationsNotAvailable(Exception):
+    pass
+
+
+def parse_shard(shard):
+    """
+    Parses "i/N" into (i, N), shards are numbered from 1.
+    """
+    try:
+        shard_index, shards_count = [int(number) for number in shard.split('/')]
+    except ValueError:
+        raise InvalidShard('Shard "{}" should be given as i/N, eg. 1/4'.format(shard))
+    if not 1 <= shard_index <= shards_count:
+        raise InvalidShard('Shard "{}" is out of range 1-{}'.format(shard, shards_count))
+    return shard_index, shards_count
+
+
+def load_durations(path):
+    """
+    Returns {test_name: duration_ms} of executed tests from a previous report: JSON lines
+    (--report jsonl), JUnit XML (--report junit) or a baseline snapshot (--save-baseline).
+    """
+    durations = {}
+    try:
+        if path.endswith('.xml'):
+            for test_case in ElementTree.parse(path).getroot().iter('testcase'):
+                if test_case.find('skipped') is None and test_case.get('time') is not None:
+                    durations[test_case.get('name')] = float(test_case.get('time')) * 1000
+            return durations
+
+        with open(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if isinstance(record, list):
+                    test_name, _, duration_ms, _ = record  # a line of a baseline snapshot
+                else:
+                    test_name, duration_ms = record['test_name'], record['duration_ms']
+                if duration_ms is not None:
+                    durations[test_name] = duration_ms
+    except (OSError, ValueError, KeyError, ElementTree.ParseError) as e:
+        raise DurationsNotAvailable('Could not load durations "{}": {}'.format(path, e))
+    return durations
+
+
+def select_shard(requests, shard_index, shards_count, durations=None):
+    """
+    Returns requests (SmokeRequest) of the shard, in their original order.
+
+    Executed requests are assigned to the least loaded shard, the longest first. Their loads are
+    durations recorded in a previous run, requests without durations weigh as the median duration.
+    Without durations every request weighs the same, so shards get equal numbers of requests.
+    Skipped requests don't load shards, they are spread by a hash of the test name.
+    Every node gets the same assignment, as ties are broken by test names and shard numbers.
+    """
+    durations = durations or {}
+    default_duration = statistics.median(durations.values()) if durations else 1
+    executed = sorted(
+        {request.test_name for request in requests if not request.skipped},
+        key=lambda test_name: (-durations.get(test_name, default_duration), test_name),
+    )
+
+    shard_loads = [(0, index) for index in range(shards_count)]  # heap of (load, shard index)
+    shard_of_test = {}
+    for test_name in executed:
+        load, index = heapq.heappop(shard_loads)
+        shard_of_test[test_name] = index
+        heapq.heappush(shard_loads, (load + durations.get(test_name, default_duration), index))
+
+    def get_shard(request):
+        if request.skipped:
+            return zlib.crc32(request.test_name.encode()) % shards_count
+        return shard_of_test[request.test_name]
+
+    return [request for request in requests if get_shard(request) == shard_index - 1]
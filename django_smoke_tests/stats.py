@@ -0,0 +1,96 @@
+import math
+
+
+class LatencyHistogram:
+    """
+    Histogram of latencies with logarithmic buckets, each covering `precision` (1%) of its value.
+
+    Memory doesn't grow with a number of recorded values, only with their range
+    (about 230 buckets per order of magnitude with the default precision),
+    percentiles are accurate within the precision.
+    """
+    MIN_VALUE_MS = 0.001
+
+    def __init__(self, precision=0.01):
+        self.log_base = math.log1p(precision)
+        self.buckets = {}  # {bucket index: count}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def record(self, value_ms):
+        value_ms = max(value_ms, self.MIN_VALUE_MS)
+        bucket = int(math.log(value_ms / self.MIN_VALUE_MS) / self.log_base)
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += value_ms
+        self.min = value_ms if self.min is None else min(self.min, value_ms)
+        self.max = value_ms if self.max is None else max(self.max, value_ms)
+
+    def get_bucket_value(self, bucket):
+        # the middle of the bucket
+        return self.MIN_VALUE_MS * math.exp((bucket + 0.5) * self.log_base)
+
+    def percentile(self, percent):
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(self.count * percent / 100))
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                # exact extremes are known, values of the bucket can't be outside of them
+                return min(max(self.get_bucket_value(bucket), self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+
+class EndpointStats:
+    """
+    Statistics of requests repeatedly sent to one endpoint.
+    """
+
+    def __init__(self, method, url):
+        self.method = method
+        self.url = url
+        self.latencies = LatencyHistogram()
+        self.errors = 0
+        self.elapsed_s = 0
+
+    @property
+    def count(self):
+        return self.latencies.count
+
+    def record(self, latency_ms, is_error):
+        self.latencies.record(latency_ms)
+        if is_error:
+            self.errors += 1
+
+    @property
+    def error_rate(self):
+        return self.errors / self.count if self.count else 0
+
+    @property
+    def throughput(self):
+        """
+        Requests per second.
+        """
+        return self.count / self.elapsed_s if self.elapsed_s else None
+
+    def format(self):
+        throughput = self.throughput
+        return (
+            '{} {} - {} requests, p50 {:.1f} ms, p95 {:.1f} ms, p99 {:.1f} ms, '
+            '{} req/s, {:.1%} errors'
+        ).format(
+            self.method, self.url, self.count,
+            self.latencies.percentile(50),
+            self.latencies.percentile(95),
+            self.latencies.percentile(99),
+            '{:.1f}'.format(throughput) if throughput is not None else '-',
+            self.error_rate,
+        )
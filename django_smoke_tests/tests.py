@@ -1,32 +1,89 @@
+import os
+from contextlib import ExitStack, contextmanager, nullcontext
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.management import call_command
+from django.db import transaction
 from django.test import TestCase
 
+from .constants import ANONYMOUS_AUTH, PER_CLASS_AUTH, PER_TEST_AUTH
+from .fixtures import FixtureCache, StreamingFixtureLoader, is_streamed_fixture
+
+
+SMOKE_USER_CREDENTIALS = {
+    'username': 'smoke_superuser',
+    'email': 'smoke@test.com',
+    'password': 'smoke_password'
+}
+
+
+def create_smoke_user():
+    return get_user_model().objects.create_superuser(
+        SMOKE_USER_CREDENTIALS['username'],
+        SMOKE_USER_CREDENTIALS['email'],
+        SMOKE_USER_CREDENTIALS['password'],
+    )
+
+
+def load_fixture(fixture_path, cache_fixture=False, stream_fixture=False):
+    stream_fixture = stream_fixture and is_streamed_fixture(fixture_path)
+    if cache_fixture and os.path.isfile(fixture_path):
+        FixtureCache(fixture_path, stream=stream_fixture).load_fixture()
+    elif stream_fixture:
+        StreamingFixtureLoader(fixture_path).load()
+    else:
+        call_command('loaddata', fixture_path)
 
-class SmokeTests(TestCase):
+
+@contextmanager
+def rolled_back(databases):
+    with ExitStack() as stack:
+        for alias in databases:
+            stack.enter_context(transaction.atomic(using=alias))
+        try:
+            yield
+        finally:
+            for alias in databases:
+                transaction.set_rollback(True, using=alias)
+
+
+class BaseSmokeTests(TestCase):
+    auth_mode = PER_TEST_AUTH
+    cache_fixture = False
+    stream_fixture = False
 
     @classmethod
     def setUpTestData(cls):
         fixture_path = getattr(cls, 'fixture_path', None)
         if fixture_path:
-            call_command('loaddata', fixture_path)
+            load_fixture(fixture_path, cls.cache_fixture, cls.stream_fixture)
 
     @classmethod
     def setUpClass(cls):
-        super(SmokeTests, cls).setUpClass()
-        cls.smoke_user_credentials = {
-            'username': 'smoke_superuser',
-            'email': 'smoke@test.com',
-            'password': 'smoke_password'
-        }
-        cls.smoke_user = get_user_model().objects.create_superuser(
-            cls.smoke_user_credentials['username'],
-            cls.smoke_user_credentials['email'],
-            cls.smoke_user_credentials['password'],
-        )
+        super(BaseSmokeTests, cls).setUpClass()
+        if cls.auth_mode == ANONYMOUS_AUTH:
+            return
+
+        cls.smoke_user_credentials = SMOKE_USER_CREDENTIALS
+        cls.smoke_user = create_smoke_user()
+
+        if cls.auth_mode == PER_CLASS_AUTH:
+            # the session is created inside the class-wide transaction,
+            # so it survives rollbacks done after every test
+            client = cls.client_class()
+            client.force_login(cls.smoke_user)
+            cls.smoke_session_cookie = client.cookies[settings.SESSION_COOKIE_NAME].value
 
     def setUp(self):
-        super(SmokeTests, self).setUp()
+        super(BaseSmokeTests, self).setUp()
+        if self.auth_mode == ANONYMOUS_AUTH:
+            return
+
+        if self.auth_mode == PER_CLASS_AUTH:
+            self.client.cookies[settings.SESSION_COOKIE_NAME] = self.smoke_session_cookie
+            return
+
         try:
             self.client.force_login(self.smoke_user)  # faster than regular logging
         except AttributeError:
@@ -36,11 +93,53 @@ class SmokeTests(TestCase):
                 password=self.smoke_user_credentials['password']
             )
 
-    def fail_test(self, url, http_method, response):
+    def run_cases(self, cases, run_case):
+        """
+        Runs every case (a request from the table created with --compact) as a separate subtest.
+        """
+        for case in cases:
+            with self.subTest(case.test_name):
+                with self.isolate_case():
+                    run_case(self, case)
+
+    def isolate_case(self):
+        # changes of every case are rolled back, like changes of every regular test
+        if not self._databases_support_transactions():
+            return nullcontext()
+        return rolled_back(self._databases_names(include_mirrors=False))
+
+    def fail_test(self, url, http_method, response, reason=None):
         fail_msg = (
             '\nSMOKE TEST FAILED'
             '\nURL: {}'
             '\nHTTP METHOD: {}'
             '\nSTATUS CODE: {}'
         ).format(url, http_method, response.status_code)
+        if reason:
+            fail_msg += '\nREASON: {}'.format(reason)
         self.fail(fail_msg)
+
+
+class SmokeTests(BaseSmokeTests):
+    pass
+
+
+class SharedDbSmokeTests(BaseSmokeTests):
+    """
+    Tests of safe HTTP methods sharing one database state.
+
+    Data (eg. a fixture) is still loaded once per class inside a transaction, which is rolled back
+    after all tests of the class, but tests are not wrapped in separate transactions.
+    """
+
+    def _fixture_setup(self):
+        if not self._databases_support_transactions():
+            return super(SharedDbSmokeTests, self)._fixture_setup()
+        self.atomics = {}
+
+    def _fixture_teardown(self):
+        if not self._databases_support_transactions():
+            return super(SharedDbSmokeTests, self)._fixture_teardown()
+
+    def isolate_case(self):
+        return nullcontext()
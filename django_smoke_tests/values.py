@@ -0,0 +1,159 @@
+import random
+import string
+import uuid
+
+from django.conf import settings
+from django.urls.converters import get_converters
+from django.utils.module_loading import import_string
+
+# regexes of URL parameters defined with re_path() (or url()), equivalent to path converters
+REGEX_ALIASES = {
+    r'\d+': 'int',
+    r'[0-9]+': 'int',
+    r'[-\w]+': 'slug',
+    r'[\w-]+': 'slug',
+}
+
+
+class ValueProvider:
+    """
+    Provides values of URL parameters of one type (path converter or regex).
+
+    Values are taken from a pool, which is refilled with `create_batch()` when it's empty,
+    so providers using expensive sources (eg. a file or an API) can prefetch values in batches.
+    """
+    batch_size = 100
+
+    def __init__(self):
+        self.pool = []
+
+    def get_values(self, count):
+        while len(self.pool) < count:
+            self.pool.extend(self.create_batch(max(self.batch_size, count - len(self.pool))))
+        values, self.pool = self.pool[:count], self.pool[count:]
+        return values
+
+    def create_batch(self, size):
+        return [self.create_value() for _ in range(size)]
+
+    def create_value(self):
+        raise NotImplementedError
+
+
+class IntValueProvider(ValueProvider):
+    max_value = 10 ** 6
+
+    def create_batch(self, size):
+        # distinct values, so samples of one endpoint request different records
+        return random.sample(range(1, self.max_value), size)
+
+
+class SlugValueProvider(ValueProvider):
+
+    def create_value(self):
+        return '-'.join(
+            ''.join(random.choices(string.ascii_lowercase, k=random.randint(3, 8)))
+            for _ in range(random.randint(1, 4))
+        )
+
+
+class UUIDValueProvider(ValueProvider):
+
+    def create_value(self):
+        return uuid.uuid4()
+
+
+VALUE_PROVIDERS = {
+    'int': IntValueProvider,
+    'slug': SlugValueProvider,
+    'uuid': UUIDValueProvider,
+}
+
+
+def get_value_providers():
+    """
+    Returns {converter name or regex: ValueProvider}, built-in providers can be overridden and
+    providers of custom path converters added with SMOKE_TESTS_URL_VALUE_PROVIDERS setting,
+    eg. {'year': 'myproject.smoke.YearValueProvider'}.
+    """
+    providers = dict(VALUE_PROVIDERS)
+    for key, provider in getattr(settings, 'SMOKE_TESTS_URL_VALUE_PROVIDERS', {}).items():
+        providers[key] = import_string(provider) if isinstance(provider, str) else provider
+    return {key: provider_class() for key, provider_class in providers.items()}
+
+
+def get_converter_names():
+    """
+    Returns {regex: converter name} of registered path converters.
+    """
+    converter_names = dict(REGEX_ALIASES)
+    for name, converter in get_converters().items():
+        converter_names.setdefault(converter.regex, name)
+    return converter_names
+
+
+def get_url_parameter_regexes(url_pattern):
+    """
+    Returns {url_parameter: regex} of named groups of the URL pattern.
+    Eg.:
+        "^items/(?P<pk>[0-9]+)/$" => {"pk": "[0-9]+"}
+    """
+    regexes = {}
+    start = url_pattern.find('(?P<')
+    while start != -1:
+        name_end = url_pattern.index('>', start)
+        name = url_pattern[start + len('(?P<'):name_end]
+        depth = 1
+        in_class = False
+        index = name_end + 1
+        while index < len(url_pattern) and depth:
+            char = url_pattern[index]
+            if char == '\\':
+                index += 1
+            elif in_class:
+                in_class = char != ']'
+            elif char == '[':
+                in_class = True
+                if url_pattern[index + 1:index + 2] == ']':
+                    index += 1  # "]" right after "[" is a literal
+            elif char == '(':
+                depth += 1
+            elif char == ')':
+                depth -= 1
+            index += 1
+        regexes[name] = url_pattern[name_end + 1:index - 1]
+        start = url_pattern.find('(?P<', index)
+    return regexes
+
+
+class UrlValues:
+    """
+    Creates values of URL parameters with providers chosen by path converters (or regexes)
+    of parameters. Parameters without a provider get values of `default_value` callable.
+    """
+
+    def __init__(self, default_value):
+        self.default_value = default_value
+        self.providers = get_value_providers()
+        self.converter_names = get_converter_names()
+
+    def get_provider(self, regex):
+        if regex in self.providers:
+            return self.providers[regex]
+        return self.providers.get(self.converter_names.get(regex))
+
+    def create_values(self, url_pattern, url_params, count=1):
+        """
+        Returns a list of `count` {url_parameter: value} dicts.
+        """
+        regexes = get_url_parameter_regexes(url_pattern)
+        samples = [{} for _ in range(count)]
+        for url_parameter in url_params:
+            provider = self.get_provider(regexes.get(url_parameter))
+            if provider is not None:
+                values = provider.get_values(count)
+            else:
+                values = [self.default_value() for _ in range(count)]
+            for sample, value in zip(samples, values):
+                sample[url_parameter] = value
+        return samples
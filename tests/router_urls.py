@@ -0,0 +1,8 @@
+from django.urls import include, path
+
+from .routers import router
+
+
+urlpatterns = [
+    path('api/', include(router.urls)),
+]
@@ -0,0 +1,8 @@
+from rest_framework.routers import SimpleRouter
+
+from .views import SimpleViewSet
+
+
+# kept in its own module, like routers of many projects
+router = SimpleRouter()
+router.register(r'routed-view-set', SimpleViewSet, basename='routed-view-set')
@@ -0,0 +1,10 @@
+# -*- coding: utf-8
+from __future__ import unicode_literals, absolute_import
+
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES
+
+DATABASES = dict(DATABASES, other={
+    "ENGINE": "django.db.backends.sqlite3",
+    "NAME": ":memory:",
+})
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for baselines of smoke tests results.
+"""
+import os
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
+
+from django_smoke_tests.baseline import (
+    BaselineNotAvailable, SnapshotWriter, compare_snapshots, get_thresholds, load_snapshot
+)
+
+RECORD = {
+    'test_name': 'test_smoke_GET_^items/$',
+    'method': 'GET',
+    'url': '/items/',
+    'url_name': 'items',
+    'outcome': 'passed',
+    'status_code': 200,
+    'duration_ms': 12.345,
+    'query_count': 3,
+    'response_size': 1024,
+    'skip_reason': None,
+    'message': None,
+}
+THRESHOLDS = {'latency_ratio': 1.5, 'latency_ms': 20, 'query_count': 0}
+
+
+class TestSnapshotWriter(TestCase):
+
+    def setUp(self):
+        super(TestSnapshotWriter, self).setUp()
+        self.baseline_dir = tempfile.mkdtemp()
+        self.baseline_path = os.path.join(self.baseline_dir, 'baseline.jsonl')
+
+    def tearDown(self):
+        shutil.rmtree(self.baseline_dir)
+
+    def test_snapshot_replaces_baseline_when_closed(self):
+        writer = SnapshotWriter(self.baseline_path)
+        writer.open()
+        writer.write(RECORD)
+        writer.write(dict(RECORD, test_name='test_smoke_POST_^items/$', outcome='skipped'))
+        self.assertFalse(os.path.exists(self.baseline_path))
+
+        writer.close()
+
+        self.assertEqual(writer.snapshot_path, self.baseline_path)
+        self.assertEqual(
+            load_snapshot(self.baseline_path), {'test_smoke_GET_^items/$': (200, 12.3, 3)}
+        )
+        self.assertEqual(os.listdir(self.baseline_dir), ['baseline.jsonl'])
+
+    def test_temporary_snapshot_is_discarded(self):
+        writer = SnapshotWriter()
+        writer.open()
+        writer.write(RECORD)
+        writer.close()
+        self.assertEqual(
+            load_snapshot(writer.snapshot_path), {'test_smoke_GET_^items/$': (200, 12.3, 3)}
+        )
+
+        writer.discard()
+
+        self.assertFalse(os.path.exists(writer.snapshot_path))
+
+    def test_missing_baseline_raises_error(self):
+        with self.assertRaises(BaselineNotAvailable):
+            load_snapshot(self.baseline_path)
+
+
+class TestCompareSnapshots(TestCase):
+
+    def _compare(self, old_result, new_result):
+        changes = compare_snapshots({'test': old_result}, {'test': new_result}, THRESHOLDS)
+        return [description for _, description in changes]
+
+    def test_status_code_change_is_reported(self):
+        self.assertEqual(
+            self._compare((200, 10, 1), (404, 10, 1)), ['status code changed from 200 to 404']
+        )
+
+    def test_latency_regression_is_reported(self):
+        self.assertEqual(
+            self._compare((200, 40, 1), (200, 100, 1)),
+            ['latency increased from 40.0 ms to 100.0 ms']
+        )
+
+    def test_latency_change_within_thresholds_is_ignored(self):
+        self.assertEqual(self._compare((200, 40, 1), (200, 55, 1)), [])  # below ratio
+        self.assertEqual(self._compare((200, 2, 1), (200, 10, 1)), [])  # below absolute increase
+
+    def test_query_regression_is_reported(self):
+        self.assertEqual(
+            self._compare((200, 10, 1), (200, 10, 4)), ['queries increased from 1 to 4']
+        )
+
+    def test_tests_missing_in_one_of_snapshots_are_ignored(self):
+        self.assertEqual(
+            compare_snapshots({'old': (200, 1, 1)}, {'new': (500, 1, 1)}, THRESHOLDS), []
+        )
+
+    @override_settings(SMOKE_TESTS_BASELINE_THRESHOLDS={'query_count': 5})
+    def test_thresholds_are_overridden_in_settings(self):
+        self.assertEqual(
+            get_thresholds(), {'latency_ratio': 1.5, 'latency_ms': 20, 'query_count': 5}
+        )
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for on-disk caches.
+"""
+import os
+import shutil
+import tempfile
+
+from django.test import TestCase
+
+from django_smoke_tests.cache import UrlInventoryCache
+
+
+class TestUrlInventoryCache(TestCase):
+
+    def setUp(self):
+        super(TestUrlInventoryCache, self).setUp()
+        self.cache_dir = tempfile.mkdtemp()
+        self.source_file = os.path.join(self.cache_dir, 'urls.py')
+        with open(self.source_file, 'w') as f:
+            f.write('urlpatterns = []')
+        self.all_patterns = [('^test/$', 'tests.views.view', 'test', None, None)]
+        self.normalized_patterns = {'^test/$': ('test/', []), '^(?P<pk>.+)?': None}
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_saved_inventory_is_loaded(self):
+        UrlInventoryCache('tests.urls', self.cache_dir).save(
+            self.all_patterns, self.normalized_patterns, [self.source_file]
+        )
+
+        url_cache = UrlInventoryCache('tests.urls', self.cache_dir)
+        self.assertEqual(url_cache.load(), (self.all_patterns, self.normalized_patterns))
+        self.assertEqual(url_cache.source_files, [self.source_file])
+
+    def test_missing_inventory_is_not_loaded(self):
+        self.assertIsNone(UrlInventoryCache('tests.urls', self.cache_dir).load())
+
+    def test_inventory_is_invalidated_when_source_file_changes(self):
+        UrlInventoryCache('tests.urls', self.cache_dir).save(
+            self.all_patterns, self.normalized_patterns, [self.source_file]
+        )
+        with open(self.source_file, 'a') as f:
+            f.write('\nurlpatterns += []')
+
+        self.assertIsNone(UrlInventoryCache('tests.urls', self.cache_dir).load())
+
+    def test_inventory_is_stored_per_urlconf(self):
+        UrlInventoryCache('tests.urls', self.cache_dir).save(
+            self.all_patterns, self.normalized_patterns, [self.source_file]
+        )
+
+        self.assertIsNone(UrlInventoryCache('tests.other_urls', self.cache_dir).load())
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for detecting endpoints affected by changed files.
+"""
+import io
+import os
+import shutil
+import sys
+import tempfile
+
+from django.test import TestCase
+from mock import patch
+
+from django_smoke_tests.changes import (
+    ChangedFilesNotAvailable, ImportGraph, get_changed_files, get_module_name
+)
+
+PACKAGE_FILES = {
+    '__init__.py': '',
+    'views.py': 'from . import forms\nfrom .utils import helper\n',
+    'other_views.py': 'import json\n',
+    'forms.py': 'import smoke_pkg.models\n',
+    'models.py': '',
+    'utils.py': 'def helper():\n    pass\n',
+}
+
+
+class TestImportGraph(TestCase):
+
+    def setUp(self):
+        super(TestImportGraph, self).setUp()
+        self.project_dir = tempfile.mkdtemp()
+        package_dir = os.path.join(self.project_dir, 'smoke_pkg')
+        os.mkdir(package_dir)
+        for file_name, content in PACKAGE_FILES.items():
+            with open(os.path.join(package_dir, file_name), 'w') as f:
+                f.write(content)
+        sys.path.insert(0, self.project_dir)
+        self.graph = ImportGraph(self.project_dir)
+        self.views = ['smoke_pkg.views', 'smoke_pkg.other_views']
+
+    def tearDown(self):
+        sys.path.remove(self.project_dir)
+        for module_name in list(sys.modules):
+            if module_name.split('.')[0] == 'smoke_pkg':
+                del sys.modules[module_name]
+        shutil.rmtree(self.project_dir)
+
+    def _changed(self, file_name):
+        return {os.path.join(self.project_dir, 'smoke_pkg', file_name)}
+
+    def test_changed_view_module_is_affected(self):
+        self.assertEqual(
+            self.graph.get_affected_modules(self.views, self._changed('other_views.py')),
+            {'smoke_pkg.other_views'}
+        )
+
+    def test_view_importing_changed_module_transitively_is_affected(self):
+        self.assertEqual(
+            self.graph.get_affected_modules(self.views, self._changed('models.py')),
+            {'smoke_pkg.views', 'smoke_pkg.forms', 'smoke_pkg.models'}
+        )
+
+    def test_view_importing_changed_module_relatively_is_affected(self):
+        self.assertIn(
+            'smoke_pkg.views',
+            self.graph.get_affected_modules(self.views, self._changed('utils.py'))
+        )
+
+    def test_changes_outside_of_imported_modules_affect_nothing(self):
+        self.assertEqual(
+            self.graph.get_affected_modules(self.views, {os.path.join(self.project_dir, 'README')}),
+            set()
+        )
+
+
+class TestChangedFiles(TestCase):
+
+    def test_changed_files_are_read_from_stdin(self):
+        stdin = io.StringIO('tests/views.py\n\n  tests/app/views.py \n')
+        self.assertEqual(
+            get_changed_files('-', stdin=stdin),
+            {os.path.abspath('tests/views.py'), os.path.abspath('tests/app/views.py')}
+        )
+
+    @patch('django_smoke_tests.changes.subprocess.check_output', side_effect=OSError('no git'))
+    def test_missing_git_raises_error(self, mocked_check_output):
+        with self.assertRaises(ChangedFilesNotAvailable):
+            get_changed_files('HEAD')
+
+    def test_module_name_is_found_for_view(self):
+        self.assertEqual(get_module_name('tests.views.skipped_view'), 'tests.views')
+        self.assertIsNone(get_module_name('not_existing_module.view'))
@@ -4,12 +4,21 @@
 """
 Tests for `smoke_tests` command.
 """
+import json
+import os
 import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
 
 from django.core.management import call_command, CommandError
 from django.test import TestCase
+from django.test.runner import tblib
 from django.urls import URLPattern
 from mock import patch
+from parameterized import parameterized
 
 from django_smoke_tests.generator import HTTPMethodNotSupported, SmokeTestsGenerator, get_pattern
 from django_smoke_tests.tests import SmokeTests
@@ -70,7 +79,7 @@ class TestSmokeTestsCommand(TestCase):
             call_command('smoke_tests', http_methods='WRONG')
         mocked_call_command.assert_not_called()
 
-    @patch('django_smoke_tests.management.commands.smoke_tests.SmokeTestsGenerator')
+    @patch('django_smoke_tests.generator.SmokeTestsGenerator')
     def test_right_allowed_status_codes_are_passed_to_test_generator(self, mocked_generator):
         mocked_generator.return_value.warnings = []
         allowed_status_codes = '200,201'
@@ -80,7 +89,7 @@ class TestSmokeTestsCommand(TestCase):
             [int(code) for code in allowed_status_codes.split(',')]
         )
 
-    @patch('django_smoke_tests.management.commands.smoke_tests.SmokeTestsGenerator')
+    @patch('django_smoke_tests.generator.SmokeTestsGenerator')
     def test_right_disallowed_status_codes_are_passed_to_test_generator(self, mocked_generator):
         mocked_generator.return_value.warnings = []
         disallowed_status_codes = '400,401'
@@ -90,7 +99,7 @@ class TestSmokeTestsCommand(TestCase):
             [int(code) for code in disallowed_status_codes.split(',')]
         )
 
-    @patch('django_smoke_tests.management.commands.smoke_tests.SmokeTestsGenerator')
+    @patch('django_smoke_tests.generator.SmokeTestsGenerator')
     def test_disable_migrations_option_is_passed_to_test_generator(self, mocked_generator):
         mocked_generator.return_value.warnings = []
         disable_migrations = True
@@ -101,7 +110,7 @@ class TestSmokeTestsCommand(TestCase):
             disable_migrations
         )
 
-    @patch('django_smoke_tests.management.commands.smoke_tests.SmokeTestsGenerator')
+    @patch('django_smoke_tests.generator.SmokeTestsGenerator')
     def test_use_db_option_is_passed_to_test_generator(self, mocked_generator):
         mocked_generator.return_value.warnings = []
         no_db = True
@@ -112,7 +121,7 @@ class TestSmokeTestsCommand(TestCase):
             not no_db
         )
 
-    @patch('django_smoke_tests.management.commands.smoke_tests.SmokeTestsGenerator')
+    @patch('django_smoke_tests.generator.SmokeTestsGenerator')
     def test_app_name_option_is_passed_to_test_generator(self, mocked_generator):
         mocked_generator.return_value.warnings = []
         app_name = 'test_app_name'
@@ -123,7 +132,7 @@ class TestSmokeTestsCommand(TestCase):
             app_name
         )
 
-    @patch('django_smoke_tests.management.commands.smoke_tests.SmokeTestsGenerator')
+    @patch('django_smoke_tests.generator.SmokeTestsGenerator')
     def test_multiple_app_names_are_passed_to_test_generator(self, mocked_generator):
         mocked_generator.return_value.warnings = []
         first_app = create_random_string()
@@ -139,7 +148,7 @@ class TestSmokeTestsCommand(TestCase):
             second_app
         )
 
-    @patch('django_smoke_tests.management.commands.smoke_tests.SmokeTestsGenerator')
+    @patch('django_smoke_tests.generator.SmokeTestsGenerator')
     def test_settings_option_is_passed_to_test_generator(self, mocked_generator):
         mocked_generator.return_value.warnings = []
         settings = 'tests.settings'
@@ -150,7 +159,7 @@ class TestSmokeTestsCommand(TestCase):
             settings
         )
 
-    @patch('django_smoke_tests.management.commands.smoke_tests.SmokeTestsGenerator')
+    @patch('django_smoke_tests.generator.SmokeTestsGenerator')
     def test_configuration_option_is_passed_to_test_generator(self, mocked_generator):
         mocked_generator.return_value.warnings = []
         configuration = 'Development'
@@ -161,6 +170,372 @@ class TestSmokeTestsCommand(TestCase):
             configuration
         )
 
+    @patch('django_smoke_tests.generator.SmokeTestsGenerator')
+    def test_parallel_option_is_passed_to_test_generator(self, mocked_generator):
+        mocked_generator.return_value.warnings = []
+        parallel = 4
+
+        call_command('smoke_tests', parallel=parallel)
+        self.assertEqual(
+            mocked_generator.call_args[1]['parallel'],
+            parallel
+        )
+
+    @patch('django_smoke_tests.generator.SmokeTestsGenerator')
+    def test_engine_options_are_passed_to_test_generator(self, mocked_generator):
+        mocked_generator.return_value.warnings = []
+
+        call_command('smoke_tests', engine='async', concurrency=5)
+        self.assertEqual(mocked_generator.call_args[1]['engine'], 'async')
+        self.assertEqual(mocked_generator.call_args[1]['concurrency'], 5)
+
+    @patch('django_smoke_tests.generator.SmokeTestsGenerator')
+    def test_cache_urls_option_is_passed_to_test_generator(self, mocked_generator):
+        mocked_generator.return_value.warnings = []
+
+        call_command('smoke_tests', cache_urls=True)
+        self.assertTrue(mocked_generator.call_args[1]['cache_urls'])
+
+    @patch('django_smoke_tests.generator.SmokeTestsGenerator')
+    def test_auth_mode_option_is_passed_to_test_generator(self, mocked_generator):
+        mocked_generator.return_value.warnings = []
+
+        call_command('smoke_tests', auth_mode='per-class')
+        self.assertEqual(mocked_generator.call_args[1]['auth_mode'], 'per-class')
+
+    @patch('django_smoke_tests.generator.SmokeTestsGenerator')
+    def test_changed_since_option_is_passed_to_test_generator(self, mocked_generator):
+        mocked_generator.return_value.warnings = []
+
+        call_command('smoke_tests', changed_since='origin/master')
+        self.assertEqual(mocked_generator.call_args[1]['changed_since'], 'origin/master')
+
+    @patch('django_smoke_tests.generator.call_command')
+    def test_raise_an_error_when_baseline_is_not_available(self, mocked_call_command):
+        with self.assertRaises(CommandError):
+            call_command('smoke_tests', compare_baseline='not_existing_baseline.jsonl')
+        mocked_call_command.assert_not_called()
+
+    @patch('django_smoke_tests.changes.subprocess.check_output', side_effect=OSError('no git'))
+    @patch('django_smoke_tests.generator.call_command')
+    def test_raise_an_error_when_changed_files_are_not_available(
+            self, mocked_call_command, mocked_check_output
+    ):
+        with self.assertRaises(CommandError):
+            call_command('smoke_tests', changed_since='HEAD')
+        mocked_call_command.assert_not_called()
+
+    @patch('django_smoke_tests.generator.multiprocessing.get_start_method', return_value='spawn')
+    @patch('django_smoke_tests.generator.call_command')
+    def test_raise_an_error_when_parallel_execution_is_not_supported(
+            self, mocked_call_command, mocked_get_start_method
+    ):
+        with self.assertRaises(CommandError):
+            call_command('smoke_tests', parallel=2)
+        mocked_call_command.assert_not_called()
+
+    @patch('django_smoke_tests.generator.SmokeTestsGenerator')
+    def test_report_option_is_passed_to_test_generator(self, mocked_generator):
+        mocked_generator.return_value.warnings = []
+
+        call_command('smoke_tests', report=['junit', 'report.xml'])
+        self.assertEqual(mocked_generator.call_args[1]['report'], ['junit', 'report.xml'])
+
+    @patch('django_smoke_tests.generator.SmokeTestsGenerator')
+    def test_baseline_options_are_passed_to_test_generator(self, mocked_generator):
+        mocked_generator.return_value.warnings = []
+
+        call_command('smoke_tests', save_baseline='new.jsonl', compare_baseline='old.jsonl')
+        self.assertEqual(mocked_generator.call_args[1]['save_baseline'], 'new.jsonl')
+        self.assertEqual(mocked_generator.call_args[1]['compare_baseline'], 'old.jsonl')
+
+    @patch('django_smoke_tests.generator.SmokeTestsGenerator')
+    def test_shared_db_option_is_passed_to_test_generator(self, mocked_generator):
+        mocked_generator.return_value.warnings = []
+
+        call_command('smoke_tests', shared_db=True)
+        self.assertTrue(mocked_generator.call_args[1]['shared_db'])
+
+    @patch('django_smoke_tests.generator.SmokeTestsGenerator')
+    def test_cache_fixture_option_is_passed_to_test_generator(self, mocked_generator):
+        mocked_generator.return_value.warnings = []
+
+        call_command('smoke_tests', fixture='fixture.json', cache_fixture=True)
+        self.assertTrue(mocked_generator.call_args[1]['cache_fixture'])
+
+    @patch('django_smoke_tests.generator.SmokeTestsGenerator')
+    def test_stream_fixture_option_is_passed_to_test_generator(self, mocked_generator):
+        mocked_generator.return_value.warnings = []
+
+        call_command('smoke_tests', fixture='fixture.json', stream_fixture=True)
+        self.assertTrue(mocked_generator.call_args[1]['stream_fixture'])
+
+    @patch('django_smoke_tests.generator.SmokeTestsGenerator')
+    def test_resolve_url_params_option_is_passed_to_test_generator(self, mocked_generator):
+        mocked_generator.return_value.warnings = []
+
+        call_command('smoke_tests', resolve_url_params=True)
+        self.assertTrue(mocked_generator.call_args[1]['resolve_url_params'])
+
+    @patch('django_smoke_tests.generator.SmokeTestsGenerator')
+    def test_samples_per_url_option_is_passed_to_test_generator(self, mocked_generator):
+        mocked_generator.return_value.warnings = []
+
+        call_command('smoke_tests', samples_per_url=5)
+        self.assertEqual(mocked_generator.call_args[1]['samples_per_url'], 5)
+
+    def test_raise_an_error_for_not_positive_samples_per_url(self):
+        with self.assertRaises(CommandError):
+            call_command('smoke_tests', samples_per_url=0)
+
+    @patch('django_smoke_tests.generator.SmokeTestsGenerator')
+    def test_compact_option_is_passed_to_test_generator(self, mocked_generator):
+        mocked_generator.return_value.warnings = []
+
+        call_command('smoke_tests', compact=True)
+        self.assertTrue(mocked_generator.call_args[1]['compact'])
+
+    @patch('django_smoke_tests.generator.SmokeTestsGenerator')
+    def test_repeat_option_is_passed_to_test_generator(self, mocked_generator):
+        mocked_generator.return_value.warnings = []
+
+        call_command('smoke_tests', repeat=100, concurrency=8)
+        self.assertEqual(mocked_generator.call_args[1]['repeat'], 100)
+        self.assertEqual(mocked_generator.call_args[1]['concurrency'], 8)
+
+    def test_raise_an_error_for_not_positive_repeat(self):
+        with self.assertRaises(CommandError):
+            call_command('smoke_tests', repeat=0)
+
+    @patch('django_smoke_tests.generator.SmokeTestsGenerator')
+    def test_base_url_option_is_passed_to_test_generator(self, mocked_generator):
+        mocked_generator.return_value.warnings = []
+
+        call_command('smoke_tests', base_url='http://127.0.0.1:8000')
+        self.assertEqual(mocked_generator.call_args[1]['base_url'], 'http://127.0.0.1:8000')
+
+    def test_raise_an_error_for_invalid_base_url(self):
+        with self.assertRaises(CommandError):
+            call_command('smoke_tests', base_url='127.0.0.1:8000')
+
+    @patch('django_smoke_tests.generator.SmokeTestsGenerator')
+    def test_memory_options_are_passed_to_test_generator(self, mocked_generator):
+        mocked_generator.return_value.warnings = []
+
+        call_command('smoke_tests', profile_memory=True, max_memory_kb=1024)
+        self.assertTrue(mocked_generator.call_args[1]['profile_memory'])
+        self.assertEqual(mocked_generator.call_args[1]['max_memory_kb'], 1024)
+
+    @patch('django_smoke_tests.generator.SmokeTestsGenerator')
+    def test_profile_top_option_is_passed_to_test_generator(self, mocked_generator):
+        mocked_generator.return_value.warnings = []
+
+        call_command('smoke_tests', profile_top=5)
+        self.assertEqual(mocked_generator.call_args[1]['profile_top'], 5)
+
+    @parameterized.expand([
+        ({'engine': 'async'}, {'max_latency_ms': 100}),
+        ({'repeat': 10}, {'max_latency_ms': 100}),
+        ({'base_url': 'http://127.0.0.1:8000'}, {'max_latency_ms': 100}),
+        ({'engine': 'async'}, {'count_queries': True}),
+        ({'repeat': 10}, {'max_queries': 10}),
+        ({'engine': 'async'}, {'profile_memory': True}),
+        ({'base_url': 'http://127.0.0.1:8000'}, {'max_memory_kb': 1024}),
+        ({'repeat': 10}, {'profile_top': 5}),
+    ])
+    @patch('django_smoke_tests.generator.SmokeTestsGenerator')
+    def test_raise_an_error_for_measurements_with_engines(
+            self, engine_options, measurement_options, mocked_generator
+    ):
+        with self.assertRaises(CommandError):
+            call_command('smoke_tests', **dict(engine_options, **measurement_options))
+        mocked_generator.assert_not_called()
+
+    @patch('django_smoke_tests.generator.SmokeTestsGenerator')
+    def test_raise_an_error_for_profile_top_with_parallel(self, mocked_generator):
+        with self.assertRaises(CommandError):
+            call_command('smoke_tests', profile_top=5, parallel=2)
+        mocked_generator.assert_not_called()
+
+    @patch('django_smoke_tests.generator.SmokeTestsGenerator')
+    def test_reuse_db_option_is_passed_to_test_generator(self, mocked_generator):
+        mocked_generator.return_value.warnings = []
+
+        call_command('smoke_tests', reuse_db=True)
+        self.assertTrue(mocked_generator.call_args[1]['reuse_db'])
+
+    @parameterized.expand([
+        ({'engine': 'async'},),
+        ({'repeat': 10},),
+    ])
+    @patch('django_smoke_tests.generator.SmokeTestsGenerator')
+    def test_raise_an_error_for_reuse_db_with_engines(self, options, mocked_generator):
+        with self.assertRaises(CommandError):
+            call_command('smoke_tests', reuse_db=True, **options)
+        mocked_generator.assert_not_called()
+
+    @patch('django_smoke_tests.generator.SmokeTestsGenerator')
+    def test_cache_schema_option_is_passed_to_test_generator(self, mocked_generator):
+        mocked_generator.return_value.warnings = []
+
+        call_command('smoke_tests', no_migrations=True, cache_schema=True)
+        self.assertTrue(mocked_generator.call_args[1]['cache_schema'])
+
+    @patch('django_smoke_tests.generator.SmokeTestsGenerator')
+    def test_raise_an_error_for_cache_schema_without_no_migrations(self, mocked_generator):
+        with self.assertRaises(CommandError):
+            call_command('smoke_tests', cache_schema=True)
+        mocked_generator.assert_not_called()
+
+    @patch('django_smoke_tests.generator.SmokeTestsGenerator')
+    def test_skip_unimplemented_methods_option_is_passed_to_test_generator(self, mocked_generator):
+        mocked_generator.return_value.warnings = []
+
+        call_command('smoke_tests', skip_unimplemented_methods=True)
+        self.assertTrue(mocked_generator.call_args[1]['skip_unimplemented_methods'])
+
+    @patch('django_smoke_tests.generator.SmokeTestsGenerator')
+    def test_include_and_exclude_options_are_passed_to_test_generator(self, mocked_generator):
+        mocked_generator.return_value.warnings = []
+
+        call_command(
+            'smoke_tests', '--include', 'namespace:api', '--include', 'name:user-*',
+            '--exclude', 'url:^admin/',
+        )
+        self.assertEqual(mocked_generator.call_args[1]['include'], ['namespace:api', 'name:user-*'])
+        self.assertEqual(mocked_generator.call_args[1]['exclude'], ['url:^admin/'])
+
+    @patch('django_smoke_tests.generator.SmokeTestsGenerator')
+    def test_shard_options_are_passed_to_test_generator(self, mocked_generator):
+        mocked_generator.return_value.warnings = []
+
+        call_command('smoke_tests', shard='2/4', shard_durations='report.jsonl')
+        self.assertEqual(mocked_generator.call_args[1]['shard'], '2/4')
+        self.assertEqual(mocked_generator.call_args[1]['shard_durations'], 'report.jsonl')
+
+    @parameterized.expand([
+        ({'shard': '5/4'},),
+        ({'shard': '1/2', 'shard_durations': 'not_existing_report.jsonl'},),
+    ])
+    @patch('django_smoke_tests.generator.call_command')
+    def test_raise_an_error_for_invalid_shard(self, options, mocked_call_command):
+        with self.assertRaises(CommandError):
+            call_command('smoke_tests', **options)
+        mocked_call_command.assert_not_called()
+
+    @parameterized.expand([
+        ({'include': ['kind:value']},),
+        ({'exclude': ['url:(']},),
+    ])
+    @patch('django_smoke_tests.generator.call_command')
+    def test_raise_an_error_for_invalid_selection_rule(self, options, mocked_call_command):
+        with self.assertRaises(CommandError):
+            call_command('smoke_tests', **options)
+        mocked_call_command.assert_not_called()
+
+    @patch('django_smoke_tests.generator.SmokeTestsGenerator')
+    def test_list_option_is_passed_to_test_generator(self, mocked_generator):
+        mocked_generator.return_value.warnings = []
+
+        call_command('smoke_tests', list_tests=True)
+        self.assertTrue(mocked_generator.call_args[1]['list_tests'])
+
+    def test_help_does_not_import_test_cases_runners_and_engines(self):
+        code = (
+            'import sys, django; django.setup(); '
+            'from django.core.management import load_command_class; '
+            'load_command_class("django_smoke_tests", "smoke_tests")'
+            '.create_parser("manage.py", "smoke_tests").format_help(); '
+            'print(",".join(sorted(sys.modules)))'
+        )
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE='tests.settings')
+        output = subprocess.check_output(
+            [sys.executable, '-c', code], cwd=os.path.dirname(os.path.dirname(__file__)), env=env
+        )
+
+        imported_modules = output.decode().strip().split(',')
+        for module_name in (
+            'django.test', 'django_smoke_tests.generator', 'django_smoke_tests.tests',
+            'django_smoke_tests.runners', 'django_smoke_tests.engine',
+        ):
+            self.assertNotIn(module_name, imported_modules)
+
+    def run_command(self, *args):
+        return subprocess.run(
+            [sys.executable, 'manage.py', 'smoke_tests', '--get-only'] + list(args),
+            cwd=os.path.dirname(os.path.dirname(__file__)),
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+        )
+
+    def run_command_with_multiple_databases(self, *args):
+        return self.run_command(
+            '--disallow-status-codes', '500', '--settings', 'tests.settings_multi_db', *args
+        )
+
+    def test_count_queries_with_multiple_databases(self):
+        process = self.run_command_with_multiple_databases('--count-queries')
+        self.assertEqual(process.returncode, 0, process.stdout.decode())
+
+    def test_report_with_multiple_databases(self):
+        report_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, report_dir)
+        report_path = os.path.join(report_dir, 'report.jsonl')
+
+        process = self.run_command_with_multiple_databases('--report', 'jsonl', report_path)
+        self.assertEqual(process.returncode, 0, process.stdout.decode())
+        with open(report_path) as f:
+            records = [json.loads(line) for line in f]
+        self.assertTrue(records)
+        for record in records:
+            if record['outcome'] != 'skipped':
+                self.assertIsNotNone(record['query_count'])
+
+    def test_baseline_with_multiple_databases(self):
+        baseline_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, baseline_dir)
+        baseline_path = os.path.join(baseline_dir, 'baseline.jsonl')
+
+        process = self.run_command_with_multiple_databases('--save-baseline', baseline_path)
+        self.assertEqual(process.returncode, 0, process.stdout.decode())
+        process = self.run_command_with_multiple_databases('--compare-baseline', baseline_path)
+        self.assertEqual(process.returncode, 0, process.stdout.decode())
+        with open(baseline_path) as f:
+            snapshot = [json.loads(line) for line in f]
+        self.assertTrue(snapshot)
+        for _, _, _, query_count in snapshot:
+            self.assertIsNotNone(query_count)
+
+    @unittest.skipUnless(tblib, 'tracebacks are sent from parallel processes with tblib')
+    def test_failed_cases_of_compact_tests_are_reported_from_parallel_processes(self):
+        # redirects (301) of endpoints without trailing slashes fail
+        process = self.run_command('--compact', '--parallel', '2', '--allow-status-codes', '200')
+
+        output = process.stdout.decode()
+        self.assertEqual(process.returncode, 1, output)
+        self.assertIn('SMOKE TEST FAILED', output)
+        self.assertIn('[test_smoke_GET_^test/$]', output)
+        self.assertNotIn('pickle', output)
+
+    def test_raise_an_error_for_not_supported_report_format(self):
+        with self.assertRaises(CommandError):
+            call_command('smoke_tests', report=['html', 'report.html'])
+
+    @patch('django_smoke_tests.generator.SmokeTestsGenerator')
+    def test_latency_budget_options_are_passed_to_test_generator(self, mocked_generator):
+        mocked_generator.return_value.warnings = []
+
+        call_command('smoke_tests', max_latency_ms=250, budget_action='warn')
+        self.assertEqual(mocked_generator.call_args[1]['max_latency_ms'], 250)
+        self.assertEqual(mocked_generator.call_args[1]['budget_action'], 'warn')
+
+    @patch('django_smoke_tests.generator.SmokeTestsGenerator')
+    def test_query_options_are_passed_to_test_generator(self, mocked_generator):
+        mocked_generator.return_value.warnings = []
+
+        call_command('smoke_tests', count_queries=True, max_queries=20)
+        self.assertTrue(mocked_generator.call_args[1]['count_queries'])
+        self.assertEqual(mocked_generator.call_args[1]['max_queries'], 20)
+
     def test_error_is_raised_when_both_allowed_and_disallowed_specified(self):
         allowed_status_codes = '200,201'
         disallowed_status_codes = '400,401'
@@ -173,7 +548,7 @@ class TestSmokeTestsCommand(TestCase):
             )
 
     @patch('django_smoke_tests.generator.call_command')
-    @patch('django_smoke_tests.management.commands.smoke_tests.SmokeTestsGenerator')
+    @patch('django_smoke_tests.generator.SmokeTestsGenerator')
     def test_warnings_are_printed(self, mocked_generator, mocked_call_command):
         mocked_generator.return_value.warnings = [
             create_random_string() for _ in range(random.randint(1, 10))
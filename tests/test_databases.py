@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for test databases reused between runs.
+"""
+import shutil
+import tempfile
+
+from django.core.management.commands import migrate
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import TestCase, override_settings
+from mock import Mock, patch
+
+from django_smoke_tests.databases import (
+    SchemaCache, TestDatabaseFingerprints, cache_schema, get_migrations_fingerprint,
+    get_model_tables, get_models_fingerprint, get_schema_fingerprint, get_test_db_fingerprint,
+    is_in_memory_db
+)
+from django_smoke_tests.migrations import DisableMigrations
+from django_smoke_tests.runners import ReusableDbTestRunner
+
+
+class TestFingerprints(TestCase):
+
+    def test_fingerprint_is_stable(self):
+        self.assertEqual(
+            get_test_db_fingerprint(DEFAULT_DB_ALIAS), get_test_db_fingerprint(DEFAULT_DB_ALIAS)
+        )
+
+    def test_migrations_fingerprint_changes_when_migrations_are_disabled(self):
+        fingerprint = get_migrations_fingerprint()
+        with override_settings(MIGRATION_MODULES=DisableMigrations()):
+            self.assertNotEqual(get_migrations_fingerprint(), fingerprint)
+
+    def test_models_fingerprint_changes_with_columns(self):
+        fingerprint = get_models_fingerprint(connection)
+        with patch('django.db.models.fields.CharField.db_type', return_value='text'):
+            self.assertNotEqual(get_models_fingerprint(connection), fingerprint)
+
+    def test_schema_fingerprint_changes_with_migrations_and_columns(self):
+        fingerprint = get_schema_fingerprint()
+        with override_settings(MIGRATION_MODULES=DisableMigrations()):
+            self.assertNotEqual(get_schema_fingerprint(), fingerprint)
+        with patch('django.db.models.fields.CharField.db_type', return_value='text'):
+            self.assertNotEqual(get_schema_fingerprint(), fingerprint)
+
+    def test_in_memory_database_is_detected(self):
+        self.assertTrue(is_in_memory_db(connection))
+
+
+@patch('django_smoke_tests.runners.is_in_memory_db', return_value=False)
+@patch('django.test.runner.DiscoverRunner.setup_databases')
+class TestReusableDbTestRunner(TestCase):
+
+    def setUp(self):
+        super(TestReusableDbTestRunner, self).setUp()
+        self.cache_dir = tempfile.mkdtemp()
+        self.settings_override = override_settings(SMOKE_TESTS_CACHE_DIR=self.cache_dir)
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.cache_dir)
+        super(TestReusableDbTestRunner, self).tearDown()
+
+    def _setup_databases(self, mocked_setup_databases, fingerprint):
+        test_runner = ReusableDbTestRunner(verbosity=0, interactive=False)
+        keepdb_during_setup = []
+        mocked_setup_databases.side_effect = lambda **kwargs: keepdb_during_setup.append(
+            test_runner.keepdb
+        )
+        with patch('django_smoke_tests.runners.get_test_db_fingerprint', return_value=fingerprint):
+            test_runner.setup_databases(aliases={DEFAULT_DB_ALIAS})
+        self.assertTrue(test_runner.keepdb)  # teardown keeps databases
+        return keepdb_during_setup[0]
+
+    def test_database_is_created_in_the_first_run(self, mocked_setup_databases, _):
+        self.assertFalse(self._setup_databases(mocked_setup_databases, 'schema'))
+        self.assertEqual(TestDatabaseFingerprints().load(), {DEFAULT_DB_ALIAS: 'schema'})
+
+    def test_database_is_reused_when_fingerprint_matches(self, mocked_setup_databases, _):
+        self._setup_databases(mocked_setup_databases, 'schema')
+        self.assertTrue(self._setup_databases(mocked_setup_databases, 'schema'))
+
+    def test_database_is_rebuilt_when_fingerprint_changes(self, mocked_setup_databases, _):
+        self._setup_databases(mocked_setup_databases, 'schema')
+        self.assertFalse(self._setup_databases(mocked_setup_databases, 'changed schema'))
+        self.assertEqual(TestDatabaseFingerprints().load(), {DEFAULT_DB_ALIAS: 'changed schema'})
+
+    def test_in_memory_database_is_not_fingerprinted(
+            self, mocked_setup_databases, mocked_is_in_memory_db
+    ):
+        mocked_is_in_memory_db.return_value = True
+        self.assertTrue(self._setup_databases(mocked_setup_databases, 'schema'))
+        self.assertEqual(TestDatabaseFingerprints().load(), {})
+
+
+class TestSchemaCache(TestCase):
+    APP_LABELS = ['auth', 'contenttypes', 'app']
+
+    def setUp(self):
+        super(TestSchemaCache, self).setUp()
+        self.cache_dir = tempfile.mkdtemp()
+        self.settings_override = override_settings(SMOKE_TESTS_CACHE_DIR=self.cache_dir)
+        self.settings_override.enable()
+        self.command = migrate.Command()
+        self.command.verbosity = 0
+
+    def tearDown(self):
+        if hasattr(self, 'empty_connection'):
+            del connections['schema_cache']
+        self.settings_override.disable()
+        shutil.rmtree(self.cache_dir)
+        super(TestSchemaCache, self).tearDown()
+
+    def _create_tables(self, sync_apps):
+        # an empty in-memory database, separate from the test database
+        self.empty_connection = DatabaseWrapper(
+            dict(connection.settings_dict, NAME=':memory:'), alias='schema_cache'
+        )
+        connections['schema_cache'] = self.empty_connection
+        self.addCleanup(self.empty_connection.close)
+        cache_schema(sync_apps)(self.command, self.empty_connection, self.APP_LABELS)
+        with self.empty_connection.cursor() as cursor:
+            return set(self.empty_connection.introspection.table_names(cursor))
+
+    def test_statements_are_cached_in_the_first_run(self):
+        tables = self._create_tables(migrate.Command.sync_apps)
+        self.assertTrue(get_model_tables(connection, self.APP_LABELS) <= tables)
+        self.assertTrue(SchemaCache(self.empty_connection, self.APP_LABELS).load())
+
+    def test_tables_are_created_from_cached_statements(self):
+        tables = self._create_tables(migrate.Command.sync_apps)
+        mocked_sync_apps = Mock()
+        self.assertEqual(self._create_tables(mocked_sync_apps), tables)
+        mocked_sync_apps.assert_not_called()
+
+    def test_cache_is_not_used_when_models_change(self):
+        self._create_tables(migrate.Command.sync_apps)
+        with patch('django.db.models.fields.CharField.db_type', return_value='text'):
+            self.assertIsNone(SchemaCache(self.empty_connection, self.APP_LABELS).load())
+
+    def test_missing_tables_are_created_without_cache(self):
+        mocked_sync_apps = Mock()
+        cache_schema(mocked_sync_apps)(self.command, connection, self.APP_LABELS)
+        mocked_sync_apps.assert_called_once_with(self.command, connection, self.APP_LABELS)
+        self.assertIsNone(SchemaCache(connection, self.APP_LABELS).load())
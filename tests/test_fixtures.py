@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for loading fixtures.
+"""
+import json
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase
+from mock import patch
+
+from django_smoke_tests.fixtures import (
+    FixtureCache, FixtureFormatNotSupported, StreamingFixtureLoader, iter_json_objects,
+    sort_by_dependencies
+)
+from django_smoke_tests.tests import load_fixture
+
+FIXTURE = [
+    {'model': 'auth.group', 'pk': 101, 'fields': {'name': 'astronauts', 'permissions': []}},
+    {'model': 'auth.group', 'pk': 102, 'fields': {'name': 'engineers', 'permissions': []}},
+    {
+        'model': 'app.customusermodel', 'pk': 201,
+        'fields': {
+            'username': 'neil', 'password': '', 'date_joined': '1969-07-20T20:17:40Z',
+            'groups': [101, 102], 'user_permissions': [],
+        },
+    },
+    {
+        'model': 'app.customusermodel', 'pk': 202,
+        'fields': {
+            'username': 'buzz', 'password': '', 'date_joined': '1969-07-20T20:17:40Z',
+            'groups': [101], 'user_permissions': [],
+        },
+    },
+]
+
+
+LOADED_DATA = [(201, 'neil', ['astronauts', 'engineers']), (202, 'buzz', ['astronauts'])]
+
+
+class FixtureTestCase(TestCase):
+
+    def setUp(self):
+        super(FixtureTestCase, self).setUp()
+        self.cache_dir = tempfile.mkdtemp()
+        self.fixture_path = os.path.join(self.cache_dir, 'fixture.json')
+        self._write_fixture(FIXTURE)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def _write_fixture(self, fixture):
+        with open(self.fixture_path, 'w') as f:
+            json.dump(fixture, f)
+
+    def _get_loaded_data(self):
+        return sorted(
+            (user.pk, user.username, sorted(user.groups.values_list('name', flat=True)))
+            for user in get_user_model().objects.filter(pk__in=[201, 202])
+        )
+
+    def _delete_loaded_data(self):
+        get_user_model().objects.filter(pk__in=[201, 202]).delete()
+        Group.objects.filter(pk__in=[101, 102]).delete()
+
+
+class TestFixtureCache(FixtureTestCase):
+
+    def test_fixture_is_loaded_and_cached(self):
+        fixture_cache = FixtureCache(self.fixture_path, cache_dir=self.cache_dir)
+        fixture_cache.load_fixture()
+
+        self.assertTrue(os.path.exists(fixture_cache.path))
+        self.assertEqual(self._get_loaded_data(), LOADED_DATA)
+
+    def test_cached_fixture_is_restored_without_loaddata(self):
+        FixtureCache(self.fixture_path, cache_dir=self.cache_dir).load_fixture()
+        loaded_data = self._get_loaded_data()
+        self._delete_loaded_data()
+
+        with patch('django_smoke_tests.fixtures.call_command') as mocked_call_command:
+            FixtureCache(self.fixture_path, cache_dir=self.cache_dir).load_fixture()
+
+        mocked_call_command.assert_not_called()
+        self.assertEqual(self._get_loaded_data(), loaded_data)
+        # sequences are reset, so new objects don't collide with restored ones
+        self.assertGreater(Group.objects.create(name='pilots').pk, 102)
+
+    def test_cached_fixture_replaces_existing_rows(self):
+        FixtureCache(self.fixture_path, cache_dir=self.cache_dir).load_fixture()
+        get_user_model().objects.filter(pk=201).update(username='armstrong')
+
+        FixtureCache(self.fixture_path, cache_dir=self.cache_dir).load_fixture()
+
+        self.assertEqual(get_user_model().objects.get(pk=201).username, 'neil')
+
+    def test_fixture_is_cached_again_for_different_schema(self):
+        path = FixtureCache(self.fixture_path, cache_dir=self.cache_dir).path
+        with patch('django.db.models.fields.CharField.db_type', return_value='text'):
+            self.assertNotEqual(
+                FixtureCache(self.fixture_path, cache_dir=self.cache_dir).path, path
+            )
+
+    def test_modified_fixture_is_cached_again(self):
+        fixture_cache = FixtureCache(self.fixture_path, cache_dir=self.cache_dir)
+        fixture_cache.load_fixture()
+        self._write_fixture(FIXTURE[:1])
+
+        modified_fixture_cache = FixtureCache(self.fixture_path, cache_dir=self.cache_dir)
+        modified_fixture_cache.load_fixture()
+
+        self.assertNotEqual(modified_fixture_cache.path, fixture_cache.path)
+        self.assertFalse(os.path.exists(fixture_cache.path))
+        self.assertTrue(os.path.exists(modified_fixture_cache.path))
+
+    @patch('django_smoke_tests.tests.call_command')
+    def test_fixture_label_is_loaded_without_cache(self, mocked_call_command):
+        load_fixture('fixture_label', cache_fixture=True)
+
+        mocked_call_command.assert_called_once_with('loaddata', 'fixture_label')
+
+
+class TestStreamingFixtureLoader(FixtureTestCase):
+
+    @patch('django_smoke_tests.fixtures.READ_SIZE', 16)
+    def test_json_array_is_read_in_chunks(self):
+        self.assertEqual(list(iter_json_objects(self.fixture_path)), FIXTURE)
+
+    def test_json_lines_are_read(self):
+        fixture_path = os.path.join(self.cache_dir, 'fixture.jsonl')
+        with open(fixture_path, 'w') as f:
+            f.write('\n'.join(json.dumps(obj) for obj in FIXTURE) + '\n\n')
+
+        self.assertEqual(list(iter_json_objects(fixture_path)), FIXTURE)
+
+    def test_json_object_raises_error(self):
+        self._write_fixture({'model': 'auth.group'})
+
+        with self.assertRaises(FixtureFormatNotSupported):
+            list(iter_json_objects(self.fixture_path))
+
+    def test_models_are_sorted_by_dependencies(self):
+        self.assertEqual(sort_by_dependencies([Permission, ContentType]), [ContentType, Permission])
+
+    def test_fixture_is_loaded_in_batches(self):
+        loaded_objects = StreamingFixtureLoader(self.fixture_path, batch_size=2).load()
+
+        self.assertEqual(self._get_loaded_data(), LOADED_DATA)
+        self.assertEqual(loaded_objects, {Group: {101, 102}, get_user_model(): {201, 202}})
+        # sequences are reset, so new objects don't collide with loaded ones
+        self.assertGreater(Group.objects.create(name='pilots').pk, 102)
+
+    def test_existing_rows_are_replaced(self):
+        StreamingFixtureLoader(self.fixture_path).load()
+        get_user_model().objects.filter(pk=201).update(username='armstrong')
+        get_user_model().objects.get(pk=202).groups.add(102)
+
+        StreamingFixtureLoader(self.fixture_path).load()
+
+        self.assertEqual(self._get_loaded_data(), LOADED_DATA)
+
+    def test_objects_without_primary_keys_are_saved(self):
+        self._write_fixture([
+            {'model': 'auth.group', 'fields': {'name': 'pilots', 'permissions': []}},
+        ])
+
+        StreamingFixtureLoader(self.fixture_path).load()
+
+        self.assertTrue(Group.objects.filter(name='pilots').exists())
+
+    def test_streamed_fixture_is_cached(self):
+        FixtureCache(self.fixture_path, cache_dir=self.cache_dir, stream=True).load_fixture()
+        self._delete_loaded_data()
+
+        FixtureCache(self.fixture_path, cache_dir=self.cache_dir, stream=True).load_fixture()
+
+        self.assertEqual(self._get_loaded_data(), LOADED_DATA)
+
+    @patch('django_smoke_tests.tests.call_command')
+    def test_fixture_is_streamed_instead_of_loaddata(self, mocked_call_command):
+        load_fixture(self.fixture_path, stream_fixture=True)
+
+        mocked_call_command.assert_not_called()
+        self.assertEqual(self._get_loaded_data(), LOADED_DATA)
@@ -1,20 +1,35 @@
+import json
+import multiprocessing
+import os
 import random
+import shutil
+import sys
+import tempfile
+import threading
 import unittest
 from unittest.mock import ANY
 
+from django.contrib.auth import get_user_model
 from django.http import HttpResponse
 from django.test import TestCase, override_settings
 
 from django_smoke_tests.migrations import DisableMigrations
 
-from django.urls import path
+from django.urls import URLResolver, include, path
 from django.views.generic import RedirectView
-from mock import patch
+from mock import AsyncMock, patch
 from parameterized import parameterized
 
-from django_smoke_tests.generator import AppNotInInstalledApps, SmokeTestsGenerator, get_pattern
-from django_smoke_tests.runners import NoDbTestRunner
-from django_smoke_tests.tests import SmokeTests
+from django_smoke_tests.generator import (
+    AppNotInInstalledApps, ParallelExecutionNotSupported, SmokeTestsGenerator, get_pattern
+)
+from django_smoke_tests.cache import UrlInventoryCache
+from django_smoke_tests.cases import SmokeRequest
+from django_smoke_tests.runners import NoDbTestRunner, SmokeTestsParallelSuite
+from django_smoke_tests.sharding import InvalidShard
+from django_smoke_tests.tests import (
+    ANONYMOUS_AUTH, PER_CLASS_AUTH, PER_TEST_AUTH, SharedDbSmokeTests, SmokeTests
+)
 from tests.another_app.urls import another_app_skipped_urls
 
 from tests.app.urls import urlpatterns as app_url_patterns
@@ -23,6 +38,7 @@ from tests.app.urls import (
     url_patterns_with_decorator_with_wraps, url_patterns_with_decorator_without_wraps
 )
 from tests.helpers import captured_output, create_random_string
+from tests.test_live import RecordingServer
 from tests.urls import url_patterns_with_authentication, skipped_url_patterns
 
 
@@ -59,10 +75,17 @@ class TestSmokeTestsGenerator(TestCase):
         self.tests_generator = SmokeTestsGenerator()
 
     def tearDown(self):
-        # remove all tests created and added to SmokeTests
-        tests_created = [attr for attr in vars(SmokeTests) if attr.startswith('test_smoke')]
-        for test_name in tests_created:
-            delattr(SmokeTests, test_name)
+        for test_class in (SmokeTests, SharedDbSmokeTests):
+            # remove all tests created and added to SmokeTests
+            tests_created = [attr for attr in vars(test_class) if attr.startswith('test_smoke')]
+            for test_name in tests_created:
+                delattr(test_class, test_name)
+
+            # reset options set by SmokeTestsGenerator.execute()
+            test_class.fixture_path = None
+            test_class.cache_fixture = False
+            test_class.stream_fixture = False
+            test_class.auth_mode = PER_TEST_AUTH
 
     @parameterized.expand(SUPPORTED_HTTP_METHODS)
     @patch('django_smoke_tests.tests.SmokeTests')
@@ -75,13 +98,13 @@ class TestSmokeTestsGenerator(TestCase):
             hasattr(MockedSmokeTests, expected_test_name)
         )
 
-    def _execute_smoke_test(self, test_name):
+    def _execute_smoke_test(self, test_name, test_class=SmokeTests):
         """
         Executes one test inside current test suite.
         Be careful as it's kind on inception.
         """
         suite = unittest.TestSuite()
-        suite.addTest(SmokeTests(test_name))
+        suite.addTest(test_class(test_name))
         test_runner = unittest.TextTestRunner(stream=DummyStream).run(suite)
 
         self.assertEqual(test_runner.errors, [])  # errors are never expected
@@ -314,8 +337,184 @@ class TestSmokeTestsGenerator(TestCase):
             '/admin/users/{}/delete/'.format(mocked_random_uuid),
             ANY,
             detail_url=True,
+            url_name='test_endpoint',
+            sample=0,
+            implemented_methods=None,
+        )
+
+    @parameterized.expand(SUPPORTED_HTTP_METHODS)
+    def test_if_latency_is_recorded(self, http_method):
+        endpoint_url = '/{}'.format(create_random_string())
+        expected_test_name = self.tests_generator.create_test_name(http_method, endpoint_url)
+        self.tests_generator.create_test_for_http_method(
+            http_method, endpoint_url, detail_url=True, url_name='endpoint'
+        )
+
+        self.tests_generator.summarize_latencies = True
+
+        is_successful, failures, skipped = self._execute_smoke_test(expected_test_name)
+
+        self.assertTrue(is_successful)
+        [(method, url, url_name, latency_ms)] = self.tests_generator.latencies
+        self.assertEqual((method, url, url_name), (http_method, endpoint_url, 'endpoint'))
+        self.assertGreater(latency_ms, 0)
+
+    def test_if_latency_is_not_recorded_without_budgets(self):
+        endpoint_url = '/{}'.format(create_random_string())
+        expected_test_name = self.tests_generator.create_test_name('GET', endpoint_url)
+        self.tests_generator.create_test_for_http_method('GET', endpoint_url, detail_url=True)
+
+        self._execute_smoke_test(expected_test_name)
+
+        self.assertEqual(self.tests_generator.latencies, [])
+
+    def test_if_slowest_endpoints_are_printed_in_summary(self):
+        tests_generator = SmokeTestsGenerator(max_latency_ms=1000)
+        for index in range(SmokeTestsGenerator.TOP_OFFENDERS_COUNT + 1):
+            tests_generator.record_measurements(
+                '/endpoint-{}/'.format(index), 'GET', 'endpoint', {'latency_ms': index}
+            )
+
+        with captured_output() as (out, _):
+            tests_generator._print_summary()
+
+        self.assertIn('Slowest endpoints:', out.getvalue())
+        self.assertIn('GET /endpoint-10/ - 10.0 ms', out.getvalue())
+        self.assertNotIn('GET /endpoint-0/ ', out.getvalue())
+
+    @patch('django_smoke_tests.generator.time')
+    def test_if_smoke_test_fails_when_latency_budget_is_exceeded(self, mocked_time):
+        mocked_time.perf_counter.side_effect = [0, 0.5]  # 500 ms
+        tests_generator = SmokeTestsGenerator(max_latency_ms=100)
+        endpoint_url = '/{}'.format(create_random_string())
+        expected_test_name = tests_generator.create_test_name('GET', endpoint_url)
+        tests_generator.create_test_for_http_method('GET', endpoint_url, detail_url=True)
+
+        is_successful, failures, skipped = self._execute_smoke_test(expected_test_name)
+
+        self.assertFalse(is_successful)
+        self.assertEqual(len(failures), 1)
+        self.assertIn('exceeds budget of 100 ms', failures[0][1])
+        self.assertEqual(tests_generator.budget_warnings, [])
+
+    @patch('django_smoke_tests.generator.time')
+    def test_if_latency_budget_is_overridden_for_url_name(self, mocked_time):
+        mocked_time.perf_counter.side_effect = [0, 0.5]  # 500 ms
+        tests_generator = SmokeTestsGenerator(max_latency_ms=100)
+        endpoint_url = '/{}'.format(create_random_string())
+        expected_test_name = tests_generator.create_test_name('GET', endpoint_url)
+        tests_generator.create_test_for_http_method(
+            'GET', endpoint_url, detail_url=True, url_name='slow_endpoint'
+        )
+
+        with override_settings(SMOKE_TESTS_MAX_LATENCY_MS={'slow_endpoint': 1000}):
+            is_successful, failures, skipped = self._execute_smoke_test(expected_test_name)
+
+        self.assertTrue(is_successful)
+
+    @patch('django_smoke_tests.generator.time')
+    def test_if_exceeded_latency_budget_is_only_reported_in_warn_mode(self, mocked_time):
+        mocked_time.perf_counter.side_effect = [0, 0.5]  # 500 ms
+        tests_generator = SmokeTestsGenerator(
+            max_latency_ms=100, budget_action=SmokeTestsGenerator.WARN_ON_BUDGET
+        )
+        endpoint_url = '/{}'.format(create_random_string())
+        expected_test_name = tests_generator.create_test_name('GET', endpoint_url)
+        tests_generator.create_test_for_http_method('GET', endpoint_url, detail_url=True)
+
+        is_successful, failures, skipped = self._execute_smoke_test(expected_test_name)
+
+        self.assertTrue(is_successful)
+        self.assertEqual(len(tests_generator.budget_warnings), 1)
+        with captured_output() as (out, _):
+            tests_generator._print_summary()
+        self.assertIn(
+            'GET {} - latency 500.0 ms exceeds budget'.format(endpoint_url), out.getvalue()
         )
 
+    @staticmethod
+    def _view_with_n_plus_one_queries(*args, **kwargs):
+        for user_id in range(5):
+            list(get_user_model().objects.filter(id=user_id))
+        return HttpResponse()
+
+    def test_if_queries_are_counted(self):
+        tests_generator = SmokeTestsGenerator(count_queries=True)
+        endpoint_url = '/{}'.format(create_random_string())
+        expected_test_name = tests_generator.create_test_name('GET', endpoint_url)
+        tests_generator.create_test_for_http_method('GET', endpoint_url)
+
+        with patch('django.test.client.Client.get') as mocked_get:
+            mocked_get.side_effect = self._view_with_n_plus_one_queries
+            is_successful, failures, skipped = self._execute_smoke_test(expected_test_name)
+
+        self.assertTrue(is_successful)
+        [(method, url, url_name, query_count, repeated_queries)] = tests_generator.query_counts
+        self.assertEqual(query_count, 5)
+        self.assertEqual(len(repeated_queries), 1)
+        self.assertEqual(repeated_queries[0][1], 5)
+
+        with captured_output() as (out, _):
+            tests_generator._print_summary()
+        self.assertIn('GET {} - 5 queries'.format(endpoint_url), out.getvalue())
+        self.assertIn('Suspected N+1 queries', out.getvalue())
+
+    def test_if_summary_is_collected_from_parallel_processes(self):
+        tests_generator = SmokeTestsGenerator(
+            parallel=2, count_queries=True, profile_memory=True, max_latency_ms=100,
+            budget_action=SmokeTestsGenerator.WARN_ON_BUDGET,
+        )
+        measurements = {
+            'latency_ms': 500, 'query_count': 1, 'queries': ['SELECT 1'],
+            'memory_peak_kb': 64, 'memory_top_sites': [('views.py:10', 1024)],
+        }
+
+        def run_test_in_worker():
+            tests_generator.record_measurements('/endpoint/', 'GET', 'endpoint', measurements)
+            tests_generator.check_budgets('/endpoint/', 'GET', 'endpoint', measurements)
+
+        tests_generator.summary_writer.open()
+        worker = multiprocessing.get_context('fork').Process(target=run_test_in_worker)
+        worker.start()
+        worker.join()
+        tests_generator._load_summary()
+
+        self.assertEqual(
+            tests_generator.budget_warnings,
+            ['GET /endpoint/ - latency 500.0 ms exceeds budget of 100 ms'],
+        )
+        self.assertEqual(tests_generator.latencies, [['GET', '/endpoint/', 'endpoint', 500]])
+        [(method, url, url_name, query_count, _)] = tests_generator.query_counts
+        self.assertEqual((method, url, url_name, query_count), ('GET', '/endpoint/', 'endpoint', 1))
+        [(method, url, url_name, peak_kb, top_sites)] = tests_generator.memory_peaks
+        self.assertEqual((peak_kb, top_sites), (64, [['views.py:10', 1024]]))
+        self.assertFalse(os.path.exists(tests_generator.summary_writer.path))
+
+    @parameterized.expand([
+        ({'max_queries': 4}, {}, False),
+        ({'max_queries': 4}, {'n_plus_one_endpoint': 5}, True),
+        ({}, {'n_plus_one_endpoint': 4}, False),
+        ({'max_queries': 5}, {}, True),
+    ])
+    def test_if_queries_budget_is_applied(
+            self, generator_kwargs, budget_overrides, expected_success
+    ):
+        with override_settings(SMOKE_TESTS_MAX_QUERIES=budget_overrides):
+            tests_generator = SmokeTestsGenerator(**generator_kwargs)
+            endpoint_url = '/{}'.format(create_random_string())
+            expected_test_name = tests_generator.create_test_name('GET', endpoint_url)
+            tests_generator.create_test_for_http_method(
+                'GET', endpoint_url, url_name='n_plus_one_endpoint'
+            )
+
+            with patch('django.test.client.Client.get') as mocked_get:
+                mocked_get.side_effect = self._view_with_n_plus_one_queries
+                is_successful, failures, skipped = self._execute_smoke_test(expected_test_name)
+
+        self.assertEqual(is_successful, expected_success)
+        if not expected_success:
+            self.assertIn('5 queries exceed budget of 4 queries', failures[0][1])
+
     @parameterized.expand(URL_PATTERNS_WITH_AUTH)
     @patch('django_smoke_tests.generator.call_command')
     def test_if_authentication_is_successful(self, url_pattern_with_auth, mocked_call_command):
@@ -330,6 +529,42 @@ class TestSmokeTestsGenerator(TestCase):
         self.assertEqual(failures, [])
         self.assertEqual(tests_generator.warnings, [])
 
+    @parameterized.expand([(PER_TEST_AUTH,), (PER_CLASS_AUTH,)])
+    def test_if_authentication_is_successful_for_auth_mode(self, auth_mode):
+        # 302 means redirect to login
+        tests_generator = SmokeTestsGenerator(allowed_status_codes=[200])
+        http_method = 'GET'
+        endpoint_url = '/test-django-auth/'
+        expected_test_name = tests_generator.create_test_name(http_method, endpoint_url)
+        tests_generator.create_test_for_http_method(http_method, endpoint_url)
+
+        with patch.object(SmokeTests, 'auth_mode', auth_mode):
+            is_successful, failures, skipped = self._execute_smoke_test(expected_test_name)
+
+        self.assertTrue(is_successful)
+        self.assertEqual(failures, [])
+
+    @patch('django_smoke_tests.tests.create_smoke_user')
+    def test_if_anonymous_auth_mode_does_not_create_user(self, mocked_create_smoke_user):
+        tests_generator = SmokeTestsGenerator(allowed_status_codes=[302])  # redirect to login
+        http_method = 'GET'
+        endpoint_url = '/test-django-auth/'
+        expected_test_name = tests_generator.create_test_name(http_method, endpoint_url)
+        tests_generator.create_test_for_http_method(http_method, endpoint_url)
+
+        with patch.object(SmokeTests, 'auth_mode', ANONYMOUS_AUTH):
+            is_successful, failures, skipped = self._execute_smoke_test(expected_test_name)
+
+        self.assertTrue(is_successful)
+        mocked_create_smoke_user.assert_not_called()
+
+    @patch('django_smoke_tests.generator.call_command')
+    def test_if_auth_mode_option_is_applied(self, mocked_call_command):
+        self.addCleanup(setattr, SmokeTests, 'auth_mode', SmokeTests.auth_mode)
+        tests_generator = SmokeTestsGenerator(auth_mode=PER_CLASS_AUTH)
+        tests_generator.execute()
+        self.assertEqual(SmokeTests.auth_mode, PER_CLASS_AUTH)
+
     @override_settings(MIGRATION_MODULES=DisableMigrations())
     def test_if_test_with_disabled_migrations_is_successful(self):
         tests_generator = SmokeTestsGenerator(
@@ -355,6 +590,15 @@ class TestSmokeTestsGenerator(TestCase):
         tests_generator.execute()
         self.assertTrue(isinstance(mocked_settings.MIGRATION_MODULES, DisableMigrations))
 
+    @patch('django_smoke_tests.generator.call_command')
+    @patch('django_smoke_tests.generator.settings')
+    @patch('django_smoke_tests.databases.enable_schema_cache')
+    def test_if_schema_cache_is_enabled_without_migrations(
+            self, mocked_enable_schema_cache, mocked_settings, mocked_call_command
+    ):
+        SmokeTestsGenerator(disable_migrations=True, cache_schema=True).execute()
+        mocked_enable_schema_cache.assert_called_once_with()
+
     @patch('django_smoke_tests.generator.call_command')
     def test_if_settings_module_option_is_applied(self, mocked_call_command):
         settings_module = 'tests.settings'
@@ -423,6 +667,458 @@ class TestSmokeTestsGenerator(TestCase):
             'test', 'django_smoke_tests', testrunner='django_smoke_tests.runners.NoDbTestRunner'
         )
 
+    @patch('django_smoke_tests.generator.call_command')
+    def test_if_reused_db_is_kept_by_custom_runner(self, mocked_call_command):
+        tests_generator = SmokeTestsGenerator(reuse_db=True, parallel=4)
+        tests_generator.execute()
+        mocked_call_command.assert_called_once_with(
+            'test', 'django_smoke_tests', keepdb=True, parallel=4,
+            testrunner='django_smoke_tests.runners.ReusableDbTestRunner'
+        )
+
+    @patch('django_smoke_tests.generator.call_command')
+    def test_if_parallel_option_is_applied(self, mocked_call_command):
+        tests_generator = SmokeTestsGenerator(parallel=4)
+        tests_generator.execute()
+        mocked_call_command.assert_called_once_with(
+            'test', 'django_smoke_tests',
+            parallel=4, testrunner='django_smoke_tests.runners.SmokeTestRunner'
+        )
+
+    @patch('django_smoke_tests.generator.call_command')
+    def test_if_parallel_option_keeps_runner_without_db(self, mocked_call_command):
+        tests_generator = SmokeTestsGenerator(parallel=4, use_db=False)
+        tests_generator.execute()
+        mocked_call_command.assert_called_once_with(
+            'test', 'django_smoke_tests',
+            parallel=4, testrunner='django_smoke_tests.runners.NoDbTestRunner'
+        )
+
+    @patch('django_smoke_tests.generator.multiprocessing.get_start_method')
+    def test_if_error_is_raised_when_parallel_is_not_supported(self, mocked_get_start_method):
+        mocked_get_start_method.return_value = 'spawn'
+        with self.assertRaises(ParallelExecutionNotSupported):
+            SmokeTestsGenerator(parallel=2)
+
+    def test_parallel_suite_splits_smoke_tests_into_deterministic_shards(self):
+        endpoint_urls = ['/{}'.format(create_random_string()) for _ in range(5)]
+        for endpoint_url in endpoint_urls:
+            self.tests_generator.create_test_for_http_method('GET', endpoint_url)
+        test_names = [
+            self.tests_generator.create_test_name('GET', endpoint_url)
+            for endpoint_url in endpoint_urls
+        ]
+        suite = unittest.TestSuite([SmokeTests(test_name) for test_name in test_names])
+        reversed_suite = unittest.TestSuite(
+            [SmokeTests(test_name) for test_name in reversed(test_names)]
+        )
+
+        parallel_suite = SmokeTestsParallelSuite(suite, processes=2)
+        reversed_parallel_suite = SmokeTestsParallelSuite(reversed_suite, processes=2)
+
+        shards = [[test.id() for test in subsuite] for subsuite in parallel_suite.subsuites]
+        reversed_shards = [
+            [test.id() for test in subsuite] for subsuite in reversed_parallel_suite.subsuites
+        ]
+        self.assertEqual(len(shards), 2)
+        self.assertEqual(sorted(shards[0] + shards[1]), sorted(test.id() for test in suite))
+        self.assertEqual(shards, reversed_shards)
+
+    def test_parallel_suite_accepts_arguments_of_django_parallel_suite(self):
+        suite = unittest.TestSuite([SmokeTests('run_cases')])
+
+        parallel_suite = SmokeTestsParallelSuite(suite, 2, failfast=True)
+
+        self.assertTrue(parallel_suite.failfast)
+        self.assertEqual(len(parallel_suite.subsuites), 1)
+
+    @patch('django_smoke_tests.runners.NoDbTestRunner')
+    @patch('django_smoke_tests.generator.call_command')
+    def test_if_async_engine_sends_requests_without_creating_tests(
+            self, mocked_call_command, mocked_test_runner
+    ):
+        tests_generator = SmokeTestsGenerator(
+            engine=SmokeTestsGenerator.ASYNC_ENGINE, use_db=False, http_methods=['GET'],
+            app_names=['tests.another_app'],
+        )
+        with captured_output() as (out, _):
+            tests_generator.execute()
+
+        mocked_call_command.assert_not_called()
+        mocked_test_runner.return_value.setup_databases.assert_called_once()
+        mocked_test_runner.return_value.teardown_databases.assert_called_once()
+        self.assertEqual(
+            [attr for attr in vars(SmokeTests) if attr.startswith('test_smoke')], []
+        )
+        self.assertIn('SKIPPED GET', out.getvalue())
+        self.assertIn('Ran 2 requests, 0 failed, 2 skipped', out.getvalue())
+
+    @patch('django_smoke_tests.runners.NoDbTestRunner')
+    def test_if_async_engine_reports_allowed_response_status_code(self, mocked_test_runner):
+        tests_generator = SmokeTestsGenerator(
+            engine=SmokeTestsGenerator.ASYNC_ENGINE, use_db=False, http_methods=['GET'],
+        )
+        tests_generator.create_test_for_http_method('GET', '/test/')
+
+        with captured_output() as (out, _):
+            tests_generator._execute_requests()
+
+        self.assertIn('OK GET /test/ 301', out.getvalue())
+        self.assertIn('Ran 1 requests, 0 failed, 0 skipped', out.getvalue())
+
+    @patch('django_smoke_tests.runners.NoDbTestRunner')
+    def test_if_async_engine_exits_with_error_on_500_response_status_code(self, mocked_test_runner):
+        tests_generator = SmokeTestsGenerator(
+            engine=SmokeTestsGenerator.ASYNC_ENGINE, use_db=False, http_methods=['GET'],
+        )
+        endpoint_url = '/{}'.format(create_random_string())
+        tests_generator.create_test_for_http_method('GET', endpoint_url)
+
+        with patch('django.test.client.AsyncClient.get', new_callable=AsyncMock) as mocked_get:
+            mocked_get.return_value = HttpResponse(status=500)
+            with captured_output() as (out, _), self.assertRaises(SystemExit):
+                tests_generator._execute_requests()
+
+        self.assertIn('FAILED GET {} 500'.format(endpoint_url), out.getvalue())
+        self.assertIn('Ran 1 requests, 1 failed, 0 skipped', out.getvalue())
+
+    @patch('django_smoke_tests.runners.NoDbTestRunner')
+    @patch('django_smoke_tests.generator.call_command')
+    def test_if_load_test_repeats_requests_without_creating_tests(
+            self, mocked_call_command, mocked_test_runner
+    ):
+        tests_generator = SmokeTestsGenerator(
+            use_db=False, http_methods=['GET'], repeat=5, concurrency=2,
+        )
+        tests_generator.create_test_for_http_method('GET', '/test/')
+        tests_generator.create_test_for_http_method('GET', '/skipped/', skipped=True)
+
+        with patch(
+            'django.test.client.AsyncClient.get', new_callable=AsyncMock,
+            return_value=HttpResponse(),
+        ) as mocked_get:
+            with captured_output() as (out, _):
+                tests_generator._execute_requests()
+
+        self.assertEqual(mocked_get.call_count, 5)
+        self.assertEqual([attr for attr in vars(SmokeTests) if attr.startswith('test_smoke')], [])
+        self.assertRegex(out.getvalue(), r'GET /test/ - 5 requests, p50 [0-9.]+ ms, .* 0.0% errors')
+        self.assertIn(
+            'Loaded 1 endpoints with 5 requests each, 0 with errors, 1 skipped', out.getvalue()
+        )
+
+    @patch('django_smoke_tests.runners.NoDbTestRunner')
+    def test_if_load_test_exits_with_error_on_failed_requests(self, mocked_test_runner):
+        tests_generator = SmokeTestsGenerator(use_db=False, http_methods=['GET'], repeat=4)
+        tests_generator.create_test_for_http_method('GET', '/test/')
+        responses = [HttpResponse(), HttpResponse(status=500), HttpResponse(), HttpResponse()]
+
+        with patch(
+            'django.test.client.AsyncClient.get', new_callable=AsyncMock, side_effect=responses,
+        ):
+            with captured_output() as (out, _), self.assertRaises(SystemExit):
+                tests_generator._execute_requests()
+
+        self.assertIn('25.0% errors', out.getvalue())
+        self.assertIn('1 with errors', out.getvalue())
+
+    @patch('django_smoke_tests.runners.SmokeTestRunner')
+    def test_if_requests_are_sent_to_live_server(self, mocked_test_runner):
+        server = RecordingServer()
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        tests_generator = SmokeTestsGenerator(
+            http_methods=['GET'], base_url=server.base_url, concurrency=2,
+        )
+        tests_generator.create_test_for_http_method('GET', '/test/')
+        tests_generator.create_test_for_http_method('GET', '/error/')
+
+        with captured_output() as (out, _), self.assertRaises(SystemExit):
+            tests_generator._execute_requests()
+
+        # the running server uses its own database
+        mocked_test_runner.return_value.setup_databases.assert_not_called()
+        self.assertEqual(sorted(path for _, path, _ in server.requests), ['/error/', '/test/'])
+        self.assertIn('OK GET /test/ 200', out.getvalue())
+        self.assertIn('FAILED GET /error/ 500', out.getvalue())
+        self.assertIn('Ran 2 requests, 1 failed, 0 skipped', out.getvalue())
+
+    def test_if_load_test_is_sent_to_live_server(self):
+        server = RecordingServer()
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        tests_generator = SmokeTestsGenerator(
+            http_methods=['GET'], base_url=server.base_url, concurrency=3, repeat=10,
+        )
+        tests_generator.create_test_for_http_method('GET', '/test/')
+
+        with captured_output() as (out, _):
+            tests_generator._execute_requests()
+
+        self.assertEqual(len(server.requests), 10)
+        self.assertEqual(server.connections, 3)
+        self.assertIn('GET /test/ - 10 requests', out.getvalue())
+
+    @patch('django_smoke_tests.generator.call_command')
+    def test_if_url_inventory_is_cached(self, mocked_call_command):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+
+        with override_settings(SMOKE_TESTS_CACHE_DIR=cache_dir):
+            tests_generator = SmokeTestsGenerator(cache_urls=True)
+            tests_generator.execute()
+            created_tests = [attr for attr in vars(SmokeTests) if attr.startswith('test_smoke')]
+            self.tearDown()
+
+            cached_tests_generator = SmokeTestsGenerator(cache_urls=True)
+            with patch.object(cached_tests_generator, 'load_all_endpoints') as mocked_load, \
+                    patch.object(cached_tests_generator, 'normalize_url_pattern') as mocked_norm:
+                cached_tests_generator.execute()
+
+        mocked_load.assert_not_called()
+        mocked_norm.assert_not_called()
+        self.assertEqual(cached_tests_generator.all_patterns, tests_generator.all_patterns)
+        self.assertEqual(
+            sorted(attr for attr in vars(SmokeTests) if attr.startswith('test_smoke')),
+            sorted(created_tests)
+        )
+
+    def test_if_modules_of_url_confs_and_views_are_sources_of_url_inventory(self):
+        tests_generator = SmokeTestsGenerator()
+        redirect_view = RedirectView.as_view(url='/')
+        redirect_view.__module__ = 'tests.views'
+
+        tests_generator.load_all_endpoints([
+            path('redirects/', include([path('', redirect_view)])),
+            path('app/', include('tests.app.urls')),
+        ])
+
+        self.assertEqual(
+            tests_generator.source_modules,
+            {
+                'tests.views', 'django.views.generic.base', 'tests.app.urls', 'tests.app.views',
+                'tests.decorators',  # a module of the view decorated without functools.wraps
+            },
+        )
+
+    def test_if_url_inventory_is_invalidated_by_change_of_router_in_separate_module(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        tests_generator = SmokeTestsGenerator()
+        tests_generator.load_all_endpoints(URLResolver(r'^/', 'tests.router_urls').url_patterns)
+        tests_generator._save_url_inventory(UrlInventoryCache('tests.router_urls', cache_dir))
+        routers_file = sys.modules['tests.routers'].__file__
+        routers_stat = os.stat(routers_file)
+        self.addCleanup(
+            os.utime, routers_file, ns=(routers_stat.st_atime_ns, routers_stat.st_mtime_ns)
+        )
+
+        self.assertIsNotNone(UrlInventoryCache('tests.router_urls', cache_dir).load())
+
+        # a new ViewSet registered in the router
+        os.utime(routers_file, ns=(routers_stat.st_atime_ns, routers_stat.st_mtime_ns + 10 ** 9))
+
+        self.assertIsNone(UrlInventoryCache('tests.router_urls', cache_dir).load())
+
+    def _create_reporting_generator(self, **kwargs):
+        report_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, report_dir)
+        report_path = os.path.join(report_dir, 'report.jsonl')
+        tests_generator = SmokeTestsGenerator(report=('jsonl', report_path), **kwargs)
+        tests_generator.report_writer.open()
+        return tests_generator, report_path
+
+    @staticmethod
+    def _read_report(report_path):
+        with open(report_path) as f:
+            return [json.loads(line) for line in f]
+
+    @parameterized.expand([
+        (True, 'passed', None),
+        (False, 'failed', 'status code 404 is not allowed'),
+    ])
+    def test_if_result_is_written_to_report_when_test_completes(
+            self, detail_url, expected_outcome, expected_message
+    ):
+        tests_generator, report_path = self._create_reporting_generator()
+        endpoint_url = '/{}'.format(create_random_string())
+        expected_test_name = tests_generator.create_test_name('GET', endpoint_url)
+        tests_generator.create_test_for_http_method(
+            'GET', endpoint_url, detail_url=detail_url, url_name='endpoint'
+        )
+
+        self._execute_smoke_test(expected_test_name)
+
+        # the record is available before the report is closed
+        [record] = self._read_report(report_path)
+        tests_generator.report_writer.close()
+        self.assertEqual(record['test_name'], expected_test_name)
+        self.assertEqual(
+            (record['method'], record['url'], record['url_name']), ('GET', endpoint_url, 'endpoint')
+        )
+        self.assertEqual(record['outcome'], expected_outcome)
+        self.assertEqual(record['message'], expected_message)
+        self.assertEqual(record['status_code'], 404)
+        self.assertEqual(record['query_count'], 0)
+        self.assertGreater(record['duration_ms'], 0)
+        self.assertGreater(record['response_size'], 0)
+        self.assertIsNone(record['skip_reason'])
+
+    def test_if_skipped_test_is_written_to_report(self):
+        tests_generator, report_path = self._create_reporting_generator()
+        endpoint_url = '/{}'.format(create_random_string())
+        expected_test_name = tests_generator.create_test_name('GET', endpoint_url)
+        tests_generator.create_test_for_http_method(
+            'GET', endpoint_url, skipped=True,
+            skip_reason=SmokeTestsGenerator.SKIPPED_BY_SETTINGS_SKIP_REASON,
+        )
+
+        is_successful, failures, skipped = self._execute_smoke_test(expected_test_name)
+        tests_generator.report_writer.close()
+
+        self.assertTrue(is_successful)
+        self.assertEqual(len(skipped), 1)
+        [record] = self._read_report(report_path)
+        self.assertEqual(record['outcome'], 'skipped')
+        self.assertEqual(record['skip_reason'], 'Skipped in SKIP_SMOKE_TESTS')
+
+    @patch('django_smoke_tests.generator.call_command')
+    def test_if_report_is_closed_after_tests(self, mocked_call_command):
+        report_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, report_dir)
+        report_path = os.path.join(report_dir, 'report.xml')
+
+        SmokeTestsGenerator(report=('junit', report_path)).execute()
+
+        with open(report_path) as f:
+            self.assertTrue(f.read().endswith('</testsuite>\n'))
+
+    @patch('django_smoke_tests.generator.call_command')
+    def test_if_changes_since_baseline_are_found(self, mocked_call_command):
+        baseline_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, baseline_dir)
+        baseline_path = os.path.join(baseline_dir, 'baseline.jsonl')
+        endpoint_url = '/{}'.format(create_random_string())
+        test_name = self.tests_generator.create_test_name('GET', endpoint_url)
+
+        def run_smoke_test(allowed_status_codes, **kwargs):
+            tests_generator = SmokeTestsGenerator(
+                allowed_status_codes=allowed_status_codes, **kwargs
+            )
+            tests_generator.create_test_for_http_method('GET', endpoint_url)
+            mocked_call_command.side_effect = (
+                lambda *args, **kwargs: self._execute_smoke_test(test_name)
+            )
+            tests_generator.execute()
+            return tests_generator
+
+        run_smoke_test([404], save_baseline=baseline_path)
+        with patch('django.test.client.Client.get', return_value=HttpResponse(status=200)), \
+                captured_output() as (out, _):
+            tests_generator = run_smoke_test([200], compare_baseline=baseline_path)
+
+        self.assertIn('Changes since the baseline:', out.getvalue())
+        self.assertEqual(
+            tests_generator.baseline_changes, [(test_name, 'status code changed from 404 to 200')]
+        )
+
+    @parameterized.expand([
+        ('GET', SharedDbSmokeTests),
+        ('POST', SmokeTests),
+        ('PUT', SmokeTests),
+        ('DELETE', SmokeTests),
+    ])
+    def test_if_only_safe_methods_use_shared_db(self, http_method, expected_test_class):
+        tests_generator = SmokeTestsGenerator(shared_db=True)
+        endpoint_url = '/{}'.format(create_random_string())
+        expected_test_name = tests_generator.create_test_name(http_method, endpoint_url)
+        tests_generator.create_test_for_http_method(http_method, endpoint_url)
+
+        self.assertTrue(hasattr(expected_test_class, expected_test_name))
+        other_test_class = (
+            SmokeTests if expected_test_class is SharedDbSmokeTests else SharedDbSmokeTests
+        )
+        self.assertFalse(hasattr(other_test_class, expected_test_name))
+
+    def test_if_tests_using_shared_db_are_not_isolated(self):
+        username = create_random_string()
+
+        def test_smoke_1_create_user(self_of_test):
+            get_user_model().objects.create_user(username)
+
+        def test_smoke_2_check_user(self_of_test):
+            self_of_test.assertTrue(get_user_model().objects.filter(username=username).exists())
+
+        SharedDbSmokeTests.test_smoke_1_create_user = test_smoke_1_create_user
+        SharedDbSmokeTests.test_smoke_2_check_user = test_smoke_2_check_user
+        suite = unittest.TestSuite([
+            SharedDbSmokeTests('test_smoke_1_create_user'),
+            SharedDbSmokeTests('test_smoke_2_check_user'),
+        ])
+        result = unittest.TextTestRunner(stream=DummyStream).run(suite)
+
+        self.assertTrue(result.wasSuccessful())
+        # changes are rolled back after all tests of the class
+        self.assertFalse(get_user_model().objects.filter(username=username).exists())
+
+    def test_if_smoke_test_fails_when_safe_request_modifies_shared_db(self):
+        tests_generator = SmokeTestsGenerator(shared_db=True)
+        endpoint_url = '/{}'.format(create_random_string())
+        expected_test_name = tests_generator.create_test_name('GET', endpoint_url)
+        tests_generator.create_test_for_http_method('GET', endpoint_url)
+
+        def write_to_db(*args, **kwargs):
+            get_user_model().objects.create_user(create_random_string())
+            return HttpResponse()
+
+        with patch('django.test.client.Client.get', side_effect=write_to_db):
+            is_successful, failures, skipped = self._execute_smoke_test(
+                expected_test_name, SharedDbSmokeTests
+            )
+
+        self.assertFalse(is_successful)
+        self.assertIn('request modified the shared database with 1 queries', failures[0][1])
+
+    @patch('django_smoke_tests.generator.call_command')
+    def test_if_shared_db_options_are_applied_to_both_test_classes(self, mocked_call_command):
+        SmokeTestsGenerator(
+            shared_db=True, fixture_path='file.json', auth_mode=PER_CLASS_AUTH
+        ).execute()
+
+        self.assertEqual(SharedDbSmokeTests.fixture_path, 'file.json')
+        self.assertEqual(SharedDbSmokeTests.auth_mode, PER_CLASS_AUTH)
+
+    @patch('django_smoke_tests.generator.get_changed_files')
+    @patch('django_smoke_tests.generator.call_command')
+    def test_if_tests_are_created_only_for_affected_views(
+            self, mocked_call_command, mocked_get_changed_files
+    ):
+        mocked_get_changed_files.return_value = {os.path.abspath('tests/app/views.py')}
+
+        tests_generator = SmokeTestsGenerator(changed_since='HEAD')
+        tests_generator.execute()
+
+        mocked_get_changed_files.assert_called_once_with('HEAD')
+        created_tests = [attr for attr in vars(SmokeTests) if attr.startswith('test_smoke')]
+        self.assertTrue(created_tests)
+        self.assertTrue(all('app_urls' in test_name for test_name in created_tests))
+
+    @patch('django_smoke_tests.generator.get_changed_files')
+    @patch('django_smoke_tests.generator.call_command')
+    def test_if_no_tests_are_created_when_no_views_are_affected(
+            self, mocked_call_command, mocked_get_changed_files
+    ):
+        mocked_get_changed_files.return_value = {os.path.abspath('README.rst')}
+
+        tests_generator = SmokeTestsGenerator(changed_since='HEAD')
+        tests_generator.execute()
+
+        self.assertFalse([attr for attr in vars(SmokeTests) if attr.startswith('test_smoke')])
+
     @patch('django_smoke_tests.generator.call_command')
     def test_smoke_test_is_created_only_for_specified_app(
             self, mocked_call_command
@@ -631,3 +1327,381 @@ class TestSmokeTestsGenerator(TestCase):
         call_command_for_loaddata.assert_called_once_with(
             'loaddata', fixture_path
         )
+
+    def _create_tests_for_user_detail_view(self, tests_generator):
+        url_pattern = path('users/<int:pk>/', lambda _: None, name=create_random_string())
+        tests_generator.create_tests_for_endpoint(
+            get_pattern(url_pattern), url_pattern.name, None, None,
+            lookup_str='tests.views.UserDetailView',
+        )
+        url = next(iter(tests_generator.resolvable_urls))
+        return url, tests_generator.create_test_name('GET', get_pattern(url_pattern))
+
+    def test_if_url_parameters_are_resolved_from_database(self):
+        user = get_user_model().objects.create_user(create_random_string())
+        tests_generator = SmokeTestsGenerator(http_methods=['GET'], resolve_url_params=True)
+        _, test_name = self._create_tests_for_user_detail_view(tests_generator)
+
+        with patch('django.test.client.Client.get', return_value=HttpResponse()) as mocked_get:
+            is_successful, failures, skipped = self._execute_smoke_test(test_name)
+
+        self.assertTrue(is_successful)
+        mocked_get.assert_called_once_with('/users/{}/'.format(user.pk), {})
+
+    def test_if_not_found_is_allowed_for_resolved_url_parameters(self):
+        get_user_model().objects.create_user(create_random_string())
+        tests_generator = SmokeTestsGenerator(http_methods=['GET'], resolve_url_params=True)
+        _, test_name = self._create_tests_for_user_detail_view(tests_generator)
+
+        with patch('django.test.client.Client.get', return_value=HttpResponse(status=404)):
+            is_successful, failures, skipped = self._execute_smoke_test(test_name)
+
+        self.assertTrue(is_successful)
+
+    def test_if_random_url_parameters_are_used_without_objects_in_database(self):
+        url_name = create_random_string()
+        url_pattern = path('groups/<str:group>/', lambda _: None, name=url_name)
+        tests_generator = SmokeTestsGenerator(http_methods=['GET'], resolve_url_params=True)
+        url_parameter_models = {url_name: {'group': 'auth.Group.name'}}
+        with override_settings(SMOKE_TESTS_URL_PARAMETER_MODELS=url_parameter_models):
+            tests_generator.create_tests_for_endpoint(
+                get_pattern(url_pattern), url_name, None, None,
+                lookup_str='tests.views.simple_method_view',
+            )
+        url = next(iter(tests_generator.resolvable_urls))
+        test_name = tests_generator.create_test_name('GET', get_pattern(url_pattern))
+
+        with patch(
+            'django.test.client.Client.get', return_value=HttpResponse(status=404)
+        ) as mocked_get:
+            is_successful, failures, skipped = self._execute_smoke_test(test_name)
+
+        self.assertTrue(is_successful)
+        mocked_get.assert_called_once_with(url, {})
+
+    def test_if_url_parameters_are_not_resolved_by_default(self):
+        tests_generator = SmokeTestsGenerator(http_methods=['GET'])
+        url_pattern = path('users/<int:pk>/', lambda _: None, name=create_random_string())
+        tests_generator.create_tests_for_endpoint(
+            get_pattern(url_pattern), url_pattern.name, None, None,
+            lookup_str='tests.views.UserDetailView',
+        )
+
+        self.assertEqual(tests_generator.resolvable_urls, {})
+
+    def test_if_samples_are_created_for_urls_with_parameters(self):
+        tests_generator = SmokeTestsGenerator(http_methods=['GET'], samples_per_url=3)
+        url_pattern = path('items/<int:pk>/', lambda _: None, name=create_random_string())
+        tests_generator.create_tests_for_endpoint(
+            get_pattern(url_pattern), url_pattern.name, None, None,
+        )
+
+        test_name = tests_generator.create_test_name('GET', get_pattern(url_pattern))
+        created_tests = [attr for attr in vars(SmokeTests) if attr.startswith(test_name)]
+        self.assertEqual(
+            sorted(created_tests),
+            [test_name, test_name + '_sample1', test_name + '_sample2'],
+        )
+
+    def test_if_samples_are_not_created_for_urls_without_parameters(self):
+        tests_generator = SmokeTestsGenerator(http_methods=['GET'], samples_per_url=3)
+        url_pattern = path('items/', lambda _: None, name=create_random_string())
+        tests_generator.create_tests_for_endpoint(
+            get_pattern(url_pattern), url_pattern.name, None, None,
+        )
+
+        test_name = tests_generator.create_test_name('GET', get_pattern(url_pattern))
+        created_tests = [attr for attr in vars(SmokeTests) if attr.startswith(test_name)]
+        self.assertEqual(created_tests, [test_name])
+
+    @patch('django_smoke_tests.generator.SmokeTestsGenerator.create_tests_for_http_methods')
+    def test_if_values_of_url_parameters_match_path_converters(
+            self, mocked_create_tests_for_http_methods
+    ):
+        tests_generator = SmokeTestsGenerator(http_methods=['GET'], samples_per_url=2)
+        url_pattern = path('items/<int:pk>/', lambda _: None, name=create_random_string())
+        tests_generator.create_tests_for_endpoint(
+            get_pattern(url_pattern), url_pattern.name, None, None,
+        )
+
+        urls = [call[0][0] for call in mocked_create_tests_for_http_methods.call_args_list]
+        self.assertEqual(len(set(urls)), 2)
+        for url in urls:
+            self.assertTrue(url_pattern.resolve(url.lstrip('/')))
+
+    def test_if_samples_use_different_objects_with_resolved_url_parameters(self):
+        users = [get_user_model().objects.create_user(create_random_string()) for _ in range(2)]
+        tests_generator = SmokeTestsGenerator(
+            http_methods=['GET'], resolve_url_params=True, samples_per_url=2
+        )
+        tests_generator.create_tests_for_endpoint(
+            '^users/(?P<pk>[0-9]+)/$', create_random_string(), None, None,
+            lookup_str='tests.views.UserDetailView',
+        )
+
+        resolved_urls = {
+            tests_generator.resolve_url(url) for url in tests_generator.resolvable_urls
+        }
+        self.assertEqual(resolved_urls, {'/users/{}/'.format(user.pk) for user in users})
+
+    def _create_compact_tests(self, tests_generator, urls):
+        for url in urls:
+            tests_generator.create_test_for_http_method('GET', url)
+        tests_generator.create_compact_tests()
+        return [attr for attr in vars(SmokeTests) if attr.startswith('test_smoke')]
+
+    def test_if_compact_tests_are_created_for_chunks_of_requests(self):
+        tests_generator = SmokeTestsGenerator(http_methods=['GET'], compact=True)
+        tests_generator.COMPACT_CHUNK_SIZE = 4
+        urls = ['/{}'.format(create_random_string()) for _ in range(10)]
+
+        created_tests = self._create_compact_tests(tests_generator, urls)
+
+        self.assertEqual(created_tests, [
+            'test_smoke_cases_00000', 'test_smoke_cases_00001', 'test_smoke_cases_00002',
+        ])
+        self.assertEqual(len(tests_generator.requests), 10)
+
+    def test_if_compact_tests_are_split_for_parallel_processes(self):
+        tests_generator = SmokeTestsGenerator(http_methods=['GET'], compact=True, parallel=4)
+        urls = ['/{}'.format(create_random_string()) for _ in range(10)]
+
+        created_tests = self._create_compact_tests(tests_generator, urls)
+
+        self.assertEqual(len(created_tests), 4)
+
+    def test_if_every_case_of_compact_test_is_reported_separately(self):
+        tests_generator = SmokeTestsGenerator(http_methods=['GET'], compact=True)
+        failing_url = '/{}'.format(create_random_string())
+        urls = sorted(['/{}'.format(create_random_string()), failing_url])
+        [test_name] = self._create_compact_tests(tests_generator, urls)
+
+        def get(url, *args, **kwargs):
+            return HttpResponse(status=500 if url == failing_url else 200)
+
+        with patch('django.test.client.Client.get', side_effect=get):
+            is_successful, failures, skipped = self._execute_smoke_test(test_name)
+
+        self.assertFalse(is_successful)
+        self.assertEqual(len(failures), 1)
+        self.assertIn(
+            tests_generator.create_test_name('GET', failing_url), failures[0][0].id()
+        )
+
+    def test_if_skipped_cases_of_compact_test_are_reported(self):
+        tests_generator = SmokeTestsGenerator(http_methods=['GET'], compact=True)
+        tests_generator.create_test_for_http_method(
+            'GET', '/{}'.format(create_random_string()), skipped=True, skip_reason='skipped'
+        )
+        tests_generator.create_compact_tests()
+
+        is_successful, failures, skipped = self._execute_smoke_test('test_smoke_cases_00000')
+
+        self.assertTrue(is_successful)
+        self.assertEqual(len(skipped), 1)
+        self.assertEqual(skipped[0][1], 'skipped')
+
+    def test_if_cases_of_compact_test_are_isolated(self):
+        username = create_random_string()
+        cases = [
+            SmokeRequest('test_smoke_1', 'GET', '/', False, False),
+            SmokeRequest('test_smoke_2', 'GET', '/', False, False),
+        ]
+
+        def run_case(test_case, case):
+            # fails with IntegrityError if the user created by the previous case wasn't rolled back
+            get_user_model().objects.create_user(username)
+
+        def test_smoke_cases(self_of_test):
+            self_of_test.run_cases(cases, run_case)
+
+        SmokeTests.test_smoke_cases = test_smoke_cases
+        is_successful, failures, skipped = self._execute_smoke_test('test_smoke_cases')
+
+        self.assertTrue(is_successful)
+
+    def test_if_memory_peak_is_recorded(self):
+        tests_generator = SmokeTestsGenerator(http_methods=['GET'], profile_memory=True)
+        endpoint_url = '/{}'.format(create_random_string())
+        expected_test_name = tests_generator.create_test_name('GET', endpoint_url)
+        tests_generator.create_test_for_http_method('GET', endpoint_url)
+
+        def get(*args, **kwargs):
+            return HttpResponse(b'x' * 512 * 1024)
+
+        with patch('django.test.client.Client.get', side_effect=get):
+            is_successful, failures, skipped = self._execute_smoke_test(expected_test_name)
+
+        self.assertTrue(is_successful)
+        [(method, url, url_name, peak_kb, top_sites)] = tests_generator.memory_peaks
+        self.assertEqual((method, url), ('GET', endpoint_url))
+        self.assertGreaterEqual(peak_kb, 512)
+        self.assertTrue(top_sites)
+
+        with captured_output() as (out, _):
+            tests_generator._print_summary()
+        self.assertIn('Endpoints allocating the most memory:', out.getvalue())
+        self.assertIn('GET {} - peak'.format(endpoint_url), out.getvalue())
+
+    @parameterized.expand([
+        ({'max_memory_kb': 100}, {}),
+        ({}, {'url_name': 100}),
+    ])
+    def test_if_smoke_test_fails_when_memory_budget_is_exceeded(self, generator_kwargs, overrides):
+        with override_settings(SMOKE_TESTS_MAX_MEMORY_KB=overrides):
+            tests_generator = SmokeTestsGenerator(http_methods=['GET'], **generator_kwargs)
+        endpoint_url = '/{}'.format(create_random_string())
+        expected_test_name = tests_generator.create_test_name('GET', endpoint_url)
+        tests_generator.create_test_for_http_method('GET', endpoint_url, url_name='url_name')
+
+        def get(*args, **kwargs):
+            return HttpResponse(b'x' * 512 * 1024)
+
+        with override_settings(SMOKE_TESTS_MAX_MEMORY_KB=overrides), \
+                patch('django.test.client.Client.get', side_effect=get):
+            is_successful, failures, skipped = self._execute_smoke_test(expected_test_name)
+
+        self.assertFalse(is_successful)
+        self.assertIn('exceeds budget of 100 KB', failures[0][1])
+
+    @patch('django_smoke_tests.generator.call_command')
+    def test_if_tests_are_only_listed(self, mocked_call_command):
+        tests_generator = SmokeTestsGenerator(http_methods=['GET'], list_tests=True)
+        with captured_output() as (out, _):
+            tests_generator.execute()
+
+        mocked_call_command.assert_not_called()
+        self.assertFalse([name for name in dir(SmokeTests) if name.startswith('test_smoke')])
+        test_name = tests_generator.create_test_name('GET', '^test/$')
+        self.assertIn('{} - GET /test/\n'.format(test_name), out.getvalue())
+        skipped_test_name = tests_generator.create_test_name('GET', '^skipped-endpoint/$')
+        self.assertIn(
+            '{} - skipped: Skipped in SKIP_SMOKE_TESTS\n'.format(skipped_test_name), out.getvalue()
+        )
+        self.assertIn(
+            'Listed {} smoke tests'.format(len(tests_generator.requests)), out.getvalue()
+        )
+
+    def test_if_slowest_requests_are_profiled(self):
+        profile_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, profile_dir)
+        tests_generator = SmokeTestsGenerator(http_methods=['GET'], profile_top=1)
+        slow_url = '/{}'.format(create_random_string())
+        fast_url = '/{}'.format(create_random_string())
+        for url in (slow_url, fast_url):
+            tests_generator.create_test_for_http_method('GET', url, url_name=url.strip('/'))
+
+        with patch('django_smoke_tests.generator.time') as mocked_time, \
+                patch('django.test.client.Client.get', return_value=HttpResponse()):
+            mocked_time.perf_counter.side_effect = [0, 2, 0, 1]  # 2000 ms and 1000 ms
+            for url in (slow_url, fast_url):
+                self._execute_smoke_test(tests_generator.create_test_name('GET', url))
+
+        with override_settings(SMOKE_TESTS_PROFILE_DIR=profile_dir), captured_output() as (out, _):
+            tests_generator._print_summary()
+
+        profile_path = os.path.join(profile_dir, '01_GET_{}.pstats'.format(slow_url.strip('/')))
+        self.assertIn('Profiles of the slowest requests:', out.getvalue())
+        self.assertIn('GET {} - 2000.0 ms - {}'.format(slow_url, profile_path), out.getvalue())
+        self.assertEqual(
+            sorted(os.listdir(profile_dir)), sorted([os.path.basename(profile_path), 'all.pstats'])
+        )
+
+    @patch('django_smoke_tests.generator.call_command')
+    def test_if_unimplemented_methods_are_skipped(self, mocked_call_command):
+        tests_generator = SmokeTestsGenerator(skip_unimplemented_methods=True, list_tests=True)
+        with captured_output():
+            tests_generator.execute()
+
+        skip_reasons = {
+            (request.test_name, request.method): request.skip_reason
+            for request in tests_generator.requests
+        }
+        url_pattern = '^test-drf-auth-class/$'
+        self.assertIsNone(
+            skip_reasons[(tests_generator.create_test_name('GET', url_pattern), 'GET')]
+        )
+        self.assertEqual(
+            skip_reasons[(tests_generator.create_test_name('POST', url_pattern), 'POST')],
+            SmokeTestsGenerator.NOT_IMPLEMENTED_SKIP_REASON,
+        )
+        # methods of function views are unknown
+        self.assertIsNone(
+            skip_reasons[(tests_generator.create_test_name('POST', '^test-django-auth/$'), 'POST')]
+        )
+
+    @patch('django_smoke_tests.generator.call_command')
+    def test_if_unimplemented_actions_of_routed_viewset_are_skipped(self, mocked_call_command):
+        tests_generator = SmokeTestsGenerator(skip_unimplemented_methods=True, list_tests=True)
+        with captured_output():
+            tests_generator.execute()
+
+        skip_reasons = {
+            (request.test_name, request.method): request.skip_reason
+            for request in tests_generator.requests
+        }
+        url_pattern = '^view-set/$'
+        for method in ['GET', 'POST']:
+            self.assertIsNone(
+                skip_reasons[(tests_generator.create_test_name(method, url_pattern), method)]
+            )
+        # the list route of the ViewSet doesn't map these methods to actions
+        for method in ['PUT', 'DELETE']:
+            self.assertEqual(
+                skip_reasons[(tests_generator.create_test_name(method, url_pattern), method)],
+                SmokeTestsGenerator.NOT_IMPLEMENTED_SKIP_REASON,
+            )
+
+    @patch('django_smoke_tests.generator.call_command')
+    def test_if_unimplemented_methods_are_requested_when_405_is_not_allowed(
+            self, mocked_call_command
+    ):
+        tests_generator = SmokeTestsGenerator(
+            skip_unimplemented_methods=True, allowed_status_codes=[200], list_tests=True
+        )
+        with captured_output():
+            tests_generator.execute()
+
+        self.assertFalse([
+            request for request in tests_generator.requests
+            if request.skip_reason == SmokeTestsGenerator.NOT_IMPLEMENTED_SKIP_REASON
+        ])
+
+    @patch('django_smoke_tests.generator.call_command')
+    def test_if_endpoints_are_selected_by_include_and_exclude_rules(self, mocked_call_command):
+        tests_generator = SmokeTestsGenerator(
+            http_methods=['GET'], include=['view:tests.views', 'namespace:another_app_namespace'],
+            exclude=['name:endpoint_with_*parameter', 'url:^/view-set'],
+        )
+        tests_generator.execute()
+
+        test_names = [attr for attr in vars(SmokeTests) if attr.startswith('test_smoke')]
+        self.assertIn(tests_generator.create_test_name('GET', '^test-django-auth/$'), test_names)
+        self.assertIn(tests_generator.create_test_name(
+            'GET', '^another_app_urls/^skipped\\-app\\-endpoint\\-by\\-namespace/$'
+        ), test_names)
+        self.assertNotIn(tests_generator.create_test_name('GET', '^$'), test_names)  # RedirectView
+        self.assertFalse([
+            name for name in test_names if 'with-parameter' in name or 'view-set' in name
+        ])
+
+    @patch('django_smoke_tests.generator.call_command')
+    def test_if_only_tests_of_shard_are_created(self, mocked_call_command):
+        all_tests_generator = SmokeTestsGenerator(list_tests=True)
+        with captured_output():
+            all_tests_generator.execute()
+        all_test_names = {request.test_name for request in all_tests_generator.requests}
+
+        shards = []
+        for shard in ('1/2', '2/2'):
+            SmokeTestsGenerator(shard=shard).execute()
+            shards.append({attr for attr in vars(SmokeTests) if attr.startswith('test_smoke')})
+            self.tearDown()
+
+        self.assertTrue(shards[0] and shards[1])
+        self.assertFalse(shards[0] & shards[1])
+        self.assertEqual(shards[0] | shards[1], all_test_names)
+
+    def test_if_error_is_raised_for_invalid_shard(self):
+        with self.assertRaises(InvalidShard):
+            SmokeTestsGenerator(shard='3/2')
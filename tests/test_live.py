@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for sending requests to a running server.
+"""
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.test import override_settings
+
+from django_smoke_tests.live import InvalidBaseUrl, LiveServerClient
+
+
+class RecordingRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+
+    def do_GET(self):
+        self.server.requests.append((self.command, self.path, dict(self.headers)))
+        status_code = 500 if self.path.endswith('/error/') else 200
+        content = self.path.encode()
+        self.send_response(status_code)
+        self.send_header('Content-Length', str(len(content)))
+        if self.path.endswith('/close/'):
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(content)
+
+    do_POST = do_PUT = do_DELETE = do_GET
+
+    def log_message(self, *args):
+        pass
+
+
+class RecordingServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super(RecordingServer, self).__init__(('127.0.0.1', 0), RecordingRequestHandler)
+        self.requests = []
+        self.connections = 0
+
+    def process_request(self, request, client_address):
+        self.connections += 1
+        super(RecordingServer, self).process_request(request, client_address)
+
+    @property
+    def base_url(self):
+        return 'http://127.0.0.1:{}'.format(self.server_address[1])
+
+
+class LiveServerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.server = RecordingServer()
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+
+class TestLiveServerClient(LiveServerTestCase):
+
+    def setUp(self):
+        super(TestLiveServerClient, self).setUp()
+        self.client = LiveServerClient(self.server.base_url)
+        self.addCleanup(self.client.close)
+
+    def test_if_response_is_returned(self):
+        response = self.client.get('/items/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'/items/')
+
+    def test_if_methods_are_sent(self):
+        for method in ('get', 'post', 'put', 'delete'):
+            self.assertEqual(getattr(self.client, method)('/items/', {}).status_code, 200)
+
+        self.assertEqual(
+            [method for method, _, _ in self.server.requests], ['GET', 'POST', 'PUT', 'DELETE']
+        )
+
+    def test_if_connection_is_kept_alive(self):
+        for _ in range(5):
+            self.client.get('/items/')
+
+        self.assertEqual(self.server.connections, 1)
+
+    def test_if_connection_closed_by_server_is_reopened(self):
+        self.client.get('/close/')
+        response = self.client.get('/items/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.server.connections, 2)
+
+    def test_if_every_thread_uses_its_own_connection(self):
+        threads = [
+            threading.Thread(target=lambda: [self.client.get('/items/') for _ in range(3)])
+            for _ in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(self.server.requests), 9)
+        self.assertEqual(self.server.connections, 3)
+
+    def test_if_path_of_base_url_is_prefixed(self):
+        client = LiveServerClient(self.server.base_url + '/prefix/')
+        self.addCleanup(client.close)
+
+        self.assertEqual(client.get('/items/').content, b'/prefix/items/')
+
+    @override_settings(SMOKE_TESTS_LIVE_SERVER_HEADERS={'Cookie': 'sessionid=secret'})
+    def test_if_headers_from_settings_are_sent(self):
+        client = LiveServerClient(self.server.base_url)
+        self.addCleanup(client.close)
+        client.get('/items/')
+
+        _, _, headers = self.server.requests[0]
+        self.assertEqual(headers['Cookie'], 'sessionid=secret')
+
+    def test_raise_an_error_for_invalid_base_url(self):
+        with self.assertRaises(InvalidBaseUrl):
+            LiveServerClient('127.0.0.1:8000')
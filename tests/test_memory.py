@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for memory profiling.
+"""
+import tracemalloc
+import unittest
+
+from django_smoke_tests.memory import MemoryProfiler
+
+ONE_MB = 1024 * 1024
+
+
+def allocate_temporarily():
+    data = bytearray(ONE_MB)
+    return len(data)
+
+
+class TestMemoryProfiler(unittest.TestCase):
+
+    def test_if_peak_includes_released_memory(self):
+        with MemoryProfiler() as memory_profiler:
+            allocate_temporarily()
+
+        self.assertGreaterEqual(memory_profiler.peak_bytes, ONE_MB)
+        self.assertGreaterEqual(memory_profiler.peak_kb, 1024)
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_if_top_sites_of_retained_memory_are_listed(self):
+        with MemoryProfiler(top_sites_count=2) as memory_profiler:
+            data = bytearray(ONE_MB)
+
+        self.assertLessEqual(len(memory_profiler.top_sites), 2)
+        site, size_bytes = memory_profiler.top_sites[0]
+        self.assertTrue(site.startswith(__file__.rstrip('c') + ':'))
+        self.assertGreaterEqual(size_bytes, ONE_MB)
+        del data
+
+    def test_if_only_memory_allocated_inside_is_measured_when_already_tracing(self):
+        tracemalloc.start()
+        self.addCleanup(tracemalloc.stop)
+        data_before = bytearray(2 * ONE_MB)
+
+        with MemoryProfiler() as memory_profiler:
+            data = bytearray(ONE_MB)
+
+        self.assertTrue(tracemalloc.is_tracing())
+        site, size_bytes = memory_profiler.top_sites[0]
+        self.assertGreaterEqual(size_bytes, ONE_MB)
+        self.assertLess(size_bytes, 2 * ONE_MB)
+        del data, data_before
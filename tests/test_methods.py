@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for HTTP methods implemented by views.
+"""
+from django.views.generic import RedirectView, View
+from django.test import TestCase
+from rest_framework.decorators import api_view
+
+from django_smoke_tests.methods import get_implemented_http_methods
+from django_smoke_tests.parameters import get_view
+
+from .views import SimpleViewSet, ViewWithDRFAuth, UserDetailView, simple_method_view
+
+
+class ViewWithCustomDispatch(View):
+
+    def dispatch(self, request, *args, **kwargs):
+        return super(ViewWithCustomDispatch, self).dispatch(request, *args, **kwargs)
+
+
+@api_view(['GET', 'POST'])
+def drf_function_view(request):
+    pass
+
+
+class TestImplementedHttpMethods(TestCase):
+
+    def test_methods_of_django_view(self):
+        self.assertEqual(get_implemented_http_methods(UserDetailView.as_view()), {'GET', 'OPTIONS'})
+
+    def test_http_method_names_of_view_are_respected(self):
+        view = RedirectView.as_view(url='/', http_method_names=['get', 'delete'])
+        self.assertEqual(get_implemented_http_methods(view), {'GET', 'DELETE'})
+
+    def test_methods_of_drf_views(self):
+        self.assertEqual(get_implemented_http_methods(ViewWithDRFAuth), {'GET', 'OPTIONS'})
+        self.assertEqual(
+            get_implemented_http_methods(drf_function_view), {'GET', 'POST', 'OPTIONS'}
+        )
+
+    def test_methods_of_viewset_are_taken_from_actions(self):
+        view = SimpleViewSet.as_view({'get': 'retrieve', 'delete': 'destroy'})
+        self.assertEqual(get_implemented_http_methods(view), {'GET', 'DELETE', 'OPTIONS'})
+
+    def test_methods_are_unknown_without_default_dispatch(self):
+        self.assertIsNone(get_implemented_http_methods(simple_method_view))
+        self.assertIsNone(get_implemented_http_methods(ViewWithCustomDispatch.as_view()))
+        self.assertIsNone(get_implemented_http_methods(SimpleViewSet))
+
+    def test_view_of_viewset_is_resolved_from_url(self):
+        view = get_view('tests.views.SimpleViewSet', '/view-set/')
+        self.assertEqual(get_implemented_http_methods(view), {'GET', 'POST', 'OPTIONS'})
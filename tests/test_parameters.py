@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for resolving URL parameters from the database.
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.test import TestCase, override_settings
+
+from django_smoke_tests.parameters import UrlParametersResolver, get_view_class
+from tests.views import UserByUsernameAPIView, UserByUsernameDetailView, UserDetailView
+
+
+class TestUrlParametersResolver(TestCase):
+
+    def setUp(self):
+        super(TestUrlParametersResolver, self).setUp()
+        self.resolver = UrlParametersResolver()
+        self.user = get_user_model().objects.create_user('neil')
+
+    def _register_user_detail_view(self):
+        return self.resolver.register('user', 'tests.views.UserDetailView', '/users/1', ['pk'])
+
+    def test_get_view_class(self):
+        self.assertIs(get_view_class('tests.views.UserDetailView', '/users/1'), UserDetailView)
+        self.assertIsNone(get_view_class('tests.views.simple_method_view', '/users/1'))
+
+    def test_get_view_class_of_view_set_action(self):
+        # DRF ViewSet actions aren't importable, the view is found by the URL
+        self.assertEqual(
+            get_view_class('tests.views.SimpleViewSet', '/view-set/1/').__name__, 'SimpleViewSet'
+        )
+
+    def test_if_pk_of_model_from_view_is_resolved(self):
+        parameters = self._register_user_detail_view()
+
+        self.assertEqual(parameters, {'pk': (UserDetailView, 'pk')})
+        self.assertEqual(self.resolver.resolve(parameters), {'pk': self.user.pk})
+
+    def test_if_slug_of_django_view_is_resolved(self):
+        parameters = self.resolver.register(
+            'user', 'tests.views.UserByUsernameDetailView', '/users/neil', ['username']
+        )
+
+        self.assertEqual(parameters, {'username': (UserByUsernameDetailView, 'username')})
+        self.assertEqual(self.resolver.resolve(parameters), {'username': 'neil'})
+
+    def test_if_lookup_field_of_drf_view_is_resolved(self):
+        parameters = self.resolver.register(
+            'user', 'tests.views.UserByUsernameAPIView', '/users/neil', ['name']
+        )
+
+        self.assertEqual(parameters, {'name': (UserByUsernameAPIView, 'username')})
+        self.assertEqual(self.resolver.resolve(parameters), {'name': 'neil'})
+
+    def test_if_parameters_of_function_views_are_not_resolved(self):
+        self.assertIsNone(
+            self.resolver.register('user', 'tests.views.simple_method_view', '/users/1', ['pk'])
+        )
+
+    def test_if_unknown_parameters_are_not_resolved(self):
+        self.assertIsNone(
+            self.resolver.register('user', 'tests.views.UserDetailView', '/users/1', ['other'])
+        )
+
+    @override_settings(SMOKE_TESTS_URL_PARAMETER_MODELS={
+        'group_user': {'group': 'auth.Group.name', 'pk': 'app.CustomUserModel'},
+    })
+    def test_if_models_from_settings_are_used(self):
+        Group.objects.create(name='astronauts')
+
+        parameters = self.resolver.register(
+            'group_user', 'tests.views.simple_method_view', '/groups/a/users/1', ['group', 'pk']
+        )
+
+        self.assertEqual(parameters, {
+            'group': ('auth.Group', 'name'), 'pk': ('app.CustomUserModel', 'pk'),
+        })
+        self.assertEqual(
+            self.resolver.resolve(parameters), {'group': 'astronauts', 'pk': self.user.pk}
+        )
+
+    def test_if_none_is_returned_without_objects(self):
+        parameters = self._register_user_detail_view()
+        get_user_model().objects.all().delete()
+
+        self.assertIsNone(self.resolver.resolve(parameters))
+
+    def test_if_values_are_fetched_once_per_scope(self):
+        parameters = self._register_user_detail_view()
+
+        with self.assertNumQueries(1):
+            self.resolver.resolve(parameters, scope='first')
+            self.resolver.resolve(parameters, scope='first')
+        with self.assertNumQueries(1):
+            self.resolver.resolve(parameters, scope='second')
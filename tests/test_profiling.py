@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for profiling of requests.
+"""
+import cProfile
+import os
+import pstats
+import shutil
+import tempfile
+import unittest
+
+from django_smoke_tests.profiling import AGGREGATED_PROFILE_NAME, RequestProfiles, get_profile_name
+
+
+def first_view():
+    return sum(range(100))
+
+
+def second_view():
+    return sum(range(100))
+
+
+def create_profile(function):
+    profile = cProfile.Profile()
+    profile.enable()
+    function()
+    profile.disable()
+    return profile
+
+
+def get_function_names(stats):
+    return {function_name for _, _, function_name in stats.stats}
+
+
+class TestRequestProfiles(unittest.TestCase):
+
+    def setUp(self):
+        self.profile_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.profile_dir)
+
+    def _create_request_profiles(self, top_count, latencies):
+        request_profiles = RequestProfiles(top_count)
+        for index, latency_ms in enumerate(latencies):
+            function = first_view if index % 2 == 0 else second_view
+            request_profiles.add(
+                create_profile(function), latency_ms, 'GET', '/items/{}/'.format(index),
+                'item-{}'.format(index),
+            )
+        return request_profiles
+
+    def test_if_slowest_requests_are_kept(self):
+        request_profiles = self._create_request_profiles(2, [10, 50, 30, 20])
+
+        self.assertEqual(
+            [(latency_ms, url) for latency_ms, _, url, _, _ in request_profiles.get_slowest()],
+            [(50, '/items/1/'), (30, '/items/2/')],
+        )
+        self.assertEqual(len(request_profiles.slowest), 2)
+
+    def test_if_all_requests_are_aggregated(self):
+        request_profiles = self._create_request_profiles(1, [10, 20])
+
+        function_names = get_function_names(request_profiles.aggregated)
+        self.assertIn('first_view', function_names)
+        self.assertIn('second_view', function_names)
+
+    def test_if_profiles_are_dumped(self):
+        request_profiles = self._create_request_profiles(2, [10, 50, 30])
+
+        dumped = request_profiles.dump(self.profile_dir)
+
+        self.assertEqual(
+            [os.path.basename(path) for _, _, _, path in dumped],
+            ['01_GET_item-1.pstats', '02_GET_item-2.pstats'],
+        )
+        self.assertIn('second_view', get_function_names(pstats.Stats(dumped[0][3])))
+        aggregated = pstats.Stats(os.path.join(self.profile_dir, AGGREGATED_PROFILE_NAME))
+        self.assertEqual(
+            aggregated.stats[next(key for key in aggregated.stats if key[2] == 'first_view')][1], 2
+        )
+
+    def test_get_profile_name(self):
+        self.assertEqual(
+            get_profile_name(1, 'GET', '/items/1/', 'items:detail'), '01_GET_items_detail.pstats'
+        )
+        self.assertEqual(get_profile_name(12, 'POST', '/items/1/', None), '12_POST_items_1.pstats')
+        self.assertEqual(get_profile_name(3, 'GET', '/', None), '03_GET_root.pstats')
@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for SQL queries analysis.
+"""
+from django.test import SimpleTestCase
+
+from django_smoke_tests.queries import find_repeated_queries, get_sql_template
+
+
+class TestQueries(SimpleTestCase):
+
+    def test_literals_are_replaced_in_sql_template(self):
+        self.assertEqual(
+            get_sql_template(
+                'SELECT "book"."id" FROM "book"\n'
+                '  WHERE "book"."author_id" = 12 AND "book"."title" = \'It\'\'s\''
+            ),
+            'SELECT "book"."id" FROM "book" WHERE "book"."author_id" = ? AND "book"."title" = ?'
+        )
+
+    def test_in_lists_are_collapsed_in_sql_template(self):
+        self.assertEqual(
+            get_sql_template('SELECT * FROM "book" WHERE "book"."id" IN (1, 2, 3)'),
+            get_sql_template('SELECT * FROM "book" WHERE "book"."id" IN (4)'),
+        )
+
+    def test_identifiers_with_digits_are_not_replaced(self):
+        self.assertEqual(
+            get_sql_template('SELECT * FROM "app_2fa" WHERE "app_2fa"."token1" = 5'),
+            'SELECT * FROM "app_2fa" WHERE "app_2fa"."token1" = ?'
+        )
+
+    def test_repeated_queries_are_found(self):
+        sqls = [
+            'SELECT * FROM "author"',
+            'SELECT * FROM "book" WHERE "book"."author_id" = 1',
+            'SELECT * FROM "book" WHERE "book"."author_id" = 2',
+            'SELECT * FROM "book" WHERE "book"."author_id" = 3',
+        ]
+        self.assertEqual(
+            find_repeated_queries(sqls, min_repeats=3),
+            [('SELECT * FROM "book" WHERE "book"."author_id" = ?', 3)]
+        )
+        self.assertEqual(find_repeated_queries(sqls, min_repeats=4), [])
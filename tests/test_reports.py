@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for reports of smoke tests.
+"""
+import json
+import os
+import shutil
+import tempfile
+from xml.etree import ElementTree
+
+from django.test import TestCase
+
+from django_smoke_tests.reports import JsonlReportWriter, JUnitReportWriter
+
+PASSED_RECORD = {
+    'test_name': 'test_smoke_GET_^items/(?P<pk>[0-9]+)/$',
+    'method': 'GET',
+    'url': '/items/1/',
+    'url_name': 'item',
+    'outcome': 'passed',
+    'status_code': 200,
+    'duration_ms': 12.5,
+    'query_count': 3,
+    'response_size': 1024,
+    'skip_reason': None,
+    'message': None,
+}
+FAILED_RECORD = dict(
+    PASSED_RECORD, outcome='failed', status_code=500, message='status code 500 is not allowed'
+)
+SKIPPED_RECORD = dict(
+    PASSED_RECORD, outcome='skipped', url=None, status_code=None, duration_ms=None,
+    query_count=None, response_size=None, skip_reason='Not supported',
+)
+
+
+class TestReportWriters(TestCase):
+
+    def setUp(self):
+        super(TestReportWriters, self).setUp()
+        self.report_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.report_dir)
+
+    def _write_report(self, writer_class, records):
+        writer = writer_class(os.path.join(self.report_dir, 'reports', 'report'))
+        writer.open()
+        for record in records:
+            writer.write(record)
+        writer.close()
+        return writer.path
+
+    def test_jsonl_report_contains_record_per_line(self):
+        records = [PASSED_RECORD, FAILED_RECORD, SKIPPED_RECORD]
+        report_path = self._write_report(JsonlReportWriter, records)
+
+        with open(report_path) as f:
+            self.assertEqual([json.loads(line) for line in f], records)
+
+    def test_junit_report_contains_test_cases(self):
+        report_path = self._write_report(
+            JUnitReportWriter, [PASSED_RECORD, FAILED_RECORD, SKIPPED_RECORD]
+        )
+
+        test_suite = ElementTree.parse(report_path).getroot()
+        passed, failed, skipped = test_suite.findall('testcase')
+        self.assertEqual(passed.get('name'), PASSED_RECORD['test_name'])
+        self.assertEqual(passed.get('time'), '0.012500')
+        self.assertEqual(
+            {prop.get('name'): prop.get('value') for prop in passed.iter('property')},
+            {
+                'method': 'GET', 'url': '/items/1/', 'url_name': 'item', 'status_code': '200',
+                'query_count': '3', 'response_size': '1024',
+            }
+        )
+        self.assertEqual(failed.find('failure').get('message'), 'status code 500 is not allowed')
+        self.assertEqual(skipped.find('skipped').get('message'), 'Not supported')
+
+    def test_previous_report_is_overwritten(self):
+        self._write_report(JsonlReportWriter, [PASSED_RECORD])
+        report_path = self._write_report(JsonlReportWriter, [FAILED_RECORD])
+
+        with open(report_path) as f:
+            self.assertEqual([json.loads(line) for line in f], [FAILED_RECORD])
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for selecting endpoints with include and exclude rules.
+"""
+from django.test import SimpleTestCase
+from parameterized import parameterized
+
+from django_smoke_tests.selection import EndpointSelector, InvalidSelectionRule, parse_rule
+
+ENDPOINT = ('/api/users/%(pk)s/', 'myproject.users.views.UserView', 'user-detail', 'api:v1')
+
+
+class TestEndpointSelector(SimpleTestCase):
+
+    @parameterized.expand([
+        ('app:myproject.users',),
+        ('namespace:api',),
+        ('namespace:api:v1',),
+        ('name:user-*',),
+        ('name:api:v1:*-detail',),
+        ('view:myproject.users.views',),
+        ('view:myproject.users.views.UserView',),
+        ('url:^/api/users/',),
+        ('url:users/%\\(pk\\)s',),
+    ])
+    def test_endpoint_matching_rule_is_included(self, rule):
+        self.assertTrue(EndpointSelector(include=[rule]).is_selected(*ENDPOINT))
+        self.assertFalse(EndpointSelector(exclude=[rule]).is_selected(*ENDPOINT))
+
+    @parameterized.expand([
+        ('app:myproject.missions',),
+        ('namespace:ap',),
+        ('namespace:v1',),
+        ('name:mission-*',),
+        ('view:myproject.users.view',),
+        ('url:^/missions/',),
+    ])
+    def test_endpoint_not_matching_rule_is_not_included(self, rule):
+        self.assertFalse(EndpointSelector(include=[rule]).is_selected(*ENDPOINT))
+        self.assertTrue(EndpointSelector(exclude=[rule]).is_selected(*ENDPOINT))
+
+    def test_all_endpoints_are_selected_without_rules(self):
+        self.assertTrue(EndpointSelector().is_selected(*ENDPOINT))
+
+    def test_any_include_rule_selects_endpoint(self):
+        selector = EndpointSelector(include=['name:mission-*'], app_names=['myproject.users'])
+        self.assertTrue(selector.is_selected(*ENDPOINT))
+
+    def test_exclude_rules_take_precedence(self):
+        selector = EndpointSelector(include=['namespace:api'], exclude=['name:user-detail'])
+        self.assertFalse(selector.is_selected(*ENDPOINT))
+
+    def test_endpoints_are_skipped_by_names(self):
+        selector = EndpointSelector(
+            skipped_names=['user-list', 'api:v1:user-detail', 'missions:launch']
+        )
+        self.assertTrue(selector.is_skipped('user-list', None, None))
+        self.assertTrue(selector.is_skipped('user-detail', 'api:v1', 'v1'))
+        self.assertTrue(selector.is_skipped('launch', 'ns', 'missions'))
+        self.assertFalse(selector.is_skipped('user-detail', None, None))
+        self.assertFalse(selector.is_skipped(None, None, None))
+
+    @parameterized.expand([
+        ('users',),
+        ('module:users',),
+        ('name:',),
+        ('url:[',),
+    ])
+    def test_invalid_rule_raises_error(self, rule):
+        with self.assertRaises(InvalidSelectionRule):
+            EndpointSelector(include=[rule])
+
+    def test_rule_value_may_contain_colons(self):
+        self.assertEqual(parse_rule('namespace:api:v1'), ('namespace', 'api:v1'))
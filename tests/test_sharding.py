@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for splitting smoke tests into shards.
+"""
+import json
+import os
+import shutil
+import tempfile
+
+from django.test import SimpleTestCase
+from parameterized import parameterized
+
+from django_smoke_tests.baseline import SnapshotWriter
+from django_smoke_tests.cases import SmokeRequest
+from django_smoke_tests.reports import get_report_writer
+from django_smoke_tests.sharding import (
+    DurationsNotAvailable, InvalidShard, load_durations, parse_shard, select_shard
+)
+
+
+def create_request(test_name, skipped=False):
+    return SmokeRequest(test_name, 'GET', '/{}'.format(test_name), False, skipped)
+
+
+def create_record(test_name, duration_ms, outcome='passed'):
+    return {
+        'test_name': test_name, 'method': 'GET', 'url': '/', 'url_name': None, 'outcome': outcome,
+        'status_code': 200, 'duration_ms': duration_ms, 'query_count': 0, 'response_size': 0,
+        'skip_reason': None, 'message': None,
+    }
+
+
+class TestParseShard(SimpleTestCase):
+
+    def test_shard_is_parsed(self):
+        self.assertEqual(parse_shard('2/4'), (2, 4))
+
+    @parameterized.expand([('2',), ('a/4',), ('0/4',), ('5/4',), ('1/2/3',)])
+    def test_invalid_shard_raises_error(self, shard):
+        with self.assertRaises(InvalidShard):
+            parse_shard(shard)
+
+
+class TestLoadDurations(SimpleTestCase):
+
+    def setUp(self):
+        super(TestLoadDurations, self).setUp()
+        self.report_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.report_dir)
+
+    def _write_report(self, writer):
+        writer.open()
+        writer.write(create_record('test_a', 12.5))
+        writer.write(create_record('test_b', None, outcome='skipped'))
+        writer.close()
+
+    @parameterized.expand([('jsonl', 'report.jsonl'), ('junit', 'report.xml')])
+    def test_durations_are_loaded_from_report(self, report_format, file_name):
+        path = os.path.join(self.report_dir, file_name)
+        self._write_report(get_report_writer(report_format, path))
+        self.assertEqual(load_durations(path), {'test_a': 12.5})
+
+    def test_durations_are_loaded_from_baseline_snapshot(self):
+        path = os.path.join(self.report_dir, 'baseline.jsonl')
+        self._write_report(SnapshotWriter(path))
+        self.assertEqual(load_durations(path), {'test_a': 12.5})
+
+    def test_error_is_raised_for_invalid_report(self):
+        path = os.path.join(self.report_dir, 'report.jsonl')
+        with open(path, 'w') as f:
+            f.write(json.dumps({'outcome': 'passed'}))
+        with self.assertRaises(DurationsNotAvailable):
+            load_durations(path)
+        with self.assertRaises(DurationsNotAvailable):
+            load_durations(os.path.join(self.report_dir, 'missing.jsonl'))
+
+
+class TestSelectShard(SimpleTestCase):
+
+    def _select_shards(self, requests, shards_count, durations=None):
+        return [
+            select_shard(requests, index, shards_count, durations)
+            for index in range(1, shards_count + 1)
+        ]
+
+    def test_shards_cover_all_requests_once(self):
+        requests = [
+            create_request('test_{}'.format(index), skipped=index % 3 == 0) for index in range(20)
+        ]
+        shards = self._select_shards(requests, 3)
+        self.assertEqual(sorted(sum(shards, []), key=requests.index), requests)
+
+    def test_shards_have_equal_numbers_of_requests_without_durations(self):
+        requests = [create_request('test_{}'.format(index)) for index in range(10)]
+        self.assertEqual([len(shard) for shard in self._select_shards(requests, 3)], [4, 3, 3])
+
+    def test_shards_are_balanced_by_durations(self):
+        requests = [create_request('test_{}'.format(index)) for index in range(5)]
+        durations = {'test_0': 100, 'test_1': 40, 'test_2': 30, 'test_3': 20}  # test_4 weighs 35
+        shards = self._select_shards(requests, 2, durations)
+        # loads are 120 ms and 105 ms
+        self.assertEqual(
+            [[request.test_name for request in shard] for shard in shards],
+            [['test_0', 'test_3'], ['test_1', 'test_2', 'test_4']],
+        )
+
+    def test_skipped_requests_dont_load_shards(self):
+        requests = [create_request('test_0'), create_request('test_1')] + [
+            create_request('test_skipped_{}'.format(index), skipped=True) for index in range(10)
+        ]
+        shards = self._select_shards(requests, 2)
+        self.assertEqual(
+            [len([request for request in shard if not request.skipped]) for shard in shards], [1, 1]
+        )
+
+    def test_selection_is_deterministic(self):
+        requests = [create_request('test_{}'.format(index)) for index in range(10)]
+        self.assertEqual(
+            select_shard(requests, 2, 3), select_shard(list(reversed(requests)), 2, 3)[::-1]
+        )
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for statistics of load tests.
+"""
+import random
+import unittest
+
+from django_smoke_tests.stats import EndpointStats, LatencyHistogram
+
+
+class TestLatencyHistogram(unittest.TestCase):
+
+    def test_if_percentiles_are_accurate_within_precision(self):
+        values = [random.uniform(1, 500) for _ in range(10000)]
+        histogram = LatencyHistogram()
+        for value in values:
+            histogram.record(value)
+
+        values.sort()
+        for percent in (50, 95, 99):
+            expected = values[int(len(values) * percent / 100) - 1]
+            self.assertAlmostEqual(histogram.percentile(percent), expected, delta=expected * 0.02)
+
+    def test_if_memory_does_not_grow_with_number_of_values(self):
+        histogram = LatencyHistogram()
+        for _ in range(100000):
+            histogram.record(random.uniform(10, 20))
+
+        self.assertEqual(histogram.count, 100000)
+        self.assertLess(len(histogram.buckets), 100)
+
+    def test_if_percentiles_are_within_extremes(self):
+        histogram = LatencyHistogram()
+        histogram.record(7.0)
+
+        self.assertEqual(histogram.percentile(50), 7.0)
+        self.assertEqual(histogram.percentile(99), 7.0)
+        self.assertEqual(histogram.mean, 7.0)
+
+    def test_if_empty_histogram_has_no_percentiles(self):
+        self.assertIsNone(LatencyHistogram().percentile(50))
+
+    def test_if_zero_latency_is_recorded(self):
+        histogram = LatencyHistogram()
+        histogram.record(0)
+
+        self.assertEqual(histogram.count, 1)
+
+
+class TestEndpointStats(unittest.TestCase):
+
+    def test_error_rate_and_throughput(self):
+        stats = EndpointStats('GET', '/items/')
+        for index in range(10):
+            stats.record(10, is_error=index < 2)
+        stats.elapsed_s = 0.5
+
+        self.assertEqual(stats.error_rate, 0.2)
+        self.assertEqual(stats.throughput, 20)
+        self.assertEqual(
+            stats.format(),
+            'GET /items/ - 10 requests, p50 10.0 ms, p95 10.0 ms, p99 10.0 ms, 20.0 req/s, '
+            '20.0% errors',
+        )
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for values of URL parameters.
+"""
+import uuid
+
+from django.test import TestCase, override_settings
+from django.urls import path, re_path
+from parameterized import parameterized
+
+from django_smoke_tests.generator import get_pattern
+from django_smoke_tests.values import (
+    IntValueProvider, SlugValueProvider, UrlValues, ValueProvider, get_url_parameter_regexes
+)
+
+
+class CountingValueProvider(ValueProvider):
+    batch_size = 3
+
+    def __init__(self):
+        super(CountingValueProvider, self).__init__()
+        self.batches = []
+
+    def create_batch(self, size):
+        start = sum(self.batches)
+        self.batches.append(size)
+        return ['value{}'.format(index) for index in range(start, start + size)]
+
+
+def create_default_value():
+    return 'default'
+
+
+class TestUrlValues(TestCase):
+
+    @parameterized.expand([
+        (r'^items/(?P<pk>[0-9]+)/$', {'pk': '[0-9]+'}),
+        (r'^(?P<year>[0-9]{4})/(?P<slug>[-\w]+)/$', {'year': '[0-9]{4}', 'slug': r'[-\w]+'}),
+        (r'^files/(?P<name>(?:[a-z]+)(\.txt)?)$', {'name': r'(?:[a-z]+)(\.txt)?'}),
+        (r'^(?P<part>[^)(]+)/(?P<pk>\d+)$', {'part': '[^)(]+', 'pk': r'\d+'}),
+        (r'^items/$', {}),
+    ])
+    def test_get_url_parameter_regexes(self, url_pattern, expected_regexes):
+        self.assertEqual(get_url_parameter_regexes(url_pattern), expected_regexes)
+
+    def test_if_provider_pool_is_refilled_in_batches(self):
+        provider = CountingValueProvider()
+
+        self.assertEqual(provider.get_values(2), ['value0', 'value1'])
+        self.assertEqual(provider.get_values(2), ['value2', 'value3'])
+        self.assertEqual(provider.get_values(5), ['value4', 'value5', 'value6', 'value7', 'value8'])
+        self.assertEqual(provider.batches, [3, 3, 3])
+
+    def test_if_int_values_are_distinct(self):
+        values = IntValueProvider().get_values(50)
+
+        self.assertEqual(len(set(values)), 50)
+        self.assertTrue(all(isinstance(value, int) and value > 0 for value in values))
+
+    @parameterized.expand([
+        (path('items/<int:pk>/', lambda _: None), int),
+        (re_path(r'^items/(?P<pk>\d+)/$', lambda _: None), int),
+        (path('items/<uuid:pk>/', lambda _: None), uuid.UUID),
+        (path('items/<str:pk>/', lambda _: None), str),
+        (path('items/<path:pk>/', lambda _: None), str),
+    ])
+    def test_if_values_match_path_converters(self, url_pattern, expected_type):
+        url_values = UrlValues(create_default_value)
+
+        [values] = url_values.create_values(get_pattern(url_pattern), ['pk'])
+
+        self.assertIsInstance(values['pk'], expected_type)
+        self.assertTrue(url_pattern.resolve('items/{}/'.format(values['pk'])))
+
+    def test_if_slug_values_match_slug_converter(self):
+        url_pattern = path('items/<slug:slug>/', lambda _: None)
+        url_values = UrlValues(create_default_value)
+
+        for values in url_values.create_values(get_pattern(url_pattern), ['slug'], count=20):
+            self.assertTrue(url_pattern.resolve('items/{}/'.format(values['slug'])))
+
+    def test_if_default_value_is_used_without_provider(self):
+        url_values = UrlValues(create_default_value)
+
+        samples = url_values.create_values(r'^items/(?P<name>[a-z]+)/$', ['name'], count=2)
+
+        self.assertEqual(samples, [{'name': 'default'}, {'name': 'default'}])
+
+    def test_if_samples_have_values_of_all_parameters(self):
+        url_pattern = path('items/<int:pk>/<slug:slug>/', lambda _: None)
+        url_values = UrlValues(create_default_value)
+
+        samples = url_values.create_values(get_pattern(url_pattern), ['pk', 'slug'], count=3)
+
+        self.assertEqual(len(samples), 3)
+        self.assertEqual(len({values['pk'] for values in samples}), 3)
+        self.assertTrue(all(set(values) == {'pk', 'slug'} for values in samples))
+
+    @override_settings(SMOKE_TESTS_URL_VALUE_PROVIDERS={
+        '[0-9]{4}': 'tests.test_values.CountingValueProvider',
+        'int': SlugValueProvider,
+    })
+    def test_if_providers_from_settings_are_used(self):
+        url_values = UrlValues(create_default_value)
+
+        [values] = url_values.create_values(
+            r'^(?P<year>[0-9]{4})/(?P<pk>[0-9]+)/$', ['year', 'pk']
+        )
+
+        self.assertEqual(values['year'], 'value0')
+        self.assertIsInstance(values['pk'], str)
@@ -1,5 +1,7 @@
 from django.contrib.auth.decorators import login_required
 from django.http import HttpResponse
+from django.views.generic import DetailView
+from rest_framework.generics import RetrieveAPIView
 from rest_framework.decorators import permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
@@ -7,6 +9,8 @@ from rest_framework.status import HTTP_201_CREATED, HTTP_204_NO_CONTENT
 from rest_framework.views import APIView
 from rest_framework.viewsets import ViewSet
 
+from tests.app.models import CustomUserModel
+
 
 def simple_method_view(request, parameter=None):
     return HttpResponse()
@@ -49,3 +53,24 @@ class SimpleViewSet(ViewSet):
 
 def skipped_view(request):
     return HttpResponse()
+
+
+class UserDetailView(DetailView):
+    model = CustomUserModel
+
+    def render_to_response(self, context, **response_kwargs):
+        return HttpResponse(self.object.username)
+
+
+class UserByUsernameDetailView(UserDetailView):
+    slug_field = 'username'
+    slug_url_kwarg = 'username'
+
+
+class UserByUsernameAPIView(RetrieveAPIView):
+    queryset = CustomUserModel.objects.all()
+    lookup_field = 'username'
+    lookup_url_kwarg = 'name'
+
+    def retrieve(self, request, *args, **kwargs):
+        return Response(self.get_object().username)